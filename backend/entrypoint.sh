@@ -0,0 +1,16 @@
+#!/bin/sh
+# Start the API with the serving profile chosen by SERVING_PROFILE:
+#   development (default)  manage.py runserver
+#   production             gunicorn, configured by fitnesstracker/gunicorn.conf.py
+#                          (set SERVE_ASYNC_VIEWS=1 to serve the ASGI application)
+set -e
+cd "$(dirname "$0")/fitnesstracker"
+
+if [ "${SERVING_PROFILE:-development}" = "production" ]; then
+    if [ "${SERVE_ASYNC_VIEWS:-0}" = "1" ]; then
+        exec gunicorn fitnesstracker.asgi:application -c gunicorn.conf.py
+    fi
+    exec gunicorn fitnesstracker.wsgi:application -c gunicorn.conf.py
+fi
+
+exec python manage.py runserver 0.0.0.0:8000
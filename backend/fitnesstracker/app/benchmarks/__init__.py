@@ -0,0 +1,13 @@
+"""
+Reproducible load benchmarks of the whole API (run with ``manage.py run_benchmarks``).
+
+- ``synthetic``: seeded users with years of realistic workout logs.
+- ``auth``: a local signing key and ID tokens the server verifies in-process
+  instead of calling Firebase.
+- ``endpoints``: the requests sent to every URL in ``fitnesstracker/urls.py``.
+- ``middleware``: reports each request's database query count to the driver.
+
+The server runs in a child process under a serving profile and the load
+comes from ``app.loadgen``; results are written as JSON so runs on
+different commits can be compared.
+"""
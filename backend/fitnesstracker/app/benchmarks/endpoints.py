@@ -0,0 +1,261 @@
+"""
+What the benchmark sends to each URL in ``fitnesstracker/urls.py``.
+
+Every URL name has one ``Endpoint`` per method worth measuring. Its
+``build`` turns a ``BenchmarkContext`` (the synthetic users, their tokens and
+logs) into a list of varied requests that the load driver cycles through,
+so a run does not just hit one cached row. ``uncovered_url_names`` lists
+URLs without an ``Endpoint``, so a new view can't silently go unmeasured.
+"""
+import io
+import itertools
+import json
+import math
+import random
+from datetime import timedelta
+from urllib.parse import quote, urlencode
+
+from django.core.management import call_command
+from django.urls import get_resolver
+
+from ..catalog import get_catalog
+from ..models import ExerciseLog
+from ..search import FACETS
+from .synthetic import USER_PREFIX, SyntheticUser
+
+REQUESTS_PER_ENDPOINT = 500
+
+
+class BenchmarkContext:
+    """Synthetic users, their tokens and logs, shared by the request builders."""
+
+    def __init__(self, auth, start_date, end_date, seed=0, delete_pool=5000):
+        self.rng = random.Random(seed)
+        self.catalog = get_catalog()
+        self.exercise_ids = [exercise.id for exercise in self.catalog]
+        self.start_date = start_date
+        self.end_date = end_date
+
+        logs = ExerciseLog.objects.filter(user_uid__user_uid__startswith=USER_PREFIX)
+        self.log_ids = {}  # {user_uid: [log_id, ...]}, a sample of each user's logs to edit
+        for user_uid, log_id in logs.order_by('?').values_list('user_uid', 'log_id')[:20000]:
+            self.log_ids.setdefault(user_uid, []).append(log_id)
+        if not self.log_ids:
+            raise ValueError('No synthetic logs found; generate the dataset first.')
+        self.user_uids = sorted(self.log_ids)
+        self.tokens = {user_uid: auth.token(user_uid) for user_uid in self.user_uids}
+
+        # Extra logs created only to be deleted, each at most once per run
+        self.delete_ids = []
+        if delete_pool:
+            per_user = math.ceil(delete_pool / len(self.user_uids))
+            doomed = []
+            for user_uid in self.user_uids:
+                logs = SyntheticUser(0, self.catalog, self.rng).logs(start_date, end_date)
+                for log in itertools.islice(logs, per_user):
+                    log.user_uid_id = user_uid
+                    doomed.append(log)
+            self.delete_ids = [
+                (log.user_uid_id, log.log_id) for log in ExerciseLog.objects.bulk_create(doomed)
+            ]
+            # bulk_create sends no signals; count the new logs in the rollup so deleting them balances out
+            for user_uid in self.user_uids:
+                call_command('rebuild_muscle_load', user=user_uid, stdout=io.StringIO())
+
+    def user(self):
+        user_uid = self.rng.choice(self.user_uids)
+        return user_uid, {'Authorization': f'Bearer {self.tokens[user_uid]}'}
+
+    def date(self):
+        return self.start_date + timedelta(days=self.rng.randrange((self.end_date - self.start_date).days + 1))
+
+    def date_range(self, days):
+        end = self.date()
+        return max(self.start_date, end - timedelta(days=days - 1)), end
+
+    def log_body(self, log_id=None):
+        sets = [
+            {'set_number': number, 'reps': self.rng.randint(5, 12), 'weight': self.rng.choice([0, 20, 42.5, 60])}
+            for number in range(1, self.rng.randint(1, 5) + 1)
+        ]
+        body = {
+            'exercise_id': self.rng.choice(self.exercise_ids),
+            'workout_date': self.date().isoformat(),
+            'workout_time': f'{self.rng.randint(5, 21):02d}:{self.rng.randint(0, 59):02d}:00',
+            'sets': sets,
+        }
+        if log_id is not None:
+            body['log_id'] = log_id
+        return body
+
+
+JSON_BODY = {'Content-Type': 'application/json'}
+
+
+def get(path, headers=None):
+    return ('GET', path, None, headers)
+
+
+def with_body(method, path, body, headers):
+    return (method, path, json.dumps(body).encode(), {**headers, **JSON_BODY})
+
+
+def authenticated_get(path_for):
+    """Builder for a GET by a random user; ``path_for(context)`` returns the path."""
+    def build(context):
+        requests = []
+        for _ in range(REQUESTS_PER_ENDPOINT):
+            _, headers = context.user()
+            requests.append(get(path_for(context), headers))
+        return requests
+    return build
+
+
+def public_get(path_for, headers=None):
+    def build(context):
+        return [get(path_for(context), headers) for _ in range(REQUESTS_PER_ENDPOINT)]
+    return build
+
+
+def date_range_query(days):
+    def query(context):
+        start, end = context.date_range(days)
+        return urlencode({'start_date': start.isoformat(), 'end_date': end.isoformat()})
+    return query
+
+
+def exercises_page(context):
+    pages = max(1, math.ceil(len(context.exercise_ids) / 50))
+    return f'/api/exercises/?page={context.rng.randint(1, pages)}'
+
+
+def facet_search(context):
+    exercise = context.catalog.get(context.rng.choice(context.exercise_ids))
+    params = []
+    for facet in context.rng.sample(FACETS, context.rng.randint(1, 3)):
+        value = getattr(exercise, facet)
+        if isinstance(value, tuple):
+            value = value[0] if value else None
+        if value:
+            params.append((facet, value))
+    return f'/api/exercises/search/?{urlencode(params)}'
+
+
+def name_search(context):
+    """Search for the first words of a random exercise name, with a typo."""
+    name = context.catalog.name_for(context.rng.choice(context.exercise_ids)).lower()
+    words = ' '.join(name.split()[:context.rng.randint(1, 3)])
+    if len(words) > 4:
+        typo = context.rng.randrange(len(words))
+        words = words[:typo] + words[typo + 1:]
+    return f'/api/exercises/search/names/?q={quote(words)}'
+
+
+def create_log(context):
+    requests = []
+    for _ in range(REQUESTS_PER_ENDPOINT):
+        _, headers = context.user()
+        requests.append(with_body('POST', '/api/exercises/logs/', context.log_body(), headers))
+    return requests
+
+
+def edit_log(context):
+    requests = []
+    for _ in range(REQUESTS_PER_ENDPOINT):
+        user_uid, headers = context.user()
+        log_id = context.rng.choice(context.log_ids[user_uid])
+        requests.append(with_body('PUT', '/api/exercises/logs/', context.log_body(log_id), headers))
+    return requests
+
+
+def delete_log(context):
+    return [
+        ('DELETE', f'/api/exercises/logs/?log_id={log_id}', None,
+         {'Authorization': f'Bearer {context.tokens[user_uid]}'})
+        for user_uid, log_id in context.delete_ids
+    ]
+
+
+def forget_deleted(context, sent):
+    """Drop the logs a run has (about) deleted, so the next run deletes fresh ones."""
+    del context.delete_ids[:sent]
+
+
+def bulk_create_logs(context):
+    requests = []
+    for index in range(REQUESTS_PER_ENDPOINT // 10):
+        _, headers = context.user()
+        logs = [{'client_id': f'bench-{index}-{n}', **context.log_body()} for n in range(50)]
+        requests.append(with_body('POST', '/api/exercises/logs/bulk/', {'logs': logs}, headers))
+    return requests
+
+
+class Endpoint:
+    def __init__(self, name, method, build=None, after_run=None, external=None):
+        self.name = name
+        self.method = method
+        self.build = build
+        self.after_run = after_run  # Called with (context, requests sent) after each run, for single-use requests
+        self.external = external  # Why the endpoint can't be benchmarked locally, if it can't
+
+    @property
+    def label(self):
+        return f'{self.method} {self.name}'
+
+    def __repr__(self):
+        return f'<Endpoint {self.label}>'
+
+
+# Ordered so that runs which write come after the reads and deletes come last
+ENDPOINTS = [
+    Endpoint('get_exercises_view', 'GET', public_get(exercises_page)),
+    Endpoint('get_exercise_by_id', 'GET', public_get(
+        lambda context: f'/api/exercises/{quote(context.rng.choice(context.exercise_ids))}/'
+    )),
+    Endpoint('catalog_snapshot_view', 'GET', public_get(
+        lambda context: '/api/exercises/snapshot/', {'Accept-Encoding': 'gzip'}
+    )),
+    Endpoint('search_exercises_view', 'GET', public_get(facet_search)),
+    Endpoint('search_exercise_names_view', 'GET', public_get(name_search)),
+    Endpoint('get_uid_view', 'GET', authenticated_get(lambda context: '/api/auth/uid/')),
+    Endpoint('get_username', 'GET', authenticated_get(lambda context: '/api/get_username/')),
+    Endpoint('get_user_info', 'GET', authenticated_get(lambda context: '/api/users/me/info/')),
+    Endpoint('get_dashboard_data', 'GET', authenticated_get(
+        lambda context: f'/api/users/me/dashboard/?{date_range_query(7)(context)}'
+    )),
+    Endpoint('get_exercises_by_date', 'GET', authenticated_get(
+        lambda context: f'/api/exercises/logs/by-date/?workout_date={context.date().isoformat()}'
+    )),
+    Endpoint('get_exercises_by_date_range', 'GET', authenticated_get(
+        lambda context: f'/api/exercises/logs/by-date-range/?{date_range_query(30)(context)}'
+    )),
+    Endpoint('get_muscle_percentage_by_date', 'GET', authenticated_get(
+        lambda context: f'/api/exercises/muscle-percentage/by-date/?workout_date={context.date().isoformat()}'
+    )),
+    Endpoint('get_muscle_percentages_by_date_range', 'GET', authenticated_get(
+        lambda context: f'/api/exercises/muscle-percentage/by-date-range/?{date_range_query(30)(context)}'
+    )),
+    Endpoint('recommend_exercises_view', 'GET', authenticated_get(
+        lambda context: f'/api/exercises/recommendations/?end_date={context.date().isoformat()}'
+    )),
+    Endpoint('exercise_log_view', 'GET', authenticated_get(lambda context: '/api/exercises/logs/?page_size=50')),
+    Endpoint('export_exercise_logs_view', 'GET', authenticated_get(
+        lambda context: '/api/exercises/logs/export/?type=ndjson'
+    )),
+    Endpoint('exercise_log_view', 'POST', create_log),
+    Endpoint('exercise_log_view', 'PUT', edit_log),
+    Endpoint('bulk_exercise_log_view', 'POST', bulk_create_logs),
+    Endpoint('exercise_log_view', 'DELETE', delete_log, after_run=forget_deleted),
+    Endpoint('get_bearer_token_view', 'POST', external='signs in with the Firebase Auth REST API'),
+    Endpoint('create_user_view', 'POST', external='creates an account with the Firebase Admin SDK'),
+    Endpoint('delete_user_view', 'DELETE', external='deletes an account with the Firebase Admin SDK'),
+]
+
+
+def uncovered_url_names():
+    """Names of URL patterns that no ``Endpoint`` covers."""
+    covered = {endpoint.name for endpoint in ENDPOINTS}
+    return sorted(
+        pattern.name for pattern in get_resolver().url_patterns
+        if getattr(pattern, 'name', None) and pattern.name not in covered
+    )
@@ -0,0 +1,29 @@
+from django.db import connection
+
+
+class QueryCounter:
+    def __init__(self):
+        self.count = 0
+
+    def __call__(self, execute, sql, params, many, context):
+        self.count += 1
+        return execute(sql, params, many, context)
+
+
+class QueryCountMiddleware:
+    """
+    Add an ``X-Query-Count`` header with the number of database queries a
+    request ran. Installed only when ``BENCHMARK_QUERY_COUNTS=1`` (see
+    settings); queries a streaming response runs while it is being sent are
+    not counted.
+    """
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        counter = QueryCounter()
+        with connection.execute_wrapper(counter):
+            response = self.get_response(request)
+        response['X-Query-Count'] = str(counter.count)
+        return response
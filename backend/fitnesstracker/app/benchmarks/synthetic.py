@@ -0,0 +1,205 @@
+"""
+Synthetic users and workout history for benchmarks.
+
+Each user follows a split routine (full body, upper/lower or push/pull/legs)
+a few days a week at a habitual time of day, skips some sessions and takes
+the odd week off, and rotates to a new program every few months. Within a
+program they repeat the same exercises with progressive overload, so the
+data has the skew of real logs: a few favourite exercises per user, 3-5
+sets of 5-15 reps, weights rounded to plates, bodyweight and stretching
+exercises without weight. Everything is drawn from a seeded ``random.Random``
+so a dataset can be regenerated exactly.
+"""
+import io
+import math
+import random
+from datetime import date, time, timedelta
+
+from django.core.management import call_command
+from django.db import connection, transaction
+
+from ..catalog import get_catalog
+from ..models import ExerciseLog, User
+from ..recommendations import EXERCISE_LEVELS, max_level_for
+
+USER_PREFIX = 'bench-user-'
+
+SPLITS = {
+    'full body': [
+        ('chest', 'lats', 'quadriceps', 'shoulders', 'abdominals', 'biceps', 'triceps'),
+    ],
+    'upper/lower': [
+        ('chest', 'lats', 'middle back', 'shoulders', 'biceps', 'triceps'),
+        ('quadriceps', 'hamstrings', 'glutes', 'calves', 'abdominals', 'lower back'),
+    ],
+    'push/pull/legs': [
+        ('chest', 'shoulders', 'triceps'),
+        ('lats', 'middle back', 'biceps', 'traps', 'forearms'),
+        ('quadriceps', 'hamstrings', 'glutes', 'calves', 'abdominals'),
+    ],
+}
+
+# Starting working weight (kg) of an average user, by equipment
+BASE_WEIGHTS = {
+    'barbell': 50, 'e-z curl bar': 25, 'dumbbell': 14, 'kettlebells': 16, 'cable': 25,
+    'machine': 40, 'medicine ball': 6, 'other': 10,
+}
+UNWEIGHTED_EQUIPMENT = {None, 'body only', 'bands', 'foam roll', 'exercise ball'}
+UNWEIGHTED_CATEGORIES = {'stretching', 'cardio', 'plyometrics'}
+
+PROGRAM_WEEKS = (8, 16)  # Range of weeks before a user switches program
+
+
+def plate_rounded(weight, equipment):
+    step = 2.5 if equipment in ('barbell', 'e-z curl bar', 'machine', 'cable') else 1.0
+    return max(step, round(weight / step) * step)
+
+
+class SyntheticUser:
+    """Training habits of one user; ``logs`` replays them over a date range."""
+
+    def __init__(self, index, catalog, rng):
+        self.uid = f'{USER_PREFIX}{index}'
+        self.rng = rng
+        self.fitness_level = rng.choices([1, 2, 3, 4, 5], weights=[2, 3, 3, 2, 1])[0]
+        self.split = rng.choice(list(SPLITS))
+        self.days_per_week = rng.choices([2, 3, 4, 5, 6], weights=[2, 4, 4, 2, 1])[0]
+        self.hour = rng.choice([6, 7, 7, 12, 17, 18, 18, 19, 20])
+        self.strength = rng.lognormvariate(0, 0.25) * (0.7 + 0.15 * self.fitness_level)
+        self.attendance = rng.uniform(0.75, 0.95)
+
+        max_rank = EXERCISE_LEVELS.index(max_level_for(self.fitness_level))
+        self.exercises = [
+            exercise for exercise in catalog
+            if exercise.level in EXERCISE_LEVELS and EXERCISE_LEVELS.index(exercise.level) <= max_rank
+        ]
+
+    def user(self):
+        return User(
+            user_uid=self.uid,
+            name=f'Bench User {self.uid[len(USER_PREFIX):]}',
+            email=f'{self.uid}@example.com',
+            age=self.rng.randint(18, 65),
+            height=round(self.rng.gauss(172, 9), 1),
+            weight=round(self.rng.gauss(75, 12), 1),
+            fitness_level=self.fitness_level,
+        )
+
+    def program(self):
+        """One exercise pool per day of the split, 5-8 exercises each."""
+        pools = []
+        for muscles in SPLITS[self.split]:
+            candidates = [exercise for exercise in self.exercises if set(exercise.primary_muscles) & set(muscles)]
+            # Favour compound strength movements, as most programs do
+            weights = [
+                (3 if exercise.mechanic == 'compound' else 1) * (2 if exercise.category == 'strength' else 1)
+                for exercise in candidates
+            ]
+            pool, size = [], self.rng.randint(5, 8)
+            while candidates and len(pool) < size:
+                pick = self.rng.choices(range(len(candidates)), weights=weights)[0]
+                pool.append(candidates.pop(pick))
+                weights.pop(pick)
+            pools.append(pool)
+        return pools
+
+    def sets_for(self, exercise, sessions_done):
+        rng = self.rng
+        if exercise.category == 'stretching':
+            count = rng.randint(1, 3)
+            return list(range(1, count + 1)), [rng.choice([20, 30, 45, 60])] * count, [0] * count
+        if exercise.category == 'cardio':
+            return [1], [rng.randint(10, 40)], [0]
+
+        count = rng.choices([1, 2, 3, 4, 5], weights=[1, 2, 7, 7, 3])[0]
+        if exercise.equipment in UNWEIGHTED_EQUIPMENT or exercise.category in UNWEIGHTED_CATEGORIES:
+            reps = [max(3, int(rng.gauss(12, 4))) for _ in range(count)]
+            return list(range(1, count + 1)), reps, [0] * count
+
+        low, high = (4, 8) if exercise.mechanic == 'compound' else (8, 15)
+        # Gains come quickly at first and level off around +60%, with day-to-day noise
+        working = BASE_WEIGHTS.get(exercise.equipment, 10) * self.strength
+        working *= (1 + 0.6 * (1 - math.exp(-sessions_done / 60))) * rng.uniform(0.95, 1.05)
+        reps, weights = [], []
+        for number in range(count):
+            factor = 0.6 if number == 0 and count >= 3 else 1.0  # Warm-up set
+            reps.append(rng.randint(low, high) + (2 if factor < 1 else 0))
+            weights.append(plate_rounded(working * factor, exercise.equipment))
+        return list(range(1, count + 1)), reps, weights
+
+    def logs(self, start, end):
+        rng = self.rng
+        training_days = sorted(rng.sample(range(7), self.days_per_week))
+        day = start
+        program, program_ends, session, sessions_done = None, start, 0, {}
+        while day <= end:
+            if day >= program_ends:
+                program = self.program()
+                program_ends = day + timedelta(weeks=rng.randint(*PROGRAM_WEEKS))
+            if day.weekday() == 0 and rng.random() < 0.03:
+                day += timedelta(weeks=1)  # A week off
+                continue
+            if day.weekday() in training_days and rng.random() < self.attendance:
+                pool = program[session % len(program)]
+                session += 1
+                minute = rng.randint(0, 59)
+                for exercise in rng.sample(pool, min(len(pool), rng.randint(4, 7))):
+                    done = sessions_done.get(exercise.id, 0)
+                    sessions_done[exercise.id] = done + 1
+                    set_numbers, set_reps, set_weights = self.sets_for(exercise, done)
+                    yield ExerciseLog(
+                        user_uid_id=self.uid,
+                        exercise_id_id=exercise.id,
+                        workout_date=day,
+                        workout_time=time(self.hour, minute),
+                        set_numbers=set_numbers,
+                        set_reps=set_reps,
+                        set_weights=set_weights,
+                    )
+                    minute = min(59, minute + rng.randint(4, 10))
+            day += timedelta(days=1)
+
+
+def clear_synthetic_data():
+    """Delete every synthetic user; their logs and rollup rows cascade."""
+    deleted, _ = User.objects.filter(user_uid__startswith=USER_PREFIX).delete()
+    return deleted
+
+
+def populate(users, years, seed=0, end=None, batch_size=5000):
+    """
+    Replace the synthetic users with ``users`` new ones, each with ``years``
+    of history ending at ``end`` (default today), and rebuild their
+    muscle-load rollup. Return ``{'users': ..., 'logs': ...}``.
+    """
+    catalog = get_catalog()
+    if not len(catalog):
+        raise ValueError('No exercises loaded; run load_exercises first.')
+
+    rng = random.Random(seed)
+    end = end or date.today()
+    start = end - timedelta(days=round(365.25 * years))
+    profiles = [SyntheticUser(index, catalog, random.Random(rng.random())) for index in range(users)]
+
+    clear_synthetic_data()
+    User.objects.bulk_create([profile.user() for profile in profiles])
+
+    logs = 0
+    for profile in profiles:
+        batch = []
+        with transaction.atomic():
+            for log in profile.logs(start, end):
+                batch.append(log)
+                if len(batch) >= batch_size:
+                    ExerciseLog.objects.bulk_create(batch)
+                    logs += len(batch)
+                    batch = []
+            ExerciseLog.objects.bulk_create(batch)
+            logs += len(batch)
+        # bulk_create sends no signals, so maintain the rollup explicitly
+        call_command('rebuild_muscle_load', user=profile.uid, stdout=io.StringIO())
+
+    with connection.cursor() as cursor:
+        cursor.execute(f'ANALYZE "{ExerciseLog._meta.db_table}"')
+
+    return {'users': users, 'logs': logs, 'start_date': start.isoformat(), 'end_date': end.isoformat()}
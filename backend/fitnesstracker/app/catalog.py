@@ -0,0 +1,227 @@
+"""
+Process-wide, read-only view of the exercise catalog.
+
+The catalog loaded by ``load_exercises`` almost never changes, so each process
+keeps one immutable snapshot of it in memory and views resolve exercises,
+names and muscle lists from that snapshot instead of querying ``Exercise``.
+
+The snapshot is tagged with a catalog version kept in the Django cache.
+``bump_catalog_version`` (called by ``load_exercises`` and whenever an
+``Exercise`` is saved or deleted) replaces that version, and every process
+sharing the cache reloads its snapshot the next time it checks.
+"""
+import threading
+import time
+from datetime import datetime, timezone
+
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.core.cache import caches
+from django.db import DatabaseError
+
+from .models import Exercise, normalize_exercise_id
+
+VERSION_CACHE_KEY = 'exercise_catalog_version'
+
+MUSCLE_GROUPS = tuple(muscle for muscle, _ in Exercise.MUSCLE_CHOICES)
+
+CATALOG_FIELDS = (
+    'id', 'id_key', 'name', 'force', 'level', 'mechanic', 'equipment',
+    'category', 'primary_muscles', 'secondary_muscles',
+)
+
+
+class CatalogExercise:
+    __slots__ = (
+        'id', 'key', 'name', 'force', 'level', 'mechanic', 'equipment',
+        'category', 'primary_muscles', 'secondary_muscles',
+    )
+
+    def __init__(self, id, key, name, force, level, mechanic, equipment,
+                 category, primary_muscles, secondary_muscles):
+        self.id = id
+        self.key = key
+        self.name = name
+        self.force = force
+        self.level = level
+        self.mechanic = mechanic
+        self.equipment = equipment
+        self.category = category
+        self.primary_muscles = tuple(primary_muscles)
+        self.secondary_muscles = tuple(secondary_muscles)
+
+    @property
+    def muscles(self):
+        return self.primary_muscles + self.secondary_muscles
+
+    def __repr__(self):
+        return f"<CatalogExercise {self.id}>"
+
+
+class ExerciseCatalog:
+    def __init__(self, exercises, version):
+        self.version = version
+        self.exercises = tuple(exercises)
+        self._by_key = {exercise.key: exercise for exercise in self.exercises}
+
+    @classmethod
+    def load(cls, version):
+        rows = Exercise.objects.order_by('id').values_list(*CATALOG_FIELDS)
+        return cls((CatalogExercise(*row) for row in rows), version)
+
+    def __len__(self):
+        return len(self.exercises)
+
+    def __iter__(self):
+        return iter(self.exercises)
+
+    def __contains__(self, exercise_id):
+        return normalize_exercise_id(exercise_id) in self._by_key
+
+    def get(self, exercise_id):
+        """Return the exercise matching ``exercise_id`` case-insensitively, or None."""
+        return self._by_key.get(normalize_exercise_id(exercise_id))
+
+    def name_for(self, exercise_id):
+        exercise = self.get(exercise_id)
+        return exercise.name if exercise is not None else None
+
+    def muscles_for(self, exercise_ids):
+        """Set of primary and secondary muscles worked by any of ``exercise_ids``."""
+        muscles = set()
+        for exercise_id in exercise_ids:
+            exercise = self.get(exercise_id)
+            if exercise is not None:
+                muscles.update(exercise.muscles)
+        return muscles
+
+
+_catalog = None
+_checked_at = 0.0
+_lock = threading.Lock()
+
+
+def _version_cache():
+    return caches[getattr(settings, 'EXERCISE_CATALOG_CACHE', 'default')]
+
+
+def current_catalog_version():
+    cache = _version_cache()
+    version = cache.get(VERSION_CACHE_KEY)
+    if version is None:
+        # First process to look seeds the version so everyone agrees on it.
+        cache.add(VERSION_CACHE_KEY, time.time_ns(), timeout=None)
+        version = cache.get(VERSION_CACHE_KEY)
+    return version
+
+
+def bump_catalog_version():
+    """Invalidate the catalog snapshot in this and every other process."""
+    global _catalog
+    _version_cache().set(VERSION_CACHE_KEY, time.time_ns(), timeout=None)
+    _catalog = None
+
+
+def get_catalog():
+    """
+    Return the current catalog snapshot, loading it if needed.
+
+    The shared version is re-read at most every
+    ``EXERCISE_CATALOG_RECHECK_SECONDS``, so most calls cost no I/O at all.
+    """
+    global _catalog, _checked_at
+    catalog = _catalog
+    now = time.monotonic()
+    recheck = getattr(settings, 'EXERCISE_CATALOG_RECHECK_SECONDS', 5)
+    if catalog is not None and now - _checked_at < recheck:
+        return catalog
+
+    # Read the version before the rows, so a concurrent bump always forces
+    # another reload rather than being masked by this one.
+    version = current_catalog_version()
+    if catalog is not None and catalog.version == version:
+        _checked_at = now
+        return catalog
+
+    with _lock:
+        if _catalog is None or _catalog.version != version:
+            _catalog = ExerciseCatalog.load(version)
+        _checked_at = now
+        return _catalog
+
+
+async def aget_catalog():
+    """
+    ``get_catalog`` for async views. Within the recheck interval this is a
+    plain attribute read; otherwise the check (and any reload, which
+    queries ``Exercise``) runs in a worker thread.
+    """
+    catalog = _catalog
+    recheck = getattr(settings, 'EXERCISE_CATALOG_RECHECK_SECONDS', 5)
+    if catalog is not None and time.monotonic() - _checked_at < recheck:
+        return catalog
+    return await sync_to_async(get_catalog)()
+
+
+def catalog_etag(request, *args, **kwargs):
+    """
+    ETag of responses built only from the catalog, for ``django.views.decorators.http.condition``.
+
+    Tagged with the version of this process's snapshot, the one the response
+    body is built from, so a snapshot that hasn't been rechecked yet is never
+    sent under a newer version's ETag. Within the recheck interval that is an
+    attribute read, so a matching ``If-None-Match`` is answered with 304
+    before any ORM query.
+    """
+    return f'catalog-{get_catalog().version}'
+
+
+def catalog_last_modified(request, *args, **kwargs):
+    """When the snapshot's catalog version was set (versions are ``time.time_ns()``)."""
+    return datetime.fromtimestamp(get_catalog().version / 1e9, tz=timezone.utc)
+
+
+def resolve_exercise(exercise_id):
+    """
+    Look ``exercise_id`` up in the catalog, falling back to the indexed
+    ``id_key`` column for exercises added since this process last reloaded.
+    """
+    exercise = get_catalog().get(exercise_id)
+    if exercise is not None:
+        return exercise
+
+    row = Exercise.objects.filter(
+        id_key=normalize_exercise_id(exercise_id)
+    ).values_list(*CATALOG_FIELDS).first()
+    return CatalogExercise(*row) if row is not None else None
+
+
+def resolve_exercises(exercise_ids):
+    """
+    Batch form of ``resolve_exercise``: ``{normalized id: CatalogExercise}``
+    for every id found, with all catalog misses checked in one query.
+    """
+    catalog = get_catalog()
+    resolved = {}
+    missing = set()
+    for exercise_id in exercise_ids:
+        key = normalize_exercise_id(exercise_id)
+        exercise = catalog.get(key)
+        if exercise is not None:
+            resolved[key] = exercise
+        else:
+            missing.add(key)
+
+    if missing:
+        for row in Exercise.objects.filter(id_key__in=missing).values_list(*CATALOG_FIELDS):
+            exercise = CatalogExercise(*row)
+            resolved[exercise.key] = exercise
+    return resolved
+
+
+def warm_catalog():
+    """Load the catalog ahead of the first request; tolerate a missing table."""
+    try:
+        get_catalog()
+    except DatabaseError:
+        pass
@@ -0,0 +1,153 @@
+"""
+Whole-catalog snapshot for clients that cache the catalog locally.
+
+The full catalog (instructions and images included) is serialized once per
+catalog version and kept in memory already compressed, so serving it is a
+dictionary lookup and a write. The version travels in the response's ETag
+and inside the body, so a client downloads the snapshot again only when
+``load_exercises`` (or an ``Exercise`` edit) has changed it.
+
+Compressing the snapshot takes a while, so after a version change the new
+one is built in a background thread and requests keep getting the previous
+snapshot, under its own ETag, until it is ready.
+"""
+import gzip
+import logging
+import threading
+from datetime import datetime, timezone
+
+import brotli
+from django.db import DatabaseError, connection
+
+from .catalog import current_catalog_version
+from .models import Exercise
+from .renderers import dumps
+
+logger = logging.getLogger(__name__)
+
+SNAPSHOT_FIELDS = (
+    'id', 'name', 'force', 'level', 'mechanic', 'equipment', 'primary_muscles',
+    'secondary_muscles', 'instructions', 'category', 'images',
+)
+
+# Content codings of the snapshot, in order of preference
+ENCODINGS = ('br', 'gzip', 'identity')
+
+
+def accepted_encodings(accept_encoding):
+    """Content codings allowed by an ``Accept-Encoding`` header (q=0 excluded)."""
+    accepted = {'identity'}
+    for part in accept_encoding.split(','):
+        coding, _, params = part.strip().partition(';')
+        coding = coding.strip().lower()
+        q = params.strip()
+        if q.startswith('q='):
+            try:
+                if float(q[2:]) == 0:
+                    accepted.discard(coding)
+                    continue
+            except ValueError:
+                continue
+        if coding:
+            accepted.add(coding)
+    if '*' in accepted:
+        accepted.update(ENCODINGS)
+    return accepted
+
+
+def negotiate_encoding(accept_encoding):
+    """Preferred content coding for an ``Accept-Encoding`` header."""
+    accepted = accepted_encodings(accept_encoding)
+    return next((encoding for encoding in ENCODINGS if encoding in accepted), 'identity')
+
+
+def snapshot_etag(request, *args, **kwargs):
+    """Strong ETag per served snapshot version and content coding."""
+    encoding = negotiate_encoding(request.headers.get('Accept-Encoding', ''))
+    return get_catalog_snapshot().etag(encoding)
+
+
+def snapshot_last_modified(request, *args, **kwargs):
+    return get_catalog_snapshot().last_modified
+
+
+class CatalogSnapshot:
+    def __init__(self, version, exercises):
+        self.version = version
+        body = dumps({'version': str(version), 'count': len(exercises), 'exercises': exercises})
+        self.bodies = {
+            'identity': body,
+            'gzip': gzip.compress(body, compresslevel=9, mtime=0),
+            'br': brotli.compress(body, quality=11),
+        }
+
+    @classmethod
+    def load(cls, version):
+        exercises = list(Exercise.objects.order_by('id').values(*SNAPSHOT_FIELDS))
+        return cls(version, exercises)
+
+    def etag(self, encoding):
+        return f'catalog-{self.version}-{encoding}'
+
+    @property
+    def last_modified(self):
+        """When the snapshot's catalog version was set (versions are ``time.time_ns()``)."""
+        return datetime.fromtimestamp(self.version / 1e9, tz=timezone.utc)
+
+    def body_for(self, accept_encoding=''):
+        """``(content coding, bytes)`` of the preferred representation the client accepts."""
+        encoding = negotiate_encoding(accept_encoding)
+        return encoding, self.bodies[encoding]
+
+
+_snapshot = None
+_building = None  # Version being built in the background, if any
+_lock = threading.Lock()
+
+
+def _build_snapshot(version):
+    global _snapshot, _building
+    try:
+        snapshot = CatalogSnapshot.load(version)
+        with _lock:
+            _snapshot = snapshot
+    except Exception:
+        logger.exception("Could not build the catalog snapshot for version %s", version)
+    finally:
+        with _lock:
+            _building = None
+        connection.close()
+
+
+def get_catalog_snapshot():
+    """
+    Snapshot of the current catalog version, built at most once per version and process.
+
+    Only a process without any snapshot yet builds one on the request path
+    (normally ``warm_catalog_snapshot`` has at startup); otherwise a newer
+    version is built in a background thread and the previous snapshot is
+    returned meanwhile.
+    """
+    global _snapshot, _building
+    # Read the version before the rows, as get_catalog does
+    version = current_catalog_version()
+    snapshot = _snapshot
+    if snapshot is not None and snapshot.version == version:
+        return snapshot
+    with _lock:
+        if _snapshot is None:
+            _snapshot = CatalogSnapshot.load(version)
+        elif _snapshot.version != version and _building is None:
+            _building = version
+            threading.Thread(
+                target=_build_snapshot, args=(version,), name='catalog-snapshot', daemon=True
+            ).start()
+        return _snapshot
+
+
+def warm_catalog_snapshot():
+    """Build the snapshot ahead of the first request; tolerate a missing table."""
+    try:
+        get_catalog_snapshot()
+    except DatabaseError:
+        pass
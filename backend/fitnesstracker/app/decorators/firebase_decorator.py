@@ -1,6 +1,100 @@
-from django.http import JsonResponse
+import asyncio
+import hashlib
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from cachetools import TLRUCache
+from django.conf import settings
 from firebase_admin import auth as firebase_auth
 
+from ..firebase_tokens import get_id_token_verifier
+from ..renderers import JsonResponse
+
+
+class VerifiedTokenCache:
+    """
+    Thread-safe LRU cache of verified Firebase ID tokens.
+
+    Entries are keyed by a SHA-256 of the token and expire at the token's own
+    ``exp`` claim (or after ``max_ttl`` seconds, whichever comes first), so a
+    client pays for signature verification once per token lifetime.
+    """
+
+    def __init__(self, maxsize=10000, max_ttl=3600):
+        self.max_ttl = max_ttl
+        self.hits = 0
+        self.misses = 0
+        self._cache = TLRUCache(maxsize=maxsize, ttu=self._expires_at, timer=time.time)
+        self._lock = threading.Lock()
+
+    def _expires_at(self, key, decoded_token, now):
+        return min(decoded_token.get('exp', now), now + self.max_ttl)
+
+    @staticmethod
+    def key_for(id_token):
+        return hashlib.sha256(id_token.encode()).hexdigest()
+
+    def get(self, id_token):
+        key = self.key_for(id_token)
+        with self._lock:
+            decoded_token = self._cache.get(key)
+            if decoded_token is None:
+                self.misses += 1
+            else:
+                self.hits += 1
+            return decoded_token
+
+    def set(self, id_token, decoded_token):
+        key = self.key_for(id_token)
+        with self._lock:
+            self._cache[key] = decoded_token
+
+    def verify(self, id_token, verify_id_token):
+        """Return the cached claims for ``id_token`` or verify and cache them."""
+        decoded_token = self.get(id_token)
+        if decoded_token is None:
+            decoded_token = verify_id_token(id_token)
+            self.set(id_token, decoded_token)
+        return decoded_token
+
+    async def averify(self, id_token, verify_id_token, executor):
+        """``verify`` for async views: cache hits stay on the event loop, verification runs in ``executor``."""
+        decoded_token = self.get(id_token)
+        if decoded_token is None:
+            loop = asyncio.get_running_loop()
+            decoded_token = await loop.run_in_executor(executor, verify_id_token, id_token)
+            self.set(id_token, decoded_token)
+        return decoded_token
+
+    def clear(self):
+        with self._lock:
+            self._cache.clear()
+            self.hits = 0
+            self.misses = 0
+
+    def stats(self):
+        with self._lock:
+            return {'hits': self.hits, 'misses': self.misses, 'size': len(self._cache)}
+
+
+token_cache = VerifiedTokenCache(
+    maxsize=getattr(settings, 'FIREBASE_TOKEN_CACHE_SIZE', 10000),
+    max_ttl=getattr(settings, 'FIREBASE_TOKEN_CACHE_MAX_TTL', 3600),
+)
+
+
+# Bounded pool for verifying tokens off the event loop; a burst of new
+# tokens queues here instead of spawning unbounded threads.
+verify_executor = ThreadPoolExecutor(
+    max_workers=getattr(settings, 'FIREBASE_VERIFY_THREADS', 4),
+    thread_name_prefix='firebase-verify',
+)
+
+
+def verify_id_token(id_token):
+    return get_id_token_verifier()(id_token)
+
 
 def firebase_token_required(view_func):
     def wrapped_view(request, *args, **kwargs):
@@ -10,7 +104,7 @@ def firebase_token_required(view_func):
 
         id_token = auth_header.split(' ')[1]  # Extract the token
         try:
-            decoded_token = firebase_auth.verify_id_token(id_token)
+            decoded_token = token_cache.verify(id_token, get_id_token_verifier())
             request.user_uid = decoded_token['uid']  # Add the user's UID to the request
             return view_func(request, *args, **kwargs)
         except firebase_auth.InvalidIdTokenError:
@@ -21,3 +115,25 @@ def firebase_token_required(view_func):
             return JsonResponse({'error': f'Authentication error: {str(e)}'}, status=401)
 
     return wrapped_view
+
+
+def async_firebase_token_required(view_func):
+    """``firebase_token_required`` for ``async def`` views."""
+    async def wrapped_view(request, *args, **kwargs):
+        auth_header = request.headers.get('Authorization')
+        if not auth_header or not auth_header.startswith('Bearer '):
+            return JsonResponse({'error': 'Authorization header missing or invalid'}, status=401)
+
+        id_token = auth_header.split(' ')[1]  # Extract the token
+        try:
+            decoded_token = await token_cache.averify(id_token, verify_id_token, verify_executor)
+            request.user_uid = decoded_token['uid']  # Add the user's UID to the request
+        except firebase_auth.InvalidIdTokenError:
+            return JsonResponse({'error': 'Invalid ID token'}, status=401)
+        except firebase_auth.ExpiredIdTokenError:
+            return JsonResponse({'error': 'Expired ID token'}, status=401)
+        except Exception as e:
+            return JsonResponse({'error': f'Authentication error: {str(e)}'}, status=401)
+        return await view_func(request, *args, **kwargs)
+
+    return wrapped_view
@@ -0,0 +1,233 @@
+"""
+Local verification of Firebase ID tokens.
+
+Firebase signs ID tokens with rotating Google keys published as
+``{kid: PEM certificate}`` JSON. ``SigningKeySet`` keeps those keys in memory
+and a background thread refreshes them as the response's ``Cache-Control``
+allows, so ``LocalTokenVerifier`` can check signatures and claims with PyJWT
+without any network access on the request path.
+
+The key source is pluggable: ``key_source_for`` accepts an ``https://`` URL
+(Google's endpoint or a stub server) or a ``file://`` path to a local JSON key
+file, which is what tests and load benchmarks use.
+"""
+import json
+import logging
+import os
+import re
+import threading
+import time
+
+import firebase_admin
+import jwt
+import requests
+from cryptography import x509
+from cryptography.hazmat.primitives import serialization
+from django.conf import settings
+from firebase_admin import auth as firebase_auth
+
+logger = logging.getLogger(__name__)
+
+GOOGLE_SIGNING_KEYS_URL = (
+    'https://www.googleapis.com/robot/v1/metadata/x509/securetoken@system.gserviceaccount.com'
+)
+
+_MAX_AGE_RE = re.compile(r'max-age=(\d+)')
+
+
+class HttpKeySource:
+    """Fetch keys over HTTP(S), honouring ``Cache-Control: max-age``."""
+
+    def __init__(self, url, timeout=10):
+        self.url = url
+        self.timeout = timeout
+
+    def fetch(self):
+        response = requests.get(self.url, timeout=self.timeout)
+        response.raise_for_status()
+        match = _MAX_AGE_RE.search(response.headers.get('Cache-Control', ''))
+        return response.json(), int(match.group(1)) if match else None
+
+    def __repr__(self):
+        return f"<HttpKeySource {self.url}>"
+
+
+class FileKeySource:
+    """Read keys from a local JSON file of ``{kid: PEM}``."""
+
+    def __init__(self, path):
+        self.path = path
+
+    def fetch(self):
+        with open(self.path, 'r') as file:
+            return json.load(file), None
+
+    def __repr__(self):
+        return f"<FileKeySource {self.path}>"
+
+
+def key_source_for(url):
+    if url.startswith('file://'):
+        return FileKeySource(url[len('file://'):])
+    return HttpKeySource(url)
+
+
+def load_public_key(pem):
+    """Public key from a PEM X.509 certificate or a bare PEM public key."""
+    data = pem.encode()
+    if b'BEGIN CERTIFICATE' in data:
+        return x509.load_pem_x509_certificate(data).public_key()
+    return serialization.load_pem_public_key(data)
+
+
+class SigningKeySet:
+    """
+    In-memory ``{kid: public key}`` refreshed by a daemon thread.
+
+    Requests only ever read the current mapping; an unknown ``kid`` wakes the
+    refresher early (at most once per ``min_interval``) but never waits for it.
+    """
+
+    def __init__(self, source, default_max_age=3600, retry_interval=60, min_interval=30, clock=time.monotonic):
+        self.source = source
+        self.default_max_age = default_max_age
+        self.retry_interval = retry_interval
+        self.min_interval = min_interval
+        self.clock = clock
+        self.keys = {}
+        self.loaded_at = None
+        self._loaded = threading.Event()
+        self._wake = threading.Event()
+        self._thread = None
+        self._pid = None
+        self._lock = threading.Lock()
+
+    def refresh(self):
+        """Fetch keys once; return seconds until the next refresh is due."""
+        try:
+            raw_keys, max_age = self.source.fetch()
+            keys = {kid: load_public_key(pem) for kid, pem in raw_keys.items()}
+        except Exception:
+            logger.exception("Could not refresh Firebase signing keys from %r", self.source)
+            return self.retry_interval
+
+        self.keys = keys
+        self.loaded_at = time.time()
+        self._loaded.set()
+        return max(self.min_interval, (max_age or self.default_max_age) * 0.9)
+
+    def _run(self):
+        while True:
+            fetched_at = self.clock()
+            self._wait_for_refresh(fetched_at, fetched_at + self.refresh())
+
+    def _wait_for_refresh(self, fetched_at, due):
+        """Block until ``due``, or earlier when woken by an unknown kid."""
+        while self.clock() < due:
+            if self._wake.wait(due - self.clock()):
+                self._wake.clear()
+                # Refresh early for an unknown kid, but at most every min_interval,
+                # so tokens with made-up kids can't make us fetch on every request
+                due = min(due, fetched_at + self.min_interval)
+
+    def start(self):
+        """Start the refresher in this process (again after a fork)."""
+        with self._lock:
+            if self._thread is not None and self._thread.is_alive() and self._pid == os.getpid():
+                return
+            self._pid = os.getpid()
+            self._thread = threading.Thread(target=self._run, name='firebase-signing-keys', daemon=True)
+            self._thread.start()
+
+    def wait_until_loaded(self, timeout=None):
+        return self._loaded.wait(timeout)
+
+    def get(self, kid):
+        if self._pid != os.getpid():
+            self.start()
+        key = self.keys.get(kid)
+        if key is None:
+            self._wake.set()
+        return key
+
+
+class LocalTokenVerifier:
+    """Drop-in replacement for ``firebase_auth.verify_id_token`` that never leaves the process."""
+
+    def __init__(self, key_set, project_id, clock_skew_seconds=0):
+        self.key_set = key_set
+        self.project_id = project_id
+        self.clock_skew_seconds = clock_skew_seconds
+
+    def verify_id_token(self, id_token):
+        try:
+            header = jwt.get_unverified_header(id_token)
+        except jwt.InvalidTokenError as e:
+            raise firebase_auth.InvalidIdTokenError(f'Malformed ID token: {e}', cause=e)
+
+        if header.get('alg') != 'RS256':
+            raise firebase_auth.InvalidIdTokenError('ID token has incorrect "alg" header.')
+
+        key = self.key_set.get(header.get('kid'))
+        if key is None:
+            raise firebase_auth.InvalidIdTokenError('ID token has an unknown "kid" header.')
+
+        try:
+            claims = jwt.decode(
+                id_token,
+                key=key,
+                algorithms=['RS256'],
+                audience=self.project_id,
+                issuer=f'https://securetoken.google.com/{self.project_id}',
+                leeway=self.clock_skew_seconds,
+                options={'require': ['exp', 'iat', 'sub', 'aud', 'iss']},
+            )
+        except jwt.ExpiredSignatureError as e:
+            raise firebase_auth.ExpiredIdTokenError('Token expired', cause=e)
+        except jwt.InvalidTokenError as e:
+            raise firebase_auth.InvalidIdTokenError(f'Invalid ID token: {e}', cause=e)
+
+        if not claims['sub'] or len(claims['sub']) > 128:
+            raise firebase_auth.InvalidIdTokenError('ID token has an invalid "sub" claim.')
+
+        claims['uid'] = claims['sub']
+        return claims
+
+
+_verifier = None
+_verifier_lock = threading.Lock()
+
+
+def _project_id():
+    project_id = getattr(settings, 'FIREBASE_PROJECT_ID', None)
+    if project_id:
+        return project_id
+    return firebase_admin.get_app().project_id
+
+
+def get_id_token_verifier():
+    """
+    Callable used to verify ID tokens, chosen by ``FIREBASE_TOKEN_VERIFIER``:
+    'firebase' (the Admin SDK) or 'local' (``LocalTokenVerifier``).
+    """
+    global _verifier
+    if _verifier is None:
+        with _verifier_lock:
+            if _verifier is None:
+                if getattr(settings, 'FIREBASE_TOKEN_VERIFIER', 'firebase') == 'local':
+                    key_set = SigningKeySet(key_source_for(
+                        getattr(settings, 'FIREBASE_SIGNING_KEYS_URL', GOOGLE_SIGNING_KEYS_URL)
+                    ))
+                    key_set.start()
+                    _verifier = LocalTokenVerifier(key_set, _project_id()).verify_id_token
+                else:
+                    _verifier = firebase_auth.verify_id_token
+    return _verifier
+
+
+def warm_token_verifier(timeout=10):
+    """Build the verifier and, for local verification, wait for the first key set."""
+    verifier = get_id_token_verifier()
+    key_set = getattr(getattr(verifier, '__self__', None), 'key_set', None)
+    if key_set is not None:
+        key_set.wait_until_loaded(timeout)
@@ -0,0 +1,235 @@
+"""
+Minimal HTTP/1.1 load generator for the benchmark commands.
+
+Each simulated connection is an asyncio task holding one keep-alive
+connection and issuing requests back to back until the deadline, so the
+number of connections is the concurrency the server sees. Only the
+standard library is used.
+
+``serve`` starts the API under a serving profile in a child process, for
+benchmarks that compare profiles.
+"""
+import asyncio
+import contextlib
+import os
+import statistics
+import subprocess
+import sys
+import time
+import urllib.error
+import urllib.request
+from pathlib import Path
+from urllib.parse import urlsplit
+
+PROJECT_DIR = Path(__file__).resolve().parent.parent
+
+# Command line of each serving profile, as started by backend/entrypoint.sh
+SERVER_COMMANDS = {
+    'development': lambda bind: [sys.executable, 'manage.py', 'runserver', '--noreload', bind],
+    'production': lambda bind: [
+        'gunicorn', 'fitnesstracker.wsgi:application', '-c', 'gunicorn.conf.py', '--bind', bind,
+    ],
+}
+
+
+class ConnectionClosed(Exception):
+    pass
+
+
+async def read_response(reader):
+    """Read one response; return ``(status, headers, body bytes, keep_alive)``."""
+    status_line = await reader.readline()
+    if not status_line:
+        raise ConnectionClosed()
+    status = int(status_line.split()[1])
+
+    headers = {}
+    while True:
+        line = await reader.readline()
+        if line in (b'\r\n', b'\n', b''):
+            break
+        name, _, value = line.decode('latin-1').partition(':')
+        headers[name.strip().lower()] = value.strip()
+
+    if headers.get('transfer-encoding', '').lower() == 'chunked':
+        chunks = []
+        while True:
+            size = int((await reader.readline()).split(b';')[0], 16)
+            if size == 0:
+                await reader.readline()
+                break
+            chunks.append(await reader.readexactly(size))
+            await reader.readexactly(2)
+        body = b''.join(chunks)
+    elif 'content-length' in headers:
+        body = await reader.readexactly(int(headers['content-length']))
+    else:
+        body = await reader.read()
+        return status, headers, body, False
+
+    connection = headers.get('connection', '').lower()
+    if status_line.startswith(b'HTTP/1.0'):
+        return status, headers, body, connection == 'keep-alive'
+    return status, headers, body, connection != 'close'
+
+
+class Client:
+    """One keep-alive connection to ``base_url``."""
+
+    def __init__(self, base_url, headers=None):
+        parts = urlsplit(base_url)
+        self.host = parts.hostname
+        self.port = parts.port or 80
+        self.prefix = parts.path.rstrip('/')
+        self.headers = dict(headers or {})
+        self.reader = self.writer = None
+
+    async def request(self, path, method='GET', body=None, headers=None):
+        if self.writer is None:
+            self.reader, self.writer = await asyncio.open_connection(self.host, self.port)
+
+        lines = [f'{method} {self.prefix}{path} HTTP/1.1', f'Host: {self.host}:{self.port}']
+        for name, value in {**self.headers, **(headers or {})}.items():
+            lines.append(f'{name}: {value}')
+        if body is not None:
+            lines.append(f'Content-Length: {len(body)}')
+        self.writer.write(('\r\n'.join(lines) + '\r\n\r\n').encode('latin-1') + (body or b''))
+
+        try:
+            status, response_headers, response_body, keep_alive = await read_response(self.reader)
+        except (ConnectionClosed, asyncio.IncompleteReadError, ConnectionError):
+            await self.close()
+            raise
+        if not keep_alive:
+            await self.close()
+        return status, response_headers, response_body
+
+    async def close(self):
+        if self.writer is not None:
+            self.writer.close()
+            try:
+                await self.writer.wait_closed()
+            except ConnectionError:
+                pass
+        self.reader = self.writer = None
+
+
+def summarize(latencies, errors, elapsed, query_counts=()):
+    """Throughput, latency percentiles (milliseconds) and database queries of one run."""
+    summary = {
+        'requests': len(latencies),
+        'errors': errors,
+        'seconds': round(elapsed, 3),
+        'requests_per_second': round(len(latencies) / elapsed, 1) if elapsed else 0.0,
+    }
+    if len(latencies) >= 2:
+        quantiles = statistics.quantiles(latencies, n=100)
+        summary.update({
+            'p50_ms': round(quantiles[49], 3),
+            'p90_ms': round(quantiles[89], 3),
+            'p95_ms': round(quantiles[94], 3),
+            'p99_ms': round(quantiles[98], 3),
+            'max_ms': round(max(latencies), 3),
+        })
+    if query_counts:
+        summary.update({
+            'queries_per_request': round(statistics.fmean(query_counts), 2),
+            'queries_max': max(query_counts),
+        })
+    return summary
+
+
+async def run_load(base_url, requests, connections, duration, headers=None):
+    """
+    Issue ``requests`` (a list of ``(method, path, body)`` or
+    ``(method, path, body, headers)``, cycled) from ``connections``
+    concurrent connections for ``duration`` seconds. Connections take
+    requests in turn, so each one is sent once per cycle.
+
+    A response with a status of 400 or above counts as an error and is not
+    included in the latencies. Query counts are collected when the server
+    reports them in an ``X-Query-Count`` header (see app/benchmarks).
+    """
+    latencies = []
+    query_counts = []
+    errors = 0
+    deadline = time.perf_counter() + duration
+
+    async def worker(offset):
+        nonlocal errors
+        client = Client(base_url, headers)
+        index = offset
+        try:
+            while time.perf_counter() < deadline:
+                method, path, body, *extra = requests[index % len(requests)]
+                index += connections
+                started = time.perf_counter()
+                try:
+                    status, response_headers, _ = await client.request(path, method, body, *extra)
+                except (ConnectionClosed, asyncio.IncompleteReadError, OSError):
+                    errors += 1
+                    continue
+                if status >= 400:
+                    errors += 1
+                else:
+                    latencies.append((time.perf_counter() - started) * 1000)
+                    if 'x-query-count' in response_headers:
+                        query_counts.append(int(response_headers['x-query-count']))
+        finally:
+            await client.close()
+
+    started = time.perf_counter()
+    await asyncio.gather(*(worker(offset) for offset in range(connections)))
+    return summarize(latencies, errors, time.perf_counter() - started, query_counts)
+
+
+@contextlib.contextmanager
+def serve(profile, bind, env=None):
+    """Run the API under ``profile`` on ``bind`` (host:port) for the duration of the block."""
+    process = subprocess.Popen(
+        SERVER_COMMANDS[profile](bind),
+        cwd=PROJECT_DIR,
+        env={**os.environ, 'SERVING_PROFILE': profile, **(env or {})},
+        stdout=subprocess.DEVNULL,
+        stderr=subprocess.DEVNULL,
+    )
+    try:
+        yield process
+    finally:
+        process.terminate()
+        try:
+            process.wait(timeout=30)
+        except subprocess.TimeoutExpired:
+            process.kill()
+            process.wait()
+
+
+def timed_get(url, headers=None, timeout=30):
+    """``(status, milliseconds)`` of one GET on a fresh connection; status 0 if nothing answered."""
+    started = time.perf_counter()
+    try:
+        with urllib.request.urlopen(urllib.request.Request(url, headers=headers or {}), timeout=timeout) as response:
+            response.read()
+            status = response.status
+    except urllib.error.HTTPError as e:
+        status = e.code
+    except (urllib.error.URLError, ConnectionError):
+        status = 0
+    return status, (time.perf_counter() - started) * 1000
+
+
+def wait_until_ready(url, process, timeout=120, interval=0.05):
+    """
+    Poll ``url`` until it answers below 500. Return ``(status, milliseconds)``
+    of that first answer; raise RuntimeError if ``process`` exits or
+    ``timeout`` seconds pass first.
+    """
+    deadline = time.perf_counter() + timeout
+    while time.perf_counter() < deadline:
+        if process.poll() is not None:
+            raise RuntimeError(f'Server exited with status {process.returncode} before it was ready.')
+        status, elapsed = timed_get(url)
+        if 0 < status < 500:
+            return status, elapsed
+        time.sleep(interval)
+    raise RuntimeError(f'{url} was not ready after {timeout} seconds.')
@@ -0,0 +1,56 @@
+import asyncio
+import json
+
+from django.core.management.base import BaseCommand, CommandError
+
+from app.loadgen import run_load
+
+
+class Command(BaseCommand):
+    help = (
+        "Compare throughput and p99 latency of the read-heavy endpoints served over WSGI "
+        "(sync APIViews) and ASGI (async views) at several connection counts. Start both "
+        "servers first, e.g. `gunicorn fitnesstracker.wsgi -b :8000 -w 4` and "
+        "`SERVE_ASYNC_VIEWS=1 uvicorn fitnesstracker.asgi:application --port 8001 --workers 4`."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--wsgi-url", default="http://localhost:8000")
+        parser.add_argument("--asgi-url", default="http://localhost:8001")
+        parser.add_argument("--token", required=True, help="Firebase ID token sent as the bearer token")
+        parser.add_argument("--connections", default="1,10,50,100", help="Comma-separated connection counts")
+        parser.add_argument("--duration", type=float, default=10.0, help="Seconds per run")
+        parser.add_argument("--start-date", default="2024-01-01")
+        parser.add_argument("--end-date", default="2024-01-07")
+        parser.add_argument("--json", action="store_true", help="Print results as JSON")
+
+    def handle(self, *args, **options):
+        start, end = options["start_date"], options["end_date"]
+        requests = [
+            ("GET", f"/api/users/me/dashboard/?start_date={start}&end_date={end}", None),
+            ("GET", f"/api/exercises/logs/by-date/?workout_date={end}", None),
+            ("GET", f"/api/exercises/logs/by-date-range/?start_date={start}&end_date={end}", None),
+            ("GET", f"/api/exercises/muscle-percentage/by-date/?workout_date={end}", None),
+            ("GET", f"/api/exercises/muscle-percentage/by-date-range/?start_date={start}&end_date={end}", None),
+        ]
+        headers = {"Authorization": f"Bearer {options['token']}", "Accept": "application/json"}
+
+        try:
+            connection_counts = [int(count) for count in options["connections"].split(",")]
+        except ValueError:
+            raise CommandError("--connections must be comma-separated integers.")
+
+        results = []
+        for server, url in (("wsgi", options["wsgi_url"]), ("asgi", options["asgi_url"])):
+            for connections in connection_counts:
+                summary = asyncio.run(run_load(url, requests, connections, options["duration"], headers))
+                results.append({"server": server, "connections": connections, **summary})
+                if not options["json"]:
+                    self.stdout.write(
+                        f"{server} x{connections:<4} {summary['requests_per_second']:>9.1f} req/s  "
+                        f"p50 {summary.get('p50_ms', 0):>8.2f} ms  p99 {summary.get('p99_ms', 0):>8.2f} ms  "
+                        f"errors {summary['errors']}"
+                    )
+
+        if options["json"]:
+            self.stdout.write(json.dumps(results, indent=2))
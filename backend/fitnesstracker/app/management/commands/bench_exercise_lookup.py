@@ -0,0 +1,41 @@
+import random
+import time
+
+from django.core.management.base import BaseCommand
+from django.db import connection
+
+from app.models import Exercise, normalize_exercise_id
+
+
+class Command(BaseCommand):
+    help = "Compare query plans and latency of id__iexact versus id_key exercise lookups"
+
+    def add_arguments(self, parser):
+        parser.add_argument("--iterations", type=int, default=2000)
+
+    def handle(self, *args, **options):
+        ids = list(Exercise.objects.values_list("id", flat=True))
+        if not ids:
+            self.stderr.write("No exercises loaded; run load_exercises first.")
+            return
+
+        sample = random.choice(ids).upper()
+        lookups = {
+            "id__iexact": lambda value: Exercise.objects.filter(id__iexact=value),
+            "id_key": lambda value: Exercise.objects.filter(id_key=normalize_exercise_id(value)),
+        }
+
+        for label, lookup in lookups.items():
+            self.stdout.write(self.style.MIGRATE_HEADING(f"{label}: {lookup(sample).query}"))
+            explain_options = {"analyze": True} if connection.vendor == "postgresql" else {}
+            self.stdout.write(lookup(sample).explain(**explain_options))
+
+            queries = [random.choice(ids).upper() for _ in range(options["iterations"])]
+            start = time.perf_counter()
+            for value in queries:
+                lookup(value).first()
+            elapsed = time.perf_counter() - start
+            self.stdout.write(
+                f"{options['iterations']} lookups in {elapsed:.3f}s "
+                f"({elapsed / options['iterations'] * 1e6:.1f} us/lookup)\n"
+            )
@@ -0,0 +1,52 @@
+import random
+import time
+from datetime import date, time as clock, timedelta
+
+from django.core.management.base import BaseCommand
+
+from app.renderers import get_dumps
+
+
+class Command(BaseCommand):
+    help = "Compare JSON backends encoding large exercise log lists"
+
+    def add_arguments(self, parser):
+        parser.add_argument("--logs", type=int, default=10000, help="Logs per payload")
+        parser.add_argument("--repeat", type=int, default=20)
+
+    def handle(self, *args, **options):
+        start = date(2020, 1, 1)
+        payload = {
+            'message': 'Exercise logs retrieved successfully.',
+            'user_uid': 'benchmark-user',
+            'logs': [
+                {
+                    'log_id': i,
+                    'exercise_id': f'Exercise_{i % 870}',
+                    'exercise_name': f'Exercise {i % 870}',
+                    'workout_date': start + timedelta(days=i // 3),
+                    'workout_time': clock(random.randint(5, 22), random.choice([0, 15, 30, 45])),
+                    'sets': [
+                        {'set': n + 1, 'reps': random.randint(5, 15), 'weight': random.choice([0, 20, 42.5, 60, 100])}
+                        for n in range(random.randint(1, 5))
+                    ],
+                }
+                for i in range(options['logs'])
+            ],
+        }
+
+        results = {}
+        for backend in ('stdlib', 'orjson'):
+            dumps = get_dumps(backend)
+            encoded = dumps(payload)
+            started = time.perf_counter()
+            for _ in range(options['repeat']):
+                dumps(payload)
+            elapsed = (time.perf_counter() - started) / options['repeat']
+            results[backend] = elapsed
+            self.stdout.write(
+                f"{backend} ({dumps.__name__}): {elapsed * 1000:.2f} ms per payload, {len(encoded)} bytes"
+            )
+
+        if results['orjson'] and get_dumps('orjson') is not get_dumps('stdlib'):
+            self.stdout.write(self.style.SUCCESS(f"orjson speedup: {results['stdlib'] / results['orjson']:.1f}x"))
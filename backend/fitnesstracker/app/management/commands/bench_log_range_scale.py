@@ -0,0 +1,89 @@
+import random
+import statistics
+import time
+from datetime import date, timedelta
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection
+
+from app.catalog import get_catalog
+from app.models import ExerciseLog, User
+
+USER_PREFIX = "scale-bench-"
+
+
+class Command(BaseCommand):
+    help = (
+        "Grow the exercise log table in steps with synthetic rows and measure date-range query "
+        "latency at each size. Writes to the configured database; use a scratch database."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--steps", default="1000000,5000000,10000000,20000000",
+                            help="Comma-separated table sizes (rows) to measure at")
+        parser.add_argument("--users", type=int, default=10000)
+        parser.add_argument("--queries", type=int, default=200, help="Range queries per step")
+        parser.add_argument("--range-days", type=int, default=7)
+        parser.add_argument("--cleanup", action="store_true", help="Delete the synthetic rows and users afterwards")
+        parser.add_argument("--yes", action="store_true", help="Confirm writing synthetic data")
+
+    def handle(self, *args, **options):
+        if not options["yes"]:
+            raise CommandError("This inserts millions of rows; pass --yes to confirm.")
+
+        exercise_ids = [exercise.id for exercise in get_catalog()]
+        if not exercise_ids:
+            raise CommandError("No exercises loaded; run load_exercises first.")
+
+        user_uids = [f"{USER_PREFIX}{n}" for n in range(options["users"])]
+        User.objects.bulk_create(
+            [User(user_uid=uid, name="Scale Bench", email=f"{uid}@example.com", age=30,
+                  height=175, weight=75, fitness_level=2) for uid in user_uids],
+            ignore_conflicts=True,
+        )
+
+        first_day = date.today() - timedelta(days=5 * 365)
+        total_days = 5 * 365
+        table = ExerciseLog._meta.db_table
+        self.stdout.write("rows\tp50_ms\tp95_ms\tp99_ms")
+
+        for target in (int(step) for step in options["steps"].split(",")):
+            current = ExerciseLog.objects.count()
+            if target > current:
+                self.insert_rows(table, target - current, options["users"], exercise_ids, first_day, total_days)
+                with connection.cursor() as cursor:
+                    cursor.execute(f'ANALYZE "{table}"')
+
+            latencies = []
+            for _ in range(options["queries"]):
+                uid = random.choice(user_uids)
+                start = first_day + timedelta(days=random.randrange(total_days - options["range_days"]))
+                end = start + timedelta(days=options["range_days"])
+                started = time.perf_counter()
+                list(ExerciseLog.objects.filter(
+                    user_uid=uid, workout_date__range=[start, end]
+                ).values_list("log_id", "exercise_id", "workout_date", "workout_time", "set_numbers", "set_reps", "set_weights"))
+                latencies.append((time.perf_counter() - started) * 1000)
+
+            quantiles = statistics.quantiles(latencies, n=100)
+            self.stdout.write(f"{max(target, current)}\t{quantiles[49]:.2f}\t{quantiles[94]:.2f}\t{quantiles[98]:.2f}")
+
+        if options["cleanup"]:
+            ExerciseLog.objects.filter(user_uid__user_uid__startswith=USER_PREFIX).delete()
+            User.objects.filter(user_uid__startswith=USER_PREFIX).delete()
+
+    def insert_rows(self, table, count, users, exercise_ids, first_day, total_days):
+        """Insert ``count`` synthetic logs with one set-based INSERT ... SELECT."""
+        with connection.cursor() as cursor:
+            cursor.execute(
+                f'INSERT INTO "{table}" (user_uid_id, exercise_id_id, workout_date, workout_time, set_numbers, set_reps, set_weights) '
+                "SELECT %s || (random() * (%s - 1))::int, "
+                "       (%s::varchar[])[1 + floor(random() * %s)::int], "
+                "       %s::date + floor(random() * %s)::int, "
+                "       make_time(5 + floor(random() * 17)::int, floor(random() * 60)::int, 0), "
+                "       ARRAY(SELECT s FROM generate_series(1, 1 + (g % 5)) AS s), "
+                "       ARRAY(SELECT 5 + floor(random() * 10)::int FROM generate_series(1, 1 + (g % 5)) AS s), "
+                "       ARRAY(SELECT floor(random() * 40) * 2.5 FROM generate_series(1, 1 + (g % 5)) AS s) "
+                "FROM generate_series(1, %s) AS g",
+                [USER_PREFIX, users, exercise_ids, len(exercise_ids), first_day, total_days, count],
+            )
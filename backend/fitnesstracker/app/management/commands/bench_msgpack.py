@@ -0,0 +1,95 @@
+import gzip
+import json
+import random
+import time
+from datetime import date, time as clock, timedelta
+
+from django.core.management.base import BaseCommand, CommandError
+
+from app.renderers import get_dumps, msgpack, msgpack_dumps, orjson
+
+
+def timed(func, repeat):
+    started = time.perf_counter()
+    for _ in range(repeat):
+        func()
+    return (time.perf_counter() - started) / repeat * 1000
+
+
+class Command(BaseCommand):
+    help = "Compare JSON and MessagePack size, encode and parse cost for log responses and bulk uploads"
+
+    def add_arguments(self, parser):
+        parser.add_argument("--logs", type=int, default=5000, help="Logs per payload")
+        parser.add_argument("--repeat", type=int, default=20)
+
+    def handle(self, *args, **options):
+        if msgpack is None:
+            raise CommandError("msgpack is not installed.")
+
+        start = date(2020, 1, 1)
+        logs = [
+            {
+                'log_id': i,
+                'exercise_id': f'Exercise_{i % 870}',
+                'exercise_name': f'Exercise {i % 870}',
+                'workout_date': start + timedelta(days=i // 3),
+                'workout_time': clock(random.randint(5, 22), random.choice([0, 15, 30, 45])),
+                'sets': [
+                    {'set_number': n + 1, 'reps': random.randint(5, 15), 'weight': random.choice([0, 20, 42.5, 60, 100])}
+                    for n in range(random.randint(1, 5))
+                ],
+            }
+            for i in range(options['logs'])
+        ]
+        payloads = {
+            # What GET /api/exercises/logs/by-date-range/ returns
+            'log list response': {
+                'message': 'Exercise logs retrieved successfully.',
+                'user_uid': 'benchmark-user',
+                'logs': logs,
+            },
+            # What the app sends to POST /api/exercises/logs/bulk/
+            'bulk upload body': {
+                'logs': [
+                    {
+                        'client_id': f'client-{log["log_id"]}',
+                        'exercise_id': log['exercise_id'],
+                        'workout_date': log['workout_date'],
+                        'workout_time': log['workout_time'],
+                        'sets': log['sets'],
+                    }
+                    for log in logs
+                ],
+            },
+        }
+
+        repeat = options['repeat']
+        json_dumps = get_dumps()
+        json_loads = orjson.loads if orjson is not None else json.loads
+        for label, payload in payloads.items():
+            as_json = json_dumps(payload)
+            as_msgpack = msgpack_dumps(payload)
+            assert msgpack.unpackb(as_msgpack, raw=False) == json_loads(as_json), "payloads differ"
+
+            self.stdout.write(self.style.MIGRATE_HEADING(f"{label} ({options['logs']} logs)"))
+            rows = [
+                (
+                    f"json ({json_dumps.__name__})", as_json,
+                    timed(lambda: json_dumps(payload), repeat),
+                    timed(lambda: json_loads(as_json), repeat),
+                ),
+                (
+                    "msgpack", as_msgpack,
+                    timed(lambda: msgpack_dumps(payload), repeat),
+                    timed(lambda: msgpack.unpackb(as_msgpack, raw=False), repeat),
+                ),
+            ]
+            for name, body, encode_ms, parse_ms in rows:
+                self.stdout.write(
+                    f"{name:>20}: {len(body):>9} bytes ({len(gzip.compress(body)):>8} gzipped), "
+                    f"encode {encode_ms:.2f} ms, parse {parse_ms:.2f} ms"
+                )
+            self.stdout.write(self.style.SUCCESS(
+                f"msgpack is {len(as_msgpack) / len(as_json):.0%} of the JSON size"
+            ))
@@ -0,0 +1,83 @@
+import random
+import statistics
+import time
+
+from django.core.management.base import BaseCommand
+
+from app.search import get_name_index
+
+# What people actually type: partial names, misspellings and gym shorthand
+QUERIES = [
+    "bench pres", "benchpress", "incline bench", "db curl", "dumbell curl", "hammer curl",
+    "bb row", "bent over row", "barbel squat", "front squat", "goblet squat", "squats",
+    "deadlift", "romanain deadlift", "rdl", "sumo dead", "pullup", "pull up", "chin up",
+    "lat pulldwn", "seated cable row", "tricep extention", "skullcrusher", "dips",
+    "ohp", "shoulder pres", "lateral raise", "face pull", "shrugs", "calf raise",
+    "leg press", "leg curl", "leg extention", "lunges", "hip thrust", "glute bridge",
+    "plank", "crunches", "russian twist", "kb swing", "kettlebel snatch", "farmers walk",
+    "box jump", "burpee", "jump rope", "foam roll", "hamstring stretch", "cable fly",
+    "pec deck", "preacher curl",
+]
+
+
+def misspell(name, rng):
+    """A realistic typo of ``name``: truncated, a dropped, doubled or swapped letter."""
+    name = name.lower()
+    if len(name) < 4:
+        return name
+    i = rng.randrange(1, len(name) - 2)
+    return rng.choice([
+        name[:rng.randrange(4, len(name) + 1)],
+        name[:i] + name[i + 1:],
+        name[:i] + name[i] + name[i:],
+        name[:i] + name[i + 1] + name[i] + name[i + 2:],
+    ])
+
+
+class Command(BaseCommand):
+    help = "Measure latency of typo-tolerant exercise name search over the full catalog"
+
+    def add_arguments(self, parser):
+        parser.add_argument("--iterations", type=int, default=20000)
+        parser.add_argument("--target-ms", type=float, default=5.0, help="p99 latency budget")
+        parser.add_argument("--show", action="store_true", help="Print the top matches for each curated query")
+        parser.add_argument("--seed", type=int, default=0)
+
+    def handle(self, *args, **options):
+        started = time.perf_counter()
+        index = get_name_index()
+        build_ms = (time.perf_counter() - started) * 1000
+        if not index.exercises:
+            self.stderr.write("No exercises loaded; run load_exercises first.")
+            return
+        self.stdout.write(
+            f"Indexed {len(index.exercises)} names, {len(index.postings)} trigrams "
+            f"(catalog + index load {build_ms:.1f} ms)"
+        )
+
+        if options["show"]:
+            for query in QUERIES:
+                matches = ", ".join(f"{exercise.name} ({score})" for exercise, score in index.search(query, 3))
+                self.stdout.write(f"{query!r}: {matches or '-'}")
+
+        # Curated queries plus misspellings of real names
+        rng = random.Random(options["seed"])
+        corpus = QUERIES + [misspell(exercise.name, rng) for exercise in index.exercises]
+
+        latencies = []
+        misses = 0
+        for _ in range(options["iterations"]):
+            query = rng.choice(corpus)
+            started = time.perf_counter()
+            matches = index.search(query)
+            latencies.append((time.perf_counter() - started) * 1000)
+            misses += not matches
+
+        quantiles = statistics.quantiles(latencies, n=100)
+        p99 = quantiles[98]
+        self.stdout.write(
+            f"{options['iterations']} queries: p50 {quantiles[49]:.3f} ms, p95 {quantiles[94]:.3f} ms, "
+            f"p99 {p99:.3f} ms, max {max(latencies):.3f} ms; {misses} without results"
+        )
+        style = self.style.SUCCESS if p99 < options["target_ms"] else self.style.ERROR
+        self.stdout.write(style(f"p99 {'within' if p99 < options['target_ms'] else 'over'} {options['target_ms']} ms target"))
@@ -0,0 +1,80 @@
+import json
+import statistics
+import time
+
+from django.core.management.base import BaseCommand, CommandError
+
+from app.loadgen import SERVER_COMMANDS, serve, timed_get, wait_until_ready
+
+
+class Command(BaseCommand):
+    help = (
+        "Start the API under each serving profile and measure how long it takes to answer, "
+        "and how the first requests to the catalog endpoints compare with steady state"
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--profiles", default="development,production",
+                            help=f"Comma-separated serving profiles ({', '.join(SERVER_COMMANDS)})")
+        parser.add_argument("--bind", default="localhost:8100")
+        parser.add_argument("--workers", type=int, default=4, help="WEB_CONCURRENCY of the production profile")
+        parser.add_argument("--runs", type=int, default=3, help="Server starts per profile")
+        parser.add_argument("--samples", type=int, default=20, help="Steady-state requests per path")
+        parser.add_argument("--timeout", type=float, default=120.0, help="Seconds to wait for the server")
+        parser.add_argument("--json", action="store_true", help="Print results as JSON")
+
+    def handle(self, *args, **options):
+        profiles = options["profiles"].split(",")
+        unknown = set(profiles) - set(SERVER_COMMANDS)
+        if unknown:
+            raise CommandError(f"Unknown serving profiles: {', '.join(sorted(unknown))}")
+
+        base_url = f"http://{options['bind']}"
+        ready_path = "/api/exercises/"
+        paths = [
+            "/api/exercises/snapshot/",
+            "/api/exercises/search/?primary_muscles=chest&equipment=barbell",
+            "/api/exercises/search/names/?q=bench%20pres",
+            "/api/exercises/Barbell_Bench_Press_-_Medium_Grip/",
+        ]
+
+        results = []
+        for profile in profiles:
+            for run in range(options["runs"]):
+                env = {"WEB_CONCURRENCY": str(options["workers"])}
+                started = time.perf_counter()
+                with serve(profile, options["bind"], env) as process:
+                    try:
+                        _, ready_ms = wait_until_ready(base_url + ready_path, process, options["timeout"])
+                    except RuntimeError as e:
+                        raise CommandError(f"{profile}: {e}")
+                    result = {
+                        "profile": profile,
+                        "run": run + 1,
+                        "ready_seconds": round(time.perf_counter() - started, 3),
+                        "first_request_ms": round(ready_ms, 3),
+                        "paths": {},
+                    }
+                    for path in paths:
+                        first_status, first_ms = timed_get(base_url + path)
+                        steady = [timed_get(base_url + path)[1] for _ in range(options["samples"])]
+                        result["paths"][path] = {
+                            "status": first_status,
+                            "first_ms": round(first_ms, 3),
+                            "steady_p50_ms": round(statistics.median(steady), 3),
+                        }
+                results.append(result)
+
+                if not options["json"]:
+                    self.stdout.write(self.style.MIGRATE_HEADING(
+                        f"{profile} run {run + 1}: ready after {result['ready_seconds']:.2f} s "
+                        f"(first request {result['first_request_ms']:.1f} ms)"
+                    ))
+                    for path, timings in result["paths"].items():
+                        self.stdout.write(
+                            f"  {timings['status']} {path}: first {timings['first_ms']:.1f} ms, "
+                            f"then p50 {timings['steady_p50_ms']:.1f} ms"
+                        )
+
+        if options["json"]:
+            self.stdout.write(json.dumps(results, indent=2))
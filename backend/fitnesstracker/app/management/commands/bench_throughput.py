@@ -0,0 +1,131 @@
+import asyncio
+import json
+import threading
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection
+
+from app.loadgen import SERVER_COMMANDS, run_load, serve, wait_until_ready
+
+BACKENDS_SQL = """
+    SELECT pid FROM pg_stat_activity
+    WHERE datname = current_database() AND backend_type = 'client backend' AND pid <> pg_backend_pid()
+"""
+
+
+class ConnectionSampler(threading.Thread):
+    """Samples the server's Postgres backends while a load runs."""
+
+    def __init__(self, interval=0.05):
+        super().__init__(daemon=True)
+        self.interval = interval
+        self.stopped = threading.Event()
+        self.peak = 0
+        self.seen = set()
+
+    def run(self):
+        try:
+            with connection.cursor() as cursor:
+                while not self.stopped.wait(self.interval):
+                    cursor.execute(BACKENDS_SQL)
+                    pids = [pid for pid, in cursor.fetchall()]
+                    self.peak = max(self.peak, len(pids))
+                    self.seen.update(pids)
+        finally:
+            connection.close()
+
+    def stop(self):
+        self.stopped.set()
+        self.join()
+
+
+class Command(BaseCommand):
+    help = (
+        "Measure requests/s, latency and Postgres connections of the API under each serving "
+        "profile at several connection counts"
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--profiles", default="development,production",
+                            help=f"Comma-separated serving profiles ({', '.join(SERVER_COMMANDS)})")
+        parser.add_argument("--url", help="Benchmark an already running server instead of starting one per profile")
+        parser.add_argument("--bind", default="localhost:8100")
+        parser.add_argument("--workers", type=int, default=4, help="WEB_CONCURRENCY of the production profile")
+        parser.add_argument("--threads", type=int, default=4, help="WEB_THREADS of the production profile")
+        parser.add_argument("--connections", default="1,10,50", help="Comma-separated connection counts")
+        parser.add_argument("--duration", type=float, default=10.0, help="Seconds per run")
+        parser.add_argument("--token", help="Firebase ID token; also load the authenticated log and dashboard endpoints")
+        parser.add_argument("--start-date", default="2024-01-01")
+        parser.add_argument("--end-date", default="2024-01-07")
+        parser.add_argument("--json", action="store_true", help="Print results as JSON")
+
+    def handle(self, *args, **options):
+        try:
+            connection_counts = [int(count) for count in options["connections"].split(",")]
+        except ValueError:
+            raise CommandError("--connections must be comma-separated integers.")
+
+        requests = [
+            ("GET", "/api/exercises/", None),
+            ("GET", "/api/exercises/search/?primary_muscles=chest&equipment=barbell", None),
+            ("GET", "/api/exercises/search/names/?q=bench%20pres", None),
+            ("GET", "/api/exercises/Barbell_Bench_Press_-_Medium_Grip/", None),
+        ]
+        headers = {"Accept": "application/json"}
+        if options["token"]:
+            start, end = options["start_date"], options["end_date"]
+            requests += [
+                ("GET", f"/api/users/me/dashboard/?start_date={start}&end_date={end}", None),
+                ("GET", f"/api/exercises/logs/by-date-range/?start_date={start}&end_date={end}", None),
+                ("GET", f"/api/exercises/muscle-percentage/by-date-range/?start_date={start}&end_date={end}", None),
+            ]
+            headers["Authorization"] = f"Bearer {options['token']}"
+
+        results = []
+        if options["url"]:
+            results += self.measure("external", options["url"], requests, headers, connection_counts, options)
+        else:
+            profiles = options["profiles"].split(",")
+            unknown = set(profiles) - set(SERVER_COMMANDS)
+            if unknown:
+                raise CommandError(f"Unknown serving profiles: {', '.join(sorted(unknown))}")
+
+            base_url = f"http://{options['bind']}"
+            env = {"WEB_CONCURRENCY": str(options["workers"]), "WEB_THREADS": str(options["threads"])}
+            for profile in profiles:
+                with serve(profile, options["bind"], env) as process:
+                    try:
+                        wait_until_ready(base_url + "/api/exercises/", process)
+                    except RuntimeError as e:
+                        raise CommandError(f"{profile}: {e}")
+                    results += self.measure(profile, base_url, requests, headers, connection_counts, options)
+
+        if options["json"]:
+            self.stdout.write(json.dumps(results, indent=2))
+
+    def measure(self, profile, base_url, requests, headers, connection_counts, options):
+        results = []
+        for connections in connection_counts:
+            sampler = ConnectionSampler()
+            sampler.start()
+            try:
+                summary = asyncio.run(run_load(base_url, requests, connections, options["duration"], headers))
+            finally:
+                sampler.stop()
+            result = {
+                "profile": profile,
+                "connections": connections,
+                **summary,
+                "db_connections_peak": sampler.peak,
+                "db_backends_seen": len(sampler.seen),
+            }
+            results.append(result)
+
+            if not options["json"]:
+                self.stdout.write(
+                    f"{profile:>11} x{connections:<4} {result['requests_per_second']:>9.1f} req/s  "
+                    f"p50 {result.get('p50_ms', 0):>8.2f} ms  p99 {result.get('p99_ms', 0):>8.2f} ms  "
+                    f"errors {result['errors']}  db connections: peak {result['db_connections_peak']}, "
+                    f"{result['db_backends_seen']} distinct backends seen"
+                )
+        return results
@@ -0,0 +1,65 @@
+import math
+import time
+from datetime import date
+
+from django.core.management.base import BaseCommand
+
+from app.models import ExerciseLog
+from app.muscle_load import VOLUME_BACKENDS, get_muscle_load_engine, rollup_muscle_percentages
+
+# Percentages are rounded to 2 decimals, so backends that sum in a different
+# order can land one hundredth apart; the extra slack absorbs float error
+TOLERANCE = 0.01 + 1e-9
+
+
+def percentages_match(percentages, expected):
+    return percentages.keys() == expected.keys() and all(
+        math.isclose(percentages[muscle], expected[muscle], abs_tol=TOLERANCE) for muscle in expected
+    )
+
+
+class Command(BaseCommand):
+    help = "Check that every muscle-load backend and the rollup give the same percentages for each user's logs"
+
+    def add_arguments(self, parser):
+        parser.add_argument("--user", help="Only compare this user_uid")
+        parser.add_argument("--start-date", help="YYYY-MM-DD")
+        parser.add_argument("--end-date", help="YYYY-MM-DD")
+
+    def handle(self, *args, **options):
+        start_date = options["start_date"] or date.min
+        end_date = options["end_date"] or date.max
+        logs = ExerciseLog.objects.filter(workout_date__range=[start_date, end_date])
+        if options["user"]:
+            logs = logs.filter(user_uid__user_uid=options["user"])
+
+        engine = get_muscle_load_engine()
+        timings = {backend: 0.0 for backend in [*VOLUME_BACKENDS, "rollup"]}
+        mismatches = 0
+        user_uids = logs.order_by().values_list("user_uid", flat=True).distinct()
+
+        for user_uid in user_uids:
+            user_logs = logs.filter(user_uid=user_uid)
+            results = {}
+            for backend, volumes_for in VOLUME_BACKENDS.items():
+                start = time.perf_counter()
+                results[backend] = engine.percentages(volumes_for(user_logs))
+                timings[backend] += time.perf_counter() - start
+
+            start = time.perf_counter()
+            results["rollup"] = rollup_muscle_percentages(user_uid, start_date, end_date)
+            timings["rollup"] += time.perf_counter() - start
+
+            expected = results["python"]
+            for backend, percentages in results.items():
+                if not percentages_match(percentages, expected):
+                    mismatches += 1
+                    self.stderr.write(f"{user_uid}: {backend} differs from python: {percentages} != {expected}")
+
+        for backend, elapsed in timings.items():
+            self.stdout.write(f"{backend}: {elapsed:.3f}s")
+
+        if mismatches:
+            self.stderr.write(self.style.ERROR(f"{mismatches} mismatching results"))
+        else:
+            self.stdout.write(self.style.SUCCESS("All backends agree."))
@@ -1,34 +1,138 @@
+import hashlib
 import json
-from django.core.management.base import BaseCommand
 
-from app.models import Exercise
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+from django.db import transaction
+
+from app.catalog import ExerciseCatalog, bump_catalog_version
+from app.models import Exercise, ExerciseCatalogLoad, ExerciseLog, normalize_exercise_id
+from app.muscle_load import MuscleLoadEngine, rebuild_daily_muscle_loads
+
+# Columns rewritten when an exercise already exists
+UPDATE_FIELDS = [
+    "id_key", "name", "force", "level", "mechanic", "equipment", "primary_muscles",
+    "secondary_muscles", "instructions", "category", "images",
+]
+
+
+def exercise_from_item(item):
+    return Exercise(
+        id=item["id"],
+        id_key=normalize_exercise_id(item["id"]),  # bulk_create skips Exercise.save()
+        name=item["name"],
+        force=item.get("force"),  # Use .get to handle optional fields
+        level=item["level"],
+        mechanic=item.get("mechanic"),
+        equipment=item.get("equipment"),
+        primary_muscles=item["primaryMuscles"],
+        secondary_muscles=item["secondaryMuscles"],
+        instructions=item["instructions"],
+        category=item["category"],
+        images=item["images"],
+    )
+
 
 class Command(BaseCommand):
-    help = "Load exercises from a JSON file into the database"
+    help = (
+        "Load exercises from a JSON file into the database with batched upserts. "
+        "Reloading an unchanged file is a no-op."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--path", default=None,
+            help="JSON file to load (default: the EXERCISE_DATA_PATH setting)",
+        )
+        parser.add_argument("--batch-size", type=int, default=500)
+        parser.add_argument(
+            "--delete-missing", action="store_true",
+            help="Delete exercises that are not in the file, along with their logs "
+                 "(their users' daily muscle loads are rebuilt)",
+        )
+        parser.add_argument(
+            "--force", action="store_true",
+            help="Load even if the file's checksum matches the last load",
+        )
 
     def handle(self, *args, **options):
-        file_path = "/app/fitnesstracker/data/exercises.json"  # Adjust path as needed
-
-        # Open and load JSON file
-        with open(file_path, "r") as file:
-            data = json.load(file)
-
-        # Iterate through each exercise in the JSON array
-        for item in data:
-            # Extract fields from JSON
-            exercise = Exercise(
-                id=item["id"],
-                name=item["name"],
-                force=item.get("force"),  # Use .get to handle optional fields
-                level=item["level"],
-                mechanic=item.get("mechanic"),
-                equipment=item.get("equipment"),
-                primary_muscles=item["primaryMuscles"],
-                secondary_muscles=item["secondaryMuscles"],
-                instructions=item["instructions"],
-                category=item["category"],
-                images=item["images"],
+        file_path = options["path"] or settings.EXERCISE_DATA_PATH
+
+        try:
+            with open(file_path, "rb") as file:
+                content = file.read()
+        except OSError as e:
+            raise CommandError(f"Could not read {file_path}: {e}")
+        checksum = hashlib.sha256(content).hexdigest()
+
+        try:
+            data = json.loads(content)
+        except json.JSONDecodeError as e:
+            raise CommandError(f"{file_path} is not valid JSON: {e}")
+
+        # A later entry with the same id wins, as it did with one save() per item
+        exercises = {}
+        try:
+            for item in data:
+                exercises[item["id"]] = exercise_from_item(item)
+        except (KeyError, TypeError) as e:
+            raise CommandError(f"{file_path} has an invalid exercise: missing {e}")
+
+        stale = Exercise.objects.exclude(id__in=list(exercises))
+        last_load = ExerciseCatalogLoad.objects.order_by("-loaded_at").first()
+        unchanged = last_load is not None and last_load.checksum == checksum
+        if unchanged and not options["force"] and not (options["delete_missing"] and stale.exists()):
+            self.stdout.write(f"{file_path} is unchanged since {last_load.loaded_at}; nothing to do.")
+            return
+
+        with transaction.atomic():
+            # Logs of exercises whose muscles change or that get deleted no longer
+            # match the daily muscle loads; note whose they are before writing
+            changed = [
+                exercise_id
+                for exercise_id, primary_muscles, secondary_muscles in Exercise.objects.filter(
+                    id__in=list(exercises)
+                ).values_list("id", "primary_muscles", "secondary_muscles")
+                if (primary_muscles, secondary_muscles)
+                != (exercises[exercise_id].primary_muscles, exercises[exercise_id].secondary_muscles)
+            ]
+            affected_logs = ExerciseLog.objects.filter(exercise_id__in=changed)
+            if options["delete_missing"]:
+                affected_logs |= ExerciseLog.objects.filter(exercise_id__in=stale)
+            affected_users = list(affected_logs.order_by().values_list("user_uid", flat=True).distinct())
+
+            Exercise.objects.bulk_create(
+                exercises.values(),
+                batch_size=options["batch_size"],
+                update_conflicts=True,
+                unique_fields=["id"],
+                update_fields=UPDATE_FIELDS,
             )
-            exercise.save()
 
-        self.stdout.write(self.style.SUCCESS("Successfully loaded exercises!"))
+            deleted_exercises = deleted_logs = 0
+            if options["delete_missing"]:
+                deleted_logs = ExerciseLog.objects.filter(exercise_id__in=stale).count()
+                deleted_exercises = stale.count()
+                stale.delete()
+
+            if affected_users:
+                # Weighted by the catalog as written above, which other processes
+                # only see once this commits and the version is bumped
+                engine = MuscleLoadEngine(ExerciseCatalog.load(version=None))
+                rebuild_daily_muscle_loads(affected_users, engine=engine, batch_size=options["batch_size"])
+
+            ExerciseCatalogLoad.objects.create(checksum=checksum, path=file_path, exercises=len(exercises))
+
+        bump_catalog_version()
+        self.stdout.write(self.style.SUCCESS(
+            f"Successfully loaded {len(exercises)} exercises from {file_path}!"
+        ))
+        if deleted_exercises:
+            self.stdout.write(
+                f"Deleted {deleted_exercises} exercises missing from the file and {deleted_logs} of their logs."
+            )
+        if affected_users:
+            self.stdout.write(
+                f"Rebuilt the daily muscle loads of {len(affected_users)} users with logs of "
+                f"{len(changed)} exercises whose muscles changed or of deleted exercises."
+            )
@@ -0,0 +1,140 @@
+from datetime import date
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection, transaction
+
+from app.models import Exercise, ExerciseLog, User
+
+TABLE = ExerciseLog._meta.db_table
+OLD_TABLE = f"{TABLE}_unpartitioned"
+SEQUENCE = f"{TABLE}_partitioned_log_id_seq"
+
+
+def month_start(day):
+    return day.replace(day=1)
+
+
+def next_month(day):
+    return date(day.year + day.month // 12, day.month % 12 + 1, 1)
+
+
+def partition_name(month):
+    return f"{TABLE}_{month:%Y_%m}"
+
+
+class Command(BaseCommand):
+    help = (
+        "Optionally convert exercise logs to a Postgres table range-partitioned by month of "
+        "workout_date, create partitions ahead of time, and detach old ones for archiving"
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--convert", action="store_true",
+            help="Rebuild the exercise log table as a partitioned table (copies every row)",
+        )
+        parser.add_argument(
+            "--months-ahead", type=int, default=3,
+            help="Make sure partitions exist up to this many months after the current one",
+        )
+        parser.add_argument(
+            "--detach-before", metavar="YYYY-MM",
+            help="Detach (but keep) every monthly partition older than this month",
+        )
+
+    def handle(self, *args, **options):
+        with transaction.atomic(), connection.cursor() as cursor:
+            partitioned = self.is_partitioned(cursor)
+            if options["convert"]:
+                if partitioned:
+                    raise CommandError(f"{TABLE} is already partitioned.")
+                self.convert(cursor, options["months_ahead"])
+            elif not partitioned:
+                raise CommandError(f"{TABLE} is not partitioned; run with --convert first.")
+            else:
+                self.create_partitions(cursor, month_start(date.today()), options["months_ahead"])
+
+            if options["detach_before"]:
+                self.detach_before(cursor, options["detach_before"])
+
+    def is_partitioned(self, cursor):
+        cursor.execute(
+            "SELECT c.relkind = 'p' FROM pg_class c WHERE c.oid = to_regclass(%s)", [TABLE]
+        )
+        row = cursor.fetchone()
+        return bool(row and row[0])
+
+    def create_partitions(self, cursor, first_month, months_ahead):
+        last_month = month_start(date.today())
+        for _ in range(months_ahead):
+            last_month = next_month(last_month)
+
+        month = first_month
+        while month <= last_month:
+            cursor.execute(
+                f'CREATE TABLE IF NOT EXISTS "{partition_name(month)}" PARTITION OF "{TABLE}" '
+                "FOR VALUES FROM (%s) TO (%s)",
+                [month, next_month(month)],
+            )
+            month = next_month(month)
+        cursor.execute(f'CREATE TABLE IF NOT EXISTS "{TABLE}_default" PARTITION OF "{TABLE}" DEFAULT')
+
+    def convert(self, cursor, months_ahead):
+        self.stdout.write(f"Converting {TABLE} to a monthly range-partitioned table...")
+        cursor.execute(f'SELECT MIN(workout_date), MAX(log_id) FROM "{TABLE}"')
+        first_date, max_log_id = cursor.fetchone()
+
+        cursor.execute(f'ALTER TABLE "{TABLE}" RENAME TO "{OLD_TABLE}"')
+        cursor.execute('ALTER INDEX IF EXISTS "exerciselog_history_idx" RENAME TO "exerciselog_history_idx_unpartitioned"')
+
+        # The primary key of a partitioned table must include the partition
+        # key; log_id stays unique because it comes from a single sequence.
+        cursor.execute(
+            f'CREATE TABLE "{TABLE}" (LIKE "{OLD_TABLE}" INCLUDING DEFAULTS) '
+            "PARTITION BY RANGE (workout_date)"
+        )
+        cursor.execute(f'ALTER TABLE "{TABLE}" ADD PRIMARY KEY (log_id, workout_date)')
+        cursor.execute(f'CREATE SEQUENCE "{SEQUENCE}" OWNED BY "{TABLE}".log_id')
+        cursor.execute(f"ALTER TABLE \"{TABLE}\" ALTER COLUMN log_id SET DEFAULT nextval('\"{SEQUENCE}\"')")
+        cursor.execute(f"SELECT setval('\"{SEQUENCE}\"', %s)", [max_log_id or 1])
+        cursor.execute(
+            f'ALTER TABLE "{TABLE}" ADD FOREIGN KEY (user_uid_id) REFERENCES "{User._meta.db_table}" (user_uid) '
+            "DEFERRABLE INITIALLY DEFERRED"
+        )
+        cursor.execute(
+            f'ALTER TABLE "{TABLE}" ADD FOREIGN KEY (exercise_id_id) REFERENCES "{Exercise._meta.db_table}" (id) '
+            "DEFERRABLE INITIALLY DEFERRED"
+        )
+        cursor.execute(f'CREATE INDEX ON "{TABLE}" (exercise_id_id)')
+        cursor.execute(
+            f'CREATE INDEX "exerciselog_history_idx" ON "{TABLE}" '
+            "(user_uid_id, workout_date DESC, workout_time DESC, log_id DESC)"
+        )
+
+        self.create_partitions(cursor, month_start(first_date or date.today()), months_ahead)
+
+        cursor.execute(f'INSERT INTO "{TABLE}" SELECT * FROM "{OLD_TABLE}"')
+        self.stdout.write(f"Copied {cursor.rowcount} logs.")
+        cursor.execute(f'DROP TABLE "{OLD_TABLE}"')
+        self.stdout.write(self.style.SUCCESS(f"{TABLE} is now partitioned by month."))
+
+    def detach_before(self, cursor, month):
+        try:
+            cutoff = date.fromisoformat(f"{month}-01")
+        except ValueError:
+            raise CommandError("--detach-before must be YYYY-MM.")
+
+        cursor.execute(
+            "SELECT c.relname FROM pg_inherits i JOIN pg_class c ON c.oid = i.inhrelid "
+            "WHERE i.inhparent = to_regclass(%s) ORDER BY c.relname",
+            [TABLE],
+        )
+        for (name,) in cursor.fetchall():
+            suffix = name[len(TABLE) + 1:]
+            try:
+                partition_month = date.fromisoformat(suffix.replace("_", "-") + "-01")
+            except ValueError:
+                continue  # default partition
+            if partition_month < cutoff:
+                cursor.execute(f'ALTER TABLE "{TABLE}" DETACH PARTITION "{name}"')
+                self.stdout.write(f"Detached {name}; archive or drop it when ready.")
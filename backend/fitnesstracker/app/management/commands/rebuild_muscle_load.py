@@ -0,0 +1,20 @@
+from django.core.management.base import BaseCommand
+
+from app.muscle_load import rebuild_daily_muscle_loads
+
+
+class Command(BaseCommand):
+    help = "Rebuild the DailyMuscleLoad rollup from scratch from every exercise log"
+
+    def add_arguments(self, parser):
+        parser.add_argument("--user", help="Only rebuild this user_uid")
+        parser.add_argument("--batch-size", type=int, default=1000)
+
+    def handle(self, *args, **options):
+        user_uids = [options["user"]] if options["user"] else None
+        created, deleted, user_days = rebuild_daily_muscle_loads(user_uids, batch_size=options["batch_size"])
+
+        self.stdout.write(self.style.SUCCESS(
+            f"Rebuilt {created} daily muscle loads from {user_days} user-days "
+            f"(replaced {deleted})."
+        ))
@@ -0,0 +1,196 @@
+import asyncio
+import json
+import platform
+import subprocess
+import tempfile
+from datetime import datetime, timezone
+
+import django
+from django.core.management.base import BaseCommand, CommandError
+from django.db.models import Max, Min
+
+from app.benchmarks.auth import LocalFirebaseAuth
+from app.benchmarks.endpoints import ENDPOINTS, BenchmarkContext, uncovered_url_names
+from app.benchmarks.synthetic import USER_PREFIX, populate
+from app.loadgen import PROJECT_DIR, SERVER_COMMANDS, run_load, serve, wait_until_ready
+from app.models import ExerciseLog, User
+
+
+def git_revision():
+    """``(commit, dirty)`` of the working tree, or ``(None, None)`` outside git."""
+    try:
+        commit = subprocess.run(
+            ['git', 'rev-parse', 'HEAD'], cwd=PROJECT_DIR, capture_output=True, text=True, check=True,
+        ).stdout.strip()
+        status = subprocess.run(
+            ['git', 'status', '--porcelain'], cwd=PROJECT_DIR, capture_output=True, text=True, check=True,
+        ).stdout
+    except (OSError, subprocess.CalledProcessError):
+        return None, None
+    return commit, bool(status.strip())
+
+
+class Command(BaseCommand):
+    help = (
+        "Load every API endpoint with synthetic users and stubbed Firebase auth, and write "
+        "throughput, latency percentiles and query counts per endpoint as JSON. Writes "
+        "synthetic users and logs to the configured database; use a scratch database."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--users", type=int, default=20, help="Synthetic users to generate")
+        parser.add_argument("--years", type=float, default=3, help="Years of history per user")
+        parser.add_argument("--seed", type=int, default=0)
+        parser.add_argument("--reuse-data", action="store_true",
+                            help="Keep the synthetic users from a previous run instead of regenerating them")
+        parser.add_argument("--profile", default="production", choices=sorted(SERVER_COMMANDS))
+        parser.add_argument("--bind", default="localhost:8100")
+        parser.add_argument("--workers", type=int, default=4, help="WEB_CONCURRENCY of the production profile")
+        parser.add_argument("--threads", type=int, default=4, help="WEB_THREADS of the production profile")
+        parser.add_argument("--connections", default="1,16", help="Comma-separated connection counts")
+        parser.add_argument("--duration", type=float, default=5.0, help="Seconds per endpoint and connection count")
+        parser.add_argument("--warmup", type=float, default=1.0, help="Seconds of unmeasured load per endpoint first")
+        parser.add_argument("--endpoints", help="Only these comma-separated URL names")
+        parser.add_argument("--delete-pool", type=int, default=5000,
+                            help="Logs created up front for the DELETE endpoint to delete")
+        parser.add_argument("--output", default="-", help="Where to write the JSON results ('-' for stdout)")
+        parser.add_argument("--baseline", help="JSON results of an earlier run to compare against")
+        parser.add_argument("--yes", action="store_true", help="Confirm writing synthetic data")
+
+    def handle(self, *args, **options):
+        uncovered = uncovered_url_names()
+        if uncovered:
+            raise CommandError(f"No benchmark requests defined for: {', '.join(uncovered)} (see app/benchmarks/endpoints.py)")
+        if not options["yes"]:
+            raise CommandError("This writes synthetic users and logs to the database; pass --yes to confirm.")
+        try:
+            connection_counts = [int(count) for count in options["connections"].split(",")]
+        except ValueError:
+            raise CommandError("--connections must be comma-separated integers.")
+
+        endpoints = ENDPOINTS
+        if options["endpoints"]:
+            names = set(options["endpoints"].split(","))
+            endpoints = [endpoint for endpoint in ENDPOINTS if endpoint.name in names]
+            unknown = names - {endpoint.name for endpoint in ENDPOINTS}
+            if unknown:
+                raise CommandError(f"Unknown endpoints: {', '.join(sorted(unknown))}")
+
+        synthetic_logs = ExerciseLog.objects.filter(user_uid__user_uid__startswith=USER_PREFIX)
+        if options["reuse_data"] and synthetic_logs.exists():
+            dates = synthetic_logs.aggregate(start=Min("workout_date"), end=Max("workout_date"))
+            start_date, end_date = dates["start"], dates["end"]
+        else:
+            self.stderr.write(f"Generating {options['users']} users with {options['years']} years of logs...")
+            try:
+                dataset = populate(options["users"], options["years"], seed=options["seed"])
+            except ValueError as e:
+                raise CommandError(str(e))
+            start_date = datetime.fromisoformat(dataset["start_date"]).date()
+            end_date = datetime.fromisoformat(dataset["end_date"]).date()
+
+        with tempfile.TemporaryDirectory() as key_dir:
+            auth = LocalFirebaseAuth(key_dir)
+            context = BenchmarkContext(auth, start_date, end_date, options["seed"], options["delete_pool"])
+            dataset = {
+                "users": User.objects.filter(user_uid__startswith=USER_PREFIX).count(),
+                "logs": synthetic_logs.count(),
+                "start_date": start_date.isoformat(),
+                "end_date": end_date.isoformat(),
+                "seed": options["seed"],
+            }
+
+            env = {
+                **auth.server_env(),
+                "BENCHMARK_QUERY_COUNTS": "1",
+                "WEB_CONCURRENCY": str(options["workers"]),
+                "WEB_THREADS": str(options["threads"]),
+            }
+            base_url = f"http://{options['bind']}"
+            results, skipped = [], []
+            with serve(options["profile"], options["bind"], env) as process:
+                try:
+                    wait_until_ready(base_url + "/api/exercises/", process)
+                except RuntimeError as e:
+                    raise CommandError(str(e))
+                for endpoint in endpoints:
+                    if endpoint.external:
+                        skipped.append({"endpoint": endpoint.name, "method": endpoint.method, "reason": endpoint.external})
+                        continue
+                    results += self.measure(endpoint, context, base_url, connection_counts, options)
+
+        commit, dirty = git_revision()
+        report = {
+            "meta": {
+                "created_at": datetime.now(timezone.utc).isoformat(),
+                "commit": commit,
+                "dirty": dirty,
+                "python": platform.python_version(),
+                "django": django.get_version(),
+                "profile": options["profile"],
+                "workers": options["workers"],
+                "threads": options["threads"],
+                "connections": connection_counts,
+                "duration": options["duration"],
+                "dataset": dataset,
+            },
+            "results": results,
+            "skipped": skipped,
+        }
+
+        output = json.dumps(report, indent=2)
+        if options["output"] == "-":
+            self.stdout.write(output)
+        else:
+            with open(options["output"], "w") as file:
+                file.write(output + "\n")
+            self.stderr.write(f"Wrote {len(results)} results to {options['output']}")
+
+        if options["baseline"]:
+            self.compare(options["baseline"], results)
+
+    def measure(self, endpoint, context, base_url, connection_counts, options):
+        headers = {"Accept": "application/json"}
+        if options["warmup"] and endpoint.after_run is None:
+            asyncio.run(run_load(base_url, endpoint.build(context), 1, options["warmup"], headers))
+
+        results = []
+        for connections in connection_counts:
+            summary = asyncio.run(run_load(base_url, endpoint.build(context), connections, options["duration"], headers))
+            if endpoint.after_run is not None:
+                endpoint.after_run(context, summary["requests"] + summary["errors"])
+            results.append({"endpoint": endpoint.name, "method": endpoint.method, "connections": connections, **summary})
+            self.stderr.write(
+                f"{endpoint.label:<48} x{connections:<4} {summary['requests_per_second']:>9.1f} req/s  "
+                f"p50 {summary.get('p50_ms', 0):>8.2f}  p95 {summary.get('p95_ms', 0):>8.2f}  "
+                f"p99 {summary.get('p99_ms', 0):>8.2f} ms  queries {summary.get('queries_per_request', '-')}  "
+                f"errors {summary['errors']}"
+            )
+        return results
+
+    def compare(self, path, results):
+        """Print throughput and p99 of this run relative to the baseline run at ``path``."""
+        try:
+            with open(path) as file:
+                baseline = json.load(file)
+        except (OSError, ValueError) as e:
+            raise CommandError(f"Could not read baseline {path}: {e}")
+
+        before = {
+            (result["endpoint"], result["method"], result["connections"]): result
+            for result in baseline.get("results", [])
+        }
+        self.stderr.write(f"Compared with {baseline.get('meta', {}).get('commit') or path}:")
+        for result in results:
+            old = before.get((result["endpoint"], result["method"], result["connections"]))
+            if not old or not old.get("requests_per_second") or not old.get("p99_ms") or "p99_ms" not in result:
+                continue
+            throughput = result["requests_per_second"] / old["requests_per_second"] - 1
+            p99 = result["p99_ms"] / old["p99_ms"] - 1
+            line = (
+                f"{result['method']} {result['endpoint']:<44} x{result['connections']:<4} "
+                f"throughput {throughput:+7.1%}  p99 {p99:+7.1%}"
+            )
+            if old.get("queries_per_request") != result.get("queries_per_request"):
+                line += f"  queries {old.get('queries_per_request')} -> {result.get('queries_per_request')}"
+            self.stderr.write(line)
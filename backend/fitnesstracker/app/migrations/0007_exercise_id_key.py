@@ -0,0 +1,28 @@
+from django.db import migrations, models
+from django.db.models.functions import Lower
+
+
+def backfill_id_key(apps, schema_editor):
+    Exercise = apps.get_model('app', 'Exercise')
+    Exercise.objects.update(id_key=Lower('id'))
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('app', '0006_exerciselog'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='exercise',
+            name='id_key',
+            field=models.CharField(editable=False, max_length=255, null=True),
+        ),
+        migrations.RunPython(backfill_id_key, migrations.RunPython.noop),
+        migrations.AlterField(
+            model_name='exercise',
+            name='id_key',
+            field=models.CharField(editable=False, max_length=255, unique=True),
+        ),
+    ]
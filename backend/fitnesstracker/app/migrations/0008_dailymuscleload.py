@@ -0,0 +1,26 @@
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('app', '0007_exercise_id_key'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='DailyMuscleLoad',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('date', models.DateField()),
+                ('muscle', models.CharField(choices=[('abdominals', 'Abdominals'), ('abductors', 'Abductors'), ('adductors', 'Adductors'), ('biceps', 'Biceps'), ('calves', 'Calves'), ('chest', 'Chest'), ('forearms', 'Forearms'), ('glutes', 'Glutes'), ('hamstrings', 'Hamstrings'), ('lats', 'Lats'), ('lower back', 'Lower Back'), ('middle back', 'Middle Back'), ('neck', 'Neck'), ('quadriceps', 'Quadriceps'), ('shoulders', 'Shoulders'), ('traps', 'Traps'), ('triceps', 'Triceps')], max_length=20)),
+                ('volume', models.FloatField(default=0)),
+                ('user_uid', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, to='app.user')),
+            ],
+        ),
+        migrations.AddConstraint(
+            model_name='dailymuscleload',
+            constraint=models.UniqueConstraint(fields=('user_uid', 'date', 'muscle'), name='unique_daily_muscle_load'),
+        ),
+    ]
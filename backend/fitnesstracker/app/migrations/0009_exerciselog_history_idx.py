@@ -0,0 +1,15 @@
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('app', '0008_dailymuscleload'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='exerciselog',
+            index=models.Index(fields=['user_uid', '-workout_date', '-workout_time', '-log_id'], name='exerciselog_history_idx'),
+        ),
+    ]
@@ -0,0 +1,87 @@
+import django.contrib.postgres.fields
+from django.db import migrations, models
+
+# Split each jsonb set into the typed columns, keeping the sets' order.
+#
+# Legacy rows are coerced rather than validated, so that one odd row can't
+# block the deploy; sets_to_columns rejects such values for every write since.
+# A value counts when it is a JSON number or a string holding one. A
+# set_number that is missing, unusable or out of int range falls back to the
+# set's position, fractional set numbers and reps are rounded, and reps or
+# weights that are missing, unusable or out of range become 0.
+NUMBER_PATTERN = r'^\s*[-+]?([0-9]+\.?[0-9]*|\.[0-9]+)([eE][-+]?[0-9]{1,3})?\s*$'
+
+
+def legacy_number(key):
+    """SQL for the set ``s``'s ``key`` as numeric, or NULL if it isn't a number."""
+    return (
+        f"CASE WHEN jsonb_typeof(s->'{key}') = 'number' OR s->>'{key}' ~ '{NUMBER_PATTERN}' "
+        f"THEN (s->>'{key}')::numeric END"
+    )
+
+
+def legacy_int(key):
+    """SQL for ``legacy_number`` rounded to an int, or NULL outside the int range."""
+    number = f"round({legacy_number(key)})"
+    return f"CASE WHEN {number} BETWEEN -2147483648 AND 2147483647 THEN {number}::int END"
+
+
+def legacy_float(key):
+    """SQL for ``legacy_number`` as a float8, or NULL outside its range."""
+    number = legacy_number(key)
+    return f"CASE WHEN abs({number}) < 1e300 THEN {number}::float8 END"
+
+
+SPLIT_SETS_SQL = f"""
+UPDATE app_exerciselog SET
+    set_numbers = ARRAY(
+        SELECT COALESCE({legacy_int('set_number')}, ord::int)
+        FROM unnest(sets) WITH ORDINALITY AS t(s, ord) ORDER BY ord
+    ),
+    set_reps = ARRAY(
+        SELECT COALESCE({legacy_int('reps')}, 0)
+        FROM unnest(sets) WITH ORDINALITY AS t(s, ord) ORDER BY ord
+    ),
+    set_weights = ARRAY(
+        SELECT COALESCE({legacy_float('weight')}, 0)
+        FROM unnest(sets) WITH ORDINALITY AS t(s, ord) ORDER BY ord
+    )
+"""
+
+JOIN_SETS_SQL = """
+UPDATE app_exerciselog SET
+    sets = ARRAY(
+        SELECT jsonb_build_object('set_number', n, 'reps', r, 'weight', w)
+        FROM unnest(set_numbers, set_reps, set_weights) WITH ORDINALITY AS t(n, r, w, ord) ORDER BY ord
+    )
+"""
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('app', '0009_exerciselog_history_idx'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='exerciselog',
+            name='set_numbers',
+            field=django.contrib.postgres.fields.ArrayField(base_field=models.IntegerField(), default=list, help_text='Set number of each set', size=None),
+        ),
+        migrations.AddField(
+            model_name='exerciselog',
+            name='set_reps',
+            field=django.contrib.postgres.fields.ArrayField(base_field=models.IntegerField(), default=list, help_text='Reps of each set', size=None),
+        ),
+        migrations.AddField(
+            model_name='exerciselog',
+            name='set_weights',
+            field=django.contrib.postgres.fields.ArrayField(base_field=models.FloatField(), default=list, help_text='Weight of each set', size=None),
+        ),
+        migrations.RunSQL(SPLIT_SETS_SQL, JOIN_SETS_SQL),
+        migrations.RemoveField(
+            model_name='exerciselog',
+            name='sets',
+        ),
+    ]
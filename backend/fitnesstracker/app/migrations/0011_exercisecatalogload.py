@@ -0,0 +1,24 @@
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('app', '0010_exerciselog_typed_sets'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ExerciseCatalogLoad',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('checksum', models.CharField(max_length=64)),
+                ('path', models.CharField(max_length=255)),
+                ('exercises', models.IntegerField()),
+                ('loaded_at', models.DateTimeField(auto_now_add=True)),
+            ],
+            options={
+                'get_latest_by': 'loaded_at',
+            },
+        ),
+    ]
@@ -1,5 +1,13 @@
+import math
+
 from django.db import models
 from django.contrib.postgres.fields import ArrayField
+
+
+def normalize_exercise_id(exercise_id):
+    """Canonical form used to match exercise ids case-insensitively."""
+    return str(exercise_id).lower()
+
     
 class User(models.Model):
     user_uid = models.CharField(primary_key=True)
@@ -81,6 +89,7 @@ class Exercise(models.Model):
     ]
 
     id = models.CharField(max_length=255, primary_key=True)
+    id_key = models.CharField(max_length=255, unique=True, editable=False)  # Lowercased id, indexed for case-insensitive lookups
     name = models.CharField(max_length=255)
     force = models.CharField(
         max_length=10, choices=FORCE_CHOICES, null=True, blank=True
@@ -98,9 +107,86 @@ class Exercise(models.Model):
     category = models.CharField(max_length=50, choices=CATEGORY_CHOICES)
     images = models.JSONField()
 
+    def save(self, *args, **kwargs):
+        self.id_key = normalize_exercise_id(self.id)
+        super().save(*args, **kwargs)
+
     def __str__(self):
         return self.name
 
+
+SET_FIELDS = ('set_number', 'reps', 'weight')
+
+
+def _is_number(value):
+    return isinstance(value, (int, float)) and not isinstance(value, bool) and math.isfinite(value)
+
+
+def sets_to_columns(sets):
+    """
+    Split API sets into ``(set_numbers, set_reps, set_weights)`` lists.
+
+    ``None`` means no sets, and a missing ``set_number`` defaults to the set's
+    position. Raises ``ValueError`` for anything that is not a list of
+    objects with whole-number ``reps``, numeric ``weight`` and no other fields
+    than ``SET_FIELDS``.
+    """
+    if sets is None:
+        sets = []
+    if not isinstance(sets, (list, tuple)):
+        raise ValueError('sets must be a list.')
+    numbers, reps, weights = [], [], []
+    for position, exercise_set in enumerate(sets, start=1):
+        if not isinstance(exercise_set, dict) or not all(_is_number(exercise_set.get(key)) for key in ('reps', 'weight')):
+            raise ValueError('sets must be a list of objects with numeric reps and weight.')
+        unknown = sorted(str(key) for key in exercise_set if key not in SET_FIELDS)
+        if unknown:
+            raise ValueError(f"Unknown set fields: {', '.join(unknown)}.")
+        set_number = exercise_set.get('set_number')
+        if set_number is None:
+            set_number = position
+        try:
+            number = int(set_number)
+        except (TypeError, ValueError, OverflowError):
+            raise ValueError('set_number must be an integer.')
+        if isinstance(set_number, float) and set_number != number:
+            raise ValueError('set_number must be an integer.')
+        if exercise_set['reps'] != int(exercise_set['reps']):
+            raise ValueError('reps must be a whole number.')
+        numbers.append(number)
+        reps.append(int(exercise_set['reps']))
+        weights.append(float(exercise_set['weight']))
+    return numbers, reps, weights
+
+
+def sets_from_columns(set_numbers, set_reps, set_weights):
+    """
+    Rebuild API sets from the typed columns.
+
+    Weights are stored as floats, so a client's ``60`` and ``60.0`` read back
+    the same way: whole weights come back as ints (``60``), which is what the
+    app sends, and others as floats (``62.5``).
+    """
+    return [
+        {'set_number': number, 'reps': reps, 'weight': int(weight) if weight.is_integer() else weight}
+        for number, reps, weight in zip(set_numbers or (), set_reps or (), set_weights or ())
+    ]
+
+
+class ExerciseCatalogLoad(models.Model):
+    """One run of ``load_exercises``; the latest checksum makes reloading an unchanged file a no-op."""
+    checksum = models.CharField(max_length=64)  # SHA-256 of the source file
+    path = models.CharField(max_length=255)
+    exercises = models.IntegerField()  # Number of exercises in the file
+    loaded_at = models.DateTimeField(auto_now_add=True)
+
+    class Meta:
+        get_latest_by = 'loaded_at'
+
+    def __str__(self):
+        return f"Catalog load {self.checksum[:12]} at {self.loaded_at}"
+
+
 class ExerciseLog(models.Model):
     log_id = models.AutoField(primary_key=True)  # Auto-incremented primary key
     user_uid = models.ForeignKey(User, on_delete=models.CASCADE, to_field='user_uid')  # FK to User by Firebase UID
@@ -108,18 +194,41 @@ class ExerciseLog(models.Model):
     workout_date = models.DateField()  # Date of the workout
     workout_time = models.TimeField()  # Time of the workout
 
-    # Array of objects for sets
-    sets = ArrayField(
-        models.JSONField(),  # Each set is represented as a JSON object
-        default=list,  # Default is an empty list
-        help_text='Array of objects with set details (set number, reps, weight)'
-    )
+    # Sets as parallel typed arrays: set i is (set_numbers[i], set_reps[i], set_weights[i])
+    set_numbers = ArrayField(models.IntegerField(), default=list, help_text='Set number of each set')
+    set_reps = ArrayField(models.IntegerField(), default=list, help_text='Reps of each set')
+    set_weights = ArrayField(models.FloatField(), default=list, help_text='Weight of each set')
 
-    def __str__(self):
-        return f"Log {self.log_id} for User {self.user_uid_id} - Exercise {self.exercise_id_id}"
+    @property
+    def sets(self):
+        """Sets in the API's ``{'set_number', 'reps', 'weight'}`` form."""
+        return sets_from_columns(self.set_numbers, self.set_reps, self.set_weights)
 
+    @sets.setter
+    def sets(self, sets):
+        self.set_numbers, self.set_reps, self.set_weights = sets_to_columns(sets)
 
+    class Meta:
+        indexes = [
+            # Matches the keyset ordering of a user's log history (app/pagination.py)
+            models.Index(fields=['user_uid', '-workout_date', '-workout_time', '-log_id'], name='exerciselog_history_idx'),
+        ]
 
+    def __str__(self):
+        return f"Log {self.log_id} for User {self.user_uid_id} - Exercise {self.exercise_id_id}"
 
 
+class DailyMuscleLoad(models.Model):
+    """Weighted set volume per user, day and muscle, maintained as logs change."""
+    user_uid = models.ForeignKey(User, on_delete=models.CASCADE, to_field='user_uid')
+    date = models.DateField()
+    muscle = models.CharField(max_length=20, choices=Exercise.MUSCLE_CHOICES)
+    volume = models.FloatField(default=0)
 
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(fields=['user_uid', 'date', 'muscle'], name='unique_daily_muscle_load'),
+        ]
+
+    def __str__(self):
+        return f"{self.muscle} load for User {self.user_uid_id} on {self.date}"
@@ -0,0 +1,346 @@
+"""
+Shared muscle-load aggregation engine.
+
+A set of ``reps`` x ``weight`` loads each primary muscle of its exercise twice
+and each secondary muscle once. Rather than applying that rule set by set,
+logs are reduced to a total volume per exercise and the per-muscle load is a
+single product of that volume vector with a fixed exercise x muscle weight
+matrix built once per catalog version.
+
+The same per-muscle loads are also kept per user and day in
+``DailyMuscleLoad``: log writes apply their delta through
+``apply_log_change`` and the percentage endpoints read the rollup by default.
+"""
+import numpy as np
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.db import connection, transaction
+from django.db.models import FloatField, Sum
+from django.db.models.expressions import RawSQL
+
+from .catalog import MUSCLE_GROUPS, get_catalog, resolve_exercises
+from .models import DailyMuscleLoad, ExerciseLog, User, normalize_exercise_id
+
+PRIMARY_WEIGHT = 2
+SECONDARY_WEIGHT = 1
+
+# Load (in reps x weight units) that corresponds to 100% on the heat map
+FULL_LOAD = 10000
+
+# Rollup volumes below this are float residue of logs that were removed
+EMPTY_LOAD_TOLERANCE = 1e-6
+
+_MUSCLE_INDEX = {muscle: i for i, muscle in enumerate(MUSCLE_GROUPS)}
+
+
+def set_volume(set_reps, set_weights):
+    """Total ``reps * weight`` over a log's typed set columns."""
+    return sum(reps * weight for reps, weight in zip(set_reps or (), set_weights or ()))
+
+
+def exercise_volumes(rows):
+    """
+    Reduce ``(exercise_id, set_reps, set_weights)`` rows to ``{exercise_id: volume}``.
+
+    Every exercise that appears in ``rows`` gets an entry, even when its logs
+    have no sets, so an empty result means there were no logs at all.
+    """
+    volumes = {}
+    for exercise_id, set_reps, set_weights in rows:
+        volumes[exercise_id] = volumes.get(exercise_id, 0) + set_volume(set_reps, set_weights)
+    return volumes
+
+
+# Volume of one log computed by Postgres from its int[] reps and float8[] weights
+LOG_VOLUME_SQL = (
+    "(SELECT COALESCE(SUM(r * w), 0) "
+    f'FROM unnest("{ExerciseLog._meta.db_table}"."set_reps", "{ExerciseLog._meta.db_table}"."set_weights") AS t(r, w))'
+)
+
+
+def sql_exercise_volumes(exercise_logs):
+    """
+    ``{exercise_id: volume}`` for an ``ExerciseLog`` queryset, summed in SQL.
+
+    Reps and weights are unnested and grouped by exercise inside Postgres, so only one
+    row per distinct exercise is returned.
+    """
+    rows = exercise_logs.order_by().values('exercise_id').annotate(
+        volume=Sum(RawSQL(LOG_VOLUME_SQL, ()), output_field=FloatField())
+    ).values_list('exercise_id', 'volume')
+    return {exercise_id: volume or 0 for exercise_id, volume in rows}
+
+
+def python_exercise_volumes(exercise_logs, chunk_size=2000):
+    """``{exercise_id: volume}`` for an ``ExerciseLog`` queryset, summed in Python."""
+    rows = exercise_logs.values_list('exercise_id', 'set_reps', 'set_weights').iterator(chunk_size=chunk_size)
+    return exercise_volumes(rows)
+
+
+VOLUME_BACKENDS = {
+    'python': python_exercise_volumes,
+    'sql': sql_exercise_volumes,
+}
+
+
+def muscle_weights(exercise):
+    """Weight of each muscle in ``MUSCLE_GROUPS`` for one unit of volume on ``exercise``."""
+    weights = np.zeros(len(MUSCLE_GROUPS), dtype=np.float64)
+    for muscle in exercise.primary_muscles:
+        if muscle in _MUSCLE_INDEX:
+            weights[_MUSCLE_INDEX[muscle]] += PRIMARY_WEIGHT
+    for muscle in exercise.secondary_muscles:
+        if muscle in _MUSCLE_INDEX:
+            weights[_MUSCLE_INDEX[muscle]] += SECONDARY_WEIGHT
+    return weights
+
+
+class MuscleLoadEngine:
+    def __init__(self, catalog):
+        self.catalog = catalog
+        self.index = {}
+        self.matrix = np.zeros((len(catalog), len(MUSCLE_GROUPS)), dtype=np.float64)
+
+        for row, exercise in enumerate(catalog):
+            self.index[exercise.key] = row
+            self.matrix[row] = muscle_weights(exercise)
+
+    def volume_vector(self, volumes):
+        """Scatter ``{exercise_id: volume}`` into a vector over catalog rows."""
+        vector = np.zeros(len(self.index), dtype=np.float64)
+        for exercise_id, volume in volumes.items():
+            row = self.index.get(normalize_exercise_id(exercise_id))
+            if row is not None:
+                vector[row] += volume
+        return vector
+
+    def loads(self, volumes):
+        """
+        Per-muscle load, ordered like ``MUSCLE_GROUPS``.
+
+        Exercises missing from this engine's catalog (added since it was
+        loaded) are looked up in the database rather than counted as zero;
+        ``LookupError`` is raised for ids that don't exist at all.
+        """
+        loads = self.volume_vector(volumes) @ self.matrix
+        missing = [exercise_id for exercise_id in volumes if normalize_exercise_id(exercise_id) not in self.index]
+        if missing:
+            resolved = resolve_exercises(missing)
+            for exercise_id in missing:
+                exercise = resolved.get(normalize_exercise_id(exercise_id))
+                if exercise is None:
+                    raise LookupError(f'Unknown exercise {exercise_id!r}.')
+                loads = loads + volumes[exercise_id] * muscle_weights(exercise)
+        return loads
+
+    def percentages(self, volumes):
+        """``{muscle: percentage of FULL_LOAD}``, capped at 100."""
+        return percentages_from_loads(self.loads(volumes))
+
+
+def percentages_from_loads(loads):
+    """Map per-muscle loads, ordered like ``MUSCLE_GROUPS``, to capped percentages."""
+    return {
+        muscle: min(round((float(load) / FULL_LOAD) * 100, 2), 100)
+        for muscle, load in zip(MUSCLE_GROUPS, loads)
+    }
+
+
+_engine = None
+
+
+def get_muscle_load_engine():
+    """Engine for the current catalog snapshot, rebuilt when the catalog changes."""
+    global _engine
+    catalog = get_catalog()
+    engine = _engine
+    if engine is None or engine.catalog is not catalog:
+        engine = _engine = MuscleLoadEngine(catalog)
+    return engine
+
+
+def muscle_percentages_for_logs(exercise_logs, backend=None):
+    """
+    Muscle percentages for an ``ExerciseLog`` queryset, or None if it is empty.
+
+    ``backend`` selects where per-exercise volume is summed (see
+    ``VOLUME_BACKENDS``).
+    """
+    volumes = VOLUME_BACKENDS[backend or 'python'](exercise_logs)
+    if not volumes:
+        return None
+    return get_muscle_load_engine().percentages(volumes)
+
+
+def rollup_muscle_percentages(user_uid, start_date, end_date):
+    """Muscle percentages summed from ``DailyMuscleLoad``, or None if there are no logs."""
+    loads = dict(
+        DailyMuscleLoad.objects.filter(
+            user_uid=user_uid,
+            date__range=[start_date, end_date]
+        ).values('muscle').annotate(total=Sum('volume')).values_list('muscle', 'total')
+    )
+    # Rows at (about) zero volume, such as those written before emptied rows were deleted, aren't logs
+    if all(total < EMPTY_LOAD_TOLERANCE for total in loads.values()) and not ExerciseLog.objects.filter(
+        user_uid=user_uid,
+        workout_date__range=[start_date, end_date]
+    ).exists():
+        return None
+    return percentages_from_loads(loads.get(muscle, 0) for muscle in MUSCLE_GROUPS)
+
+
+def muscle_percentages_for_range(user_uid, start_date, end_date, backend=None):
+    """
+    Muscle percentages for a user's logs between two dates (inclusive).
+
+    ``backend`` is 'rollup' or one of ``VOLUME_BACKENDS`` and defaults to the
+    ``MUSCLE_LOAD_BACKEND`` setting.
+    """
+    backend = backend or getattr(settings, 'MUSCLE_LOAD_BACKEND', 'rollup')
+    if backend == 'rollup':
+        return rollup_muscle_percentages(user_uid, start_date, end_date)
+
+    exercise_logs = ExerciseLog.objects.filter(
+        user_uid=user_uid,
+        workout_date__range=[start_date, end_date]
+    )
+    return muscle_percentages_for_logs(exercise_logs, backend)
+
+
+async def amuscle_percentages_for_range(user_uid, start_date, end_date, backend=None):
+    """
+    ``muscle_percentages_for_range`` for async views. The rollup is read
+    with the async ORM; the raw-log backends run in a worker thread.
+    """
+    backend = backend or getattr(settings, 'MUSCLE_LOAD_BACKEND', 'rollup')
+    if backend != 'rollup':
+        return await sync_to_async(muscle_percentages_for_range)(user_uid, start_date, end_date, backend)
+
+    loads = {
+        muscle: total
+        async for muscle, total in DailyMuscleLoad.objects.filter(
+            user_uid=user_uid,
+            date__range=[start_date, end_date]
+        ).values('muscle').annotate(total=Sum('volume')).values_list('muscle', 'total')
+    }
+    # Rows at (about) zero volume, such as those written before emptied rows were deleted, aren't logs
+    if all(total < EMPTY_LOAD_TOLERANCE for total in loads.values()) and not await ExerciseLog.objects.filter(
+        user_uid=user_uid,
+        workout_date__range=[start_date, end_date]
+    ).aexists():
+        return None
+    return percentages_from_loads(loads.get(muscle, 0) for muscle in MUSCLE_GROUPS)
+
+
+UPSERT_DAILY_LOAD_SQL = (
+    f'INSERT INTO "{DailyMuscleLoad._meta.db_table}" (user_uid_id, date, muscle, volume) '
+    'VALUES (%s, %s, %s, %s) '
+    'ON CONFLICT (user_uid_id, date, muscle) DO UPDATE '
+    f'SET volume = "{DailyMuscleLoad._meta.db_table}".volume + EXCLUDED.volume'
+)
+
+# Deletes rows left at (about) zero volume once their logs are gone or moved,
+# so that a day without logs has no rollup rows
+DELETE_EMPTY_DAILY_LOADS_SQL = (
+    f'DELETE FROM "{DailyMuscleLoad._meta.db_table}" '
+    'WHERE user_uid_id = %s AND date = ANY(%s::date[]) AND volume < %s'
+)
+
+
+def log_snapshot(exercise_log):
+    """The parts of a log that determine its rollup contribution."""
+    return (
+        exercise_log.workout_date, exercise_log.exercise_id_id,
+        set_volume(exercise_log.set_reps, exercise_log.set_weights),
+    )
+
+
+def apply_log_change(user_uid, old=None, new=None):
+    """
+    Move a log's contribution in ``DailyMuscleLoad`` from ``old`` to ``new``.
+
+    Both are ``log_snapshot`` tuples; pass only ``new`` for a created log and
+    only ``old`` for a deleted one. Call inside the transaction that writes
+    the log so the rollup never disagrees with it.
+    """
+    apply_log_changes(
+        user_uid,
+        removed=[old] if old is not None else (),
+        added=[new] if new is not None else (),
+    )
+
+
+def apply_log_changes(user_uid, removed=(), added=()):
+    """Batch form of ``apply_log_change``: one upsert per touched day and muscle."""
+    engine = get_muscle_load_engine()
+    deltas = {}
+    for snapshots, sign in ((removed, -1), (added, 1)):
+        for workout_date, exercise_id, volume in snapshots:
+            loads = engine.loads({exercise_id: volume})
+            for muscle, load in zip(MUSCLE_GROUPS, loads):
+                if load:
+                    key = (str(workout_date), muscle)
+                    deltas[key] = deltas.get(key, 0) + sign * float(load)
+
+    rows = [(user_uid, date, muscle, delta) for (date, muscle), delta in deltas.items() if delta]
+    if rows:
+        with connection.cursor() as cursor:
+            cursor.executemany(UPSERT_DAILY_LOAD_SQL, rows)
+            emptied_dates = sorted({date for _, date, _, delta in rows if delta < 0})
+            if emptied_dates:
+                cursor.execute(DELETE_EMPTY_DAILY_LOADS_SQL, [user_uid, emptied_dates, EMPTY_LOAD_TOLERANCE])
+
+
+def rebuild_daily_muscle_loads(user_uids=None, engine=None, batch_size=1000):
+    """
+    Recompute ``DailyMuscleLoad`` from the logs of ``user_uids`` (every user
+    if None) with ``engine`` (the current catalog's by default).
+
+    The logs are read and the rollup replaced in one transaction, with the
+    logs locked against writes first, so a log saved meanwhile can't have its
+    ``apply_log_change`` delta overwritten. Returns ``(created, deleted,
+    user_days)``.
+    """
+    engine = engine or get_muscle_load_engine()
+    logs = ExerciseLog.objects.order_by()
+    rollup = DailyMuscleLoad.objects.all()
+
+    with transaction.atomic():
+        if user_uids is None:
+            # Waits for log writes in flight and blocks new ones until commit
+            with connection.cursor() as cursor:
+                cursor.execute(f'LOCK TABLE "{ExerciseLog._meta.db_table}" IN SHARE MODE')
+        else:
+            user_uids = list(user_uids)
+            # Locking the users blocks new logs (their foreign key check needs a
+            # share lock on the user row); FOR UPDATE below blocks edits and deletes
+            list(User.objects.select_for_update().filter(user_uid__in=user_uids).values_list('pk', flat=True))
+            logs = logs.filter(user_uid__in=user_uids).select_for_update()
+            rollup = rollup.filter(user_uid__in=user_uids)
+
+        # {(user_uid, date): {exercise_id: volume}}
+        daily_volumes = {}
+        rows = logs.values_list('user_uid', 'workout_date', 'exercise_id', 'set_reps', 'set_weights')
+        for user_uid, workout_date, exercise_id, set_reps, set_weights in rows.iterator(chunk_size=2000):
+            volumes = daily_volumes.setdefault((user_uid, workout_date), {})
+            volumes[exercise_id] = volumes.get(exercise_id, 0) + set_volume(set_reps, set_weights)
+
+        loads = [
+            DailyMuscleLoad(user_uid_id=user_uid, date=date, muscle=muscle, volume=float(load))
+            for (user_uid, date), volumes in daily_volumes.items()
+            for muscle, load in zip(MUSCLE_GROUPS, engine.loads(volumes))
+            if load
+        ]
+        deleted, _ = rollup.delete()
+        DailyMuscleLoad.objects.bulk_create(loads, batch_size=batch_size)
+    return len(loads), deleted, len(daily_volumes)
+
+
+def rebuild_daily_muscle_loads_on_commit(exercise_logs):
+    """
+    Rebuild the rollup of the users with any of ``exercise_logs`` once the
+    current transaction commits, by which time the catalog has been bumped.
+    """
+    user_uids = list(exercise_logs.order_by().values_list('user_uid', flat=True).distinct())
+    if user_uids:
+        transaction.on_commit(lambda: rebuild_daily_muscle_loads(user_uids))
@@ -0,0 +1,61 @@
+"""
+Keyset pagination over a user's exercise log history.
+
+Logs are ordered newest first by ``(workout_date, workout_time, log_id)`` and a
+page continues strictly after the last row of the previous one, using the
+matching ``exerciselog_history_idx`` index. Deep pages therefore cost the same
+as the first page, unlike OFFSET pagination.
+"""
+import base64
+import json
+from datetime import date, time
+
+from django.db.models import BooleanField
+from django.db.models.expressions import RawSQL
+
+HISTORY_ORDERING = ('-workout_date', '-workout_time', '-log_id')
+
+
+class InvalidCursor(ValueError):
+    pass
+
+
+def encode_log_cursor(exercise_log):
+    """Opaque cursor pointing just after ``exercise_log``."""
+    position = [
+        exercise_log.workout_date.isoformat(),
+        exercise_log.workout_time.isoformat(),
+        exercise_log.log_id,
+    ]
+    return base64.urlsafe_b64encode(json.dumps(position).encode()).decode().rstrip('=')
+
+
+def decode_log_cursor(cursor):
+    """``(workout_date, workout_time, log_id)`` from a cursor, or raise InvalidCursor."""
+    try:
+        padded = cursor + '=' * (-len(cursor) % 4)
+        workout_date, workout_time, log_id = json.loads(base64.urlsafe_b64decode(padded))
+        return date.fromisoformat(workout_date), time.fromisoformat(workout_time), int(log_id)
+    except (ValueError, TypeError):
+        raise InvalidCursor('Invalid cursor.')
+
+
+def paginate_logs(exercise_logs, cursor=None, page_size=50):
+    """
+    One page of ``exercise_logs`` in history order.
+
+    Returns ``(logs, next_cursor)``; ``next_cursor`` is None on the last page.
+    """
+    exercise_logs = exercise_logs.order_by(*HISTORY_ORDERING)
+    if cursor:
+        exercise_logs = exercise_logs.filter(RawSQL(
+            '("workout_date", "workout_time", "log_id") < (%s, %s, %s)',
+            decode_log_cursor(cursor),
+            output_field=BooleanField(),
+        ))
+
+    logs = list(exercise_logs[:page_size + 1])
+    if len(logs) > page_size:
+        logs = logs[:page_size]
+        return logs, encode_log_cursor(logs[-1])
+    return logs, None
@@ -0,0 +1,98 @@
+"""
+Exercise recommendations from a user's recent muscle load.
+
+Each muscle's recent load (as a percentage of ``FULL_LOAD``, the same
+numbers the heat map shows) becomes a deficit in [0, 1]: untrained muscles
+are 1 and fully loaded ones 0. An exercise's score is the deficit of the
+muscles it works, weighted by the muscle-load engine's exercise x muscle
+matrix (primary x2, secondary x1) and normalised by the row's total
+weight, so it is in [0, 1] too. Every exercise is scored with one
+matrix-vector product; level and equipment filters are precomputed
+boolean masks over the same rows.
+"""
+import numpy as np
+
+from .catalog import MUSCLE_GROUPS
+from .models import Exercise
+from .muscle_load import get_muscle_load_engine
+
+EXERCISE_LEVELS = tuple(level for level, _ in Exercise.LEVEL_CHOICES)
+
+# Equipment every user is assumed to have
+BODYWEIGHT_EQUIPMENT = (None, 'body only')
+
+
+def max_level_for(fitness_level):
+    """Hardest exercise level for a 1-5 ``User.fitness_level``: 1-2 beginner, 3-4 intermediate, 5 expert."""
+    if fitness_level is None or fitness_level <= 2:
+        return 'beginner'
+    if fitness_level <= 4:
+        return 'intermediate'
+    return 'expert'
+
+
+class RecommendationEngine:
+    def __init__(self, muscle_load_engine):
+        self.muscle_load_engine = muscle_load_engine
+        self.exercises = muscle_load_engine.catalog.exercises
+        matrix = muscle_load_engine.matrix
+        row_weights = matrix.sum(axis=1)
+        self.trainable = row_weights > 0  # Exercises with no known muscle cannot be scored
+        self.weights = np.divide(
+            matrix, row_weights[:, None], out=np.zeros_like(matrix), where=self.trainable[:, None]
+        )
+
+        levels = np.array([
+            EXERCISE_LEVELS.index(exercise.level) if exercise.level in EXERCISE_LEVELS else len(EXERCISE_LEVELS)
+            for exercise in self.exercises
+        ])
+        # Rows at or below each level
+        self.level_masks = {level: levels <= rank for rank, level in enumerate(EXERCISE_LEVELS)}
+
+        equipment = [exercise.equipment for exercise in self.exercises]
+        self.equipment_masks = {
+            value: np.array([item == value for item in equipment]) for value in set(equipment)
+        }
+        self.bodyweight_mask = np.array([item in BODYWEIGHT_EQUIPMENT for item in equipment], dtype=bool)
+
+    def scores(self, muscle_percentages):
+        """Score of every catalog row for ``{muscle: percentage}`` (missing muscles count as 0%)."""
+        deficit = 1 - np.array(
+            [muscle_percentages.get(muscle, 0) for muscle in MUSCLE_GROUPS], dtype=np.float64
+        ) / 100
+        return self.weights @ np.clip(deficit, 0, 1)
+
+    def recommend(self, muscle_percentages, max_level='expert', equipment=None, limit=10):
+        """
+        Best ``[(CatalogExercise, score)]`` for the given recent load.
+
+        ``equipment`` lists available equipment in addition to bodyweight;
+        None allows any equipment.
+        """
+        mask = self.trainable & self.level_masks.get(max_level, self.level_masks['expert'])
+        if equipment is not None:
+            available = self.bodyweight_mask.copy()
+            for value in equipment:
+                if value in self.equipment_masks:
+                    available |= self.equipment_masks[value]
+            mask &= available
+
+        candidates = np.flatnonzero(mask)
+        if not len(candidates):
+            return []
+        scores = self.scores(muscle_percentages)
+        top = candidates[np.argsort(-scores[candidates], kind='stable')[:limit]]
+        return [(self.exercises[row], round(float(scores[row]), 4)) for row in top]
+
+
+_engine = None
+
+
+def get_recommendation_engine():
+    """Engine for the current catalog snapshot, rebuilt when the catalog changes."""
+    global _engine
+    muscle_load_engine = get_muscle_load_engine()
+    engine = _engine
+    if engine is None or engine.muscle_load_engine is not muscle_load_engine:
+        engine = _engine = RecommendationEngine(muscle_load_engine)
+    return engine
@@ -0,0 +1,201 @@
+"""
+JSON encoding for every API response.
+
+``dumps`` uses the backend named by the ``JSON_BACKEND`` setting: 'orjson'
+(when installed) encodes dicts, lists, dates, times and datetimes natively in
+C, and 'stdlib' is ``json`` with ``DjangoJSONEncoder``. ``JsonResponse`` is a
+drop-in for ``django.http.JsonResponse`` and ``FastJSONRenderer`` is the DRF
+renderer; both go through ``dumps``.
+
+Views wrapped in ``negotiated_response`` answer in MessagePack instead when
+DRF's content negotiation picked ``MessagePackRenderer`` (``Accept:
+application/msgpack``): their ``JsonResponse`` bodies are then encoded with
+``msgpack_dumps``, with dates and times as the same ISO strings as in JSON.
+``parse_body`` is the matching request-body parser.
+
+orjson writes times with full microsecond precision where DjangoJSONEncoder
+truncates to milliseconds; workout times carry no sub-second part, so log
+payloads are byte-for-byte the same apart from whitespace.
+"""
+import contextvars
+import json
+from functools import wraps
+
+from django.conf import settings
+from django.core.serializers.json import DjangoJSONEncoder
+from django.http import HttpResponse
+from django.utils.cache import patch_vary_headers
+from django.utils.http import parse_header_parameters
+from rest_framework.renderers import BaseRenderer, JSONRenderer
+
+try:
+    import orjson
+except ImportError:  # pragma: no cover - optional dependency
+    orjson = None
+
+try:
+    import msgpack
+except ImportError:  # pragma: no cover - optional dependency
+    msgpack = None
+
+JSON_MEDIA_TYPE = 'application/json'
+MSGPACK_MEDIA_TYPE = 'application/msgpack'
+# Request bodies are also accepted under the older, unregistered name
+MSGPACK_REQUEST_MEDIA_TYPES = (MSGPACK_MEDIA_TYPE, 'application/x-msgpack')
+
+# Media type JsonResponse bodies are encoded in, set by negotiated_response
+_response_media_type = contextvars.ContextVar('response_media_type', default=JSON_MEDIA_TYPE)
+
+_django_encoder = DjangoJSONEncoder()
+
+
+def stdlib_dumps(data):
+    return json.dumps(data, cls=DjangoJSONEncoder, separators=(',', ':')).encode()
+
+
+def orjson_dumps(data):
+    # Anything orjson cannot encode natively (Decimal, lazy strings...) falls
+    # back to DjangoJSONEncoder.
+    return orjson.dumps(data, default=_django_encoder.default, option=orjson.OPT_UTC_Z)
+
+
+def get_dumps(backend=None):
+    backend = backend or getattr(settings, 'JSON_BACKEND', 'orjson')
+    if backend == 'orjson' and orjson is not None:
+        return orjson_dumps
+    return stdlib_dumps
+
+
+def dumps(data):
+    """Encode ``data`` to JSON bytes with the configured backend."""
+    return get_dumps()(data)
+
+
+def msgpack_dumps(data):
+    return msgpack.packb(data, default=_django_encoder.default, use_bin_type=True)
+
+
+class InvalidPayload(ValueError):
+    """A request body that could not be decoded."""
+
+
+def parse_body(request):
+    """
+    Decode a request body: MessagePack when sent as ``application/msgpack``
+    (or ``application/x-msgpack``, with any parameters), JSON otherwise.
+    Raises ``InvalidPayload`` for a malformed body.
+    """
+    media_type, _ = parse_header_parameters(request.content_type or '')
+    if msgpack is not None and media_type in MSGPACK_REQUEST_MEDIA_TYPES:
+        try:
+            return msgpack.unpackb(request.body, raw=False)
+        except (TypeError, ValueError, msgpack.UnpackException):
+            # TypeError: a map key that can't be a dict key, such as an array
+            raise InvalidPayload('Invalid MessagePack payload.')
+    try:
+        return json.loads(request.body)
+    except ValueError:  # Includes bodies that aren't UTF-8
+        raise InvalidPayload('Invalid JSON payload.')
+
+
+class JsonResponse(HttpResponse):
+    """
+    ``django.http.JsonResponse`` encoded with ``dumps``, or with
+    ``msgpack_dumps`` inside a view whose client negotiated MessagePack.
+    """
+
+    def __init__(self, data, safe=True, **kwargs):
+        if safe and not isinstance(data, dict):
+            raise TypeError(
+                'In order to allow non-dict objects to be serialized set the '
+                'safe parameter to False.'
+            )
+        if _response_media_type.get() == MSGPACK_MEDIA_TYPE:
+            kwargs.setdefault('content_type', MSGPACK_MEDIA_TYPE)
+            super().__init__(content=msgpack_dumps(data), **kwargs)
+        else:
+            kwargs.setdefault('content_type', JSON_MEDIA_TYPE)
+            super().__init__(content=dumps(data), **kwargs)
+
+
+class FastJSONRenderer(JSONRenderer):
+    """DRF JSON renderer encoded with ``dumps``."""
+
+    def render(self, data, accepted_media_type=None, renderer_context=None):
+        if data is None:
+            return b''
+        return dumps(data)
+
+
+class MessagePackRenderer(BaseRenderer):
+    """DRF renderer for ``Accept: application/msgpack``."""
+    media_type = MSGPACK_MEDIA_TYPE
+    format = 'msgpack'
+    charset = None
+    render_style = 'binary'
+
+    def render(self, data, accepted_media_type=None, renderer_context=None):
+        if data is None:
+            return b''
+        return msgpack_dumps(data)
+
+
+def negotiated_response(view_func):
+    """
+    Encode the ``JsonResponse`` returned by a DRF view method in the media
+    type DRF negotiated for the request: JSON, or MessagePack when the
+    client asked for it.
+    """
+    @wraps(view_func)
+    def wrapped_view(request, *args, **kwargs):
+        renderer = getattr(request, 'accepted_renderer', None)
+        media_type = MSGPACK_MEDIA_TYPE if isinstance(renderer, MessagePackRenderer) else JSON_MEDIA_TYPE
+        token = _response_media_type.set(media_type)
+        try:
+            response = view_func(request, *args, **kwargs)
+        finally:
+            _response_media_type.reset(token)
+        patch_vary_headers(response, ('Accept',))
+        return response
+
+    return wrapped_view
+
+
+def preferred_media_type(accept):
+    """
+    JSON or MessagePack for an ``Accept`` header, for views outside DRF's
+    content negotiation: MessagePack only when it is acceptable and
+    preferred over JSON.
+    """
+    quality = {}
+    for part in accept.split(','):
+        media_type, _, params = part.partition(';')
+        q = 1.0
+        for param in params.split(';'):
+            name, _, value = param.strip().partition('=')
+            if name == 'q':
+                try:
+                    q = float(value)
+                except ValueError:
+                    q = 0.0
+        quality.setdefault(media_type.strip().lower(), q)
+
+    json_q = max(quality.get(JSON_MEDIA_TYPE, 0), quality.get('application/*', 0), quality.get('*/*', 0))
+    if msgpack is not None and quality.get(MSGPACK_MEDIA_TYPE, 0) > json_q:
+        return MSGPACK_MEDIA_TYPE
+    return JSON_MEDIA_TYPE
+
+
+def async_negotiated_response(view_func):
+    """``negotiated_response`` for ``async def`` views, negotiating from the ``Accept`` header."""
+    @wraps(view_func)
+    async def wrapped_view(request, *args, **kwargs):
+        token = _response_media_type.set(preferred_media_type(request.headers.get('Accept', '')))
+        try:
+            response = await view_func(request, *args, **kwargs)
+        finally:
+            _response_media_type.reset(token)
+        patch_vary_headers(response, ('Accept',))
+        return response
+
+    return wrapped_view
@@ -0,0 +1,195 @@
+"""
+Exercise search over the in-memory catalog.
+
+``FacetIndex`` precomputes, for every value of every facet, a bitset of the
+catalog positions having that value. Bitsets are plain Python ints, so a
+filter is a handful of ``&``/``|`` over ~1000-bit integers and a facet
+count is ``int.bit_count()``.
+
+``NameIndex`` is a trigram index over exercise names for typo-tolerant,
+ranked name search, in the spirit of ``pg_trgm`` but without a round trip.
+
+Neither touches the database; both are rebuilt whenever ``get_catalog``
+returns a new snapshot.
+"""
+import re
+
+from .catalog import get_catalog
+
+# Facet name -> CatalogExercise attribute; list attributes index every element
+FACETS = (
+    'primary_muscles', 'secondary_muscles', 'equipment', 'level', 'force', 'mechanic', 'category',
+)
+MULTI_VALUED_FACETS = {'primary_muscles', 'secondary_muscles'}
+
+
+def iter_bits(mask):
+    """Positions of the set bits of ``mask``, lowest first."""
+    while mask:
+        low = mask & -mask
+        yield low.bit_length() - 1
+        mask ^= low
+
+
+class FacetIndex:
+    """
+    Bitset index of a catalog snapshot.
+
+    Values selected within one facet are ORed and facets are ANDed. Counts
+    for a facet are computed with every other facet's filter applied, so
+    the counts of a facet being filtered on still show its alternatives.
+    """
+
+    def __init__(self, catalog):
+        self.catalog = catalog
+        self.exercises = catalog.exercises
+        self.all = (1 << len(self.exercises)) - 1
+        self.bits = {facet: {} for facet in FACETS}
+        for position, exercise in enumerate(self.exercises):
+            bit = 1 << position
+            for facet in FACETS:
+                value = getattr(exercise, facet)
+                values = value if facet in MULTI_VALUED_FACETS else (value,)
+                for value in values:
+                    if value is not None:
+                        self.bits[facet][value] = self.bits[facet].get(value, 0) | bit
+
+    def facet_mask(self, facet, values):
+        mask = 0
+        for value in values:
+            mask |= self.bits[facet].get(value, 0)
+        return mask
+
+    def search(self, filters):
+        """
+        Apply ``{facet: [values]}`` and return ``(mask, facet_counts)``,
+        where ``facet_counts`` is ``{facet: {value: count}}``.
+        """
+        masks = {facet: self.facet_mask(facet, values) for facet, values in filters.items() if values}
+
+        mask = self.all
+        for facet_mask in masks.values():
+            mask &= facet_mask
+
+        counts = {}
+        for facet in FACETS:
+            others = self.all
+            for other, facet_mask in masks.items():
+                if other != facet:
+                    others &= facet_mask
+            counts[facet] = {
+                value: (bits & others).bit_count()
+                for value, bits in sorted(self.bits[facet].items())
+            }
+        return mask, counts
+
+    def exercises_in(self, mask, offset=0, limit=None):
+        """Catalog exercises selected by ``mask`` in catalog order, sliced by ``offset``/``limit``."""
+        selected = []
+        for index, position in enumerate(iter_bits(mask)):
+            if index < offset:
+                continue
+            if limit is not None and len(selected) >= limit:
+                break
+            selected.append(self.exercises[position])
+        return selected
+
+
+# Gym shorthand expanded before matching ("db curl" -> "dumbbell curl")
+NAME_ALIASES = {
+    'db': 'dumbbell',
+    'bb': 'barbell',
+    'kb': 'kettlebell',
+    'ohp': 'overhead press',
+    'rdl': 'romanian deadlift',
+    'sldl': 'stiff legged deadlift',
+}
+
+# Matches scoring below this are not returned
+MIN_NAME_SCORE = 0.3
+
+_NON_ALNUM_RE = re.compile(r'[^a-z0-9]+')
+
+
+def normalize_name(text):
+    """Lowercase words with punctuation removed; hyphens and apostrophes join ("pull-up" -> "pullup")."""
+    words = _NON_ALNUM_RE.sub(' ', re.sub(r"[-']", '', text.lower())).split()
+    return ' '.join(NAME_ALIASES.get(word, word) for word in words)
+
+
+def trigrams(text):
+    """Distinct ``pg_trgm``-style trigrams: each word is padded with two leading spaces and one trailing."""
+    grams = set()
+    for word in normalize_name(text).split():
+        padded = f'  {word} '
+        grams.update(padded[i:i + 3] for i in range(len(padded) - 2))
+    return grams
+
+
+class NameIndex:
+    """
+    Trigram index of exercise names.
+
+    A name's score for a query mixes how many of the query's trigrams it
+    contains (so partial queries like "bench pres" match long names) with
+    the trigram Jaccard similarity (so, among equal matches, names closest
+    to the query rank first).
+    """
+
+    def __init__(self, catalog):
+        self.catalog = catalog
+        self.exercises = catalog.exercises
+        self.sizes = []
+        self.postings = {}
+        for position, exercise in enumerate(self.exercises):
+            grams = trigrams(exercise.name)
+            self.sizes.append(len(grams))
+            for gram in grams:
+                self.postings.setdefault(gram, []).append(position)
+
+    def search(self, query, limit=10, min_score=MIN_NAME_SCORE):
+        """Best matches for ``query`` as ``[(CatalogExercise, score)]``, highest score first."""
+        grams = trigrams(query)
+        if not grams:
+            return []
+
+        shared = {}
+        for gram in grams:
+            for position in self.postings.get(gram, ()):
+                shared[position] = shared.get(position, 0) + 1
+
+        query_size = len(grams)
+        scored = []
+        for position, count in shared.items():
+            coverage = count / query_size
+            jaccard = count / (query_size + self.sizes[position] - count)
+            score = (2 * coverage + jaccard) / 3
+            if score >= min_score:
+                scored.append((score, position))
+
+        scored.sort(key=lambda match: (-match[0], match[1]))
+        return [(self.exercises[position], round(score, 4)) for score, position in scored[:limit]]
+
+
+_facet_index = None
+_name_index = None
+
+
+def get_facet_index():
+    """Facet index for the current catalog snapshot, rebuilt when the catalog changes."""
+    global _facet_index
+    catalog = get_catalog()
+    index = _facet_index
+    if index is None or index.catalog is not catalog:
+        index = _facet_index = FacetIndex(catalog)
+    return index
+
+
+def get_name_index():
+    """Name index for the current catalog snapshot, rebuilt when the catalog changes."""
+    global _name_index
+    catalog = get_catalog()
+    index = _name_index
+    if index is None or index.catalog is not catalog:
+        index = _name_index = NameIndex(catalog)
+    return index
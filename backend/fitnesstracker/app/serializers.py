@@ -1,5 +1,7 @@
+from django.db.models import QuerySet
 from rest_framework import serializers
-from .models import User, Exercise
+from .models import User, Exercise, sets_from_columns
+from .catalog import aget_catalog, get_catalog
 
 class UserSerializer(serializers.ModelSerializer):
     class Meta:
@@ -15,3 +17,59 @@ class Exercise(serializers.ModelSerializer):
     class Meta:
         model = Exercise
         fields = '__all__'
+
+
+# Exercise log payloads. Logs are read as plain column tuples and exercise
+# names come from the in-memory catalog, so a list of logs costs one query.
+
+LOG_FIELDS = (
+    'log_id', 'exercise_id', 'workout_date', 'workout_time', 'set_numbers', 'set_reps', 'set_weights'
+)
+
+
+def log_payload(log_id, exercise_id, workout_date, workout_time, sets, catalog):
+    return {
+        'log_id': log_id,
+        'exercise_id': exercise_id,
+        'exercise_name': catalog.name_for(exercise_id),
+        'workout_date': workout_date,
+        'workout_time': workout_time,
+        'sets': sets
+    }
+
+
+def log_values(exercise_logs):
+    """Project an ``ExerciseLog`` queryset to ``LOG_FIELDS`` tuples for ``row_payload``."""
+    return exercise_logs.values_list(*LOG_FIELDS)
+
+
+def row_payload(row, catalog):
+    log_id, exercise_id, workout_date, workout_time, set_numbers, set_reps, set_weights = row
+    return log_payload(
+        log_id, exercise_id, workout_date, workout_time,
+        sets_from_columns(set_numbers, set_reps, set_weights), catalog
+    )
+
+
+def serialize_log(exercise_log):
+    return log_payload(
+        exercise_log.log_id, exercise_log.exercise_id_id, exercise_log.workout_date,
+        exercise_log.workout_time, exercise_log.sets, get_catalog()
+    )
+
+
+def serialize_logs(exercise_logs):
+    """Payloads for an ``ExerciseLog`` queryset (in one query) or a list of logs."""
+    catalog = get_catalog()
+    if isinstance(exercise_logs, QuerySet):
+        return [row_payload(row, catalog) for row in log_values(exercise_logs)]
+    return [
+        log_payload(log.log_id, log.exercise_id_id, log.workout_date, log.workout_time, log.sets, catalog)
+        for log in exercise_logs
+    ]
+
+
+async def aserialize_logs(exercise_logs):
+    """``serialize_logs`` for an ``ExerciseLog`` queryset, read with the async ORM."""
+    catalog = await aget_catalog()
+    return [row_payload(row, catalog) async for row in log_values(exercise_logs)]
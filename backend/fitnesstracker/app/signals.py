@@ -0,0 +1,36 @@
+from django.db.models.signals import post_delete, post_save, pre_delete, pre_save
+from django.dispatch import receiver
+
+from .catalog import bump_catalog_version
+from .models import Exercise, ExerciseLog
+from .muscle_load import rebuild_daily_muscle_loads_on_commit
+
+
+@receiver(post_save, sender=Exercise)
+@receiver(post_delete, sender=Exercise)
+def invalidate_exercise_catalog(sender, **kwargs):
+    bump_catalog_version()
+
+
+# DailyMuscleLoad weighs each log by its exercise's muscles, so the rollup of
+# everyone who logged an exercise is rebuilt when those muscles change or the
+# exercise (and with it those logs) is deleted. load_exercises, which writes
+# with bulk_create and sends no save signals, rebuilds on its own.
+
+@receiver(pre_save, sender=Exercise)
+def remember_exercise_muscles(sender, instance, **kwargs):
+    instance._stored_muscles = Exercise.objects.filter(pk=instance.pk).values_list(
+        'primary_muscles', 'secondary_muscles'
+    ).first()
+
+
+@receiver(post_save, sender=Exercise)
+def rebuild_muscle_loads_for_changed_muscles(sender, instance, **kwargs):
+    stored = getattr(instance, '_stored_muscles', None)
+    if stored is not None and tuple(stored) != (instance.primary_muscles, instance.secondary_muscles):
+        rebuild_daily_muscle_loads_on_commit(ExerciseLog.objects.filter(exercise_id=instance.pk))
+
+
+@receiver(pre_delete, sender=Exercise)
+def rebuild_muscle_loads_for_deleted_exercise(sender, instance, **kwargs):
+    rebuild_daily_muscle_loads_on_commit(ExerciseLog.objects.filter(exercise_id=instance.pk))
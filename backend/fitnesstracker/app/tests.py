@@ -1,3 +1,499 @@
-from django.test import TestCase
+import csv
+import io
+import json
+import os
+import tempfile
+from datetime import date, time
+from unittest import skipIf
 
-# Create your tests here.
+from django.core.cache import cache
+from django.core.management import call_command
+from django.core.serializers.json import DjangoJSONEncoder
+from django.test import RequestFactory, SimpleTestCase, TestCase, override_settings
+from rest_framework.request import Request
+
+from .catalog import VERSION_CACHE_KEY, bump_catalog_version, catalog_etag, catalog_last_modified, get_catalog
+from .decorators.firebase_decorator import token_cache
+from .management.commands.compare_muscle_load_backends import percentages_match
+from .firebase_tokens import SigningKeySet
+from .models import DailyMuscleLoad, Exercise, ExerciseLog, User, sets_from_columns, sets_to_columns
+from .muscle_load import (
+    apply_log_change, log_snapshot, muscle_percentages_for_logs, rebuild_daily_muscle_loads, rollup_muscle_percentages,
+)
+from .pagination import HISTORY_ORDERING, paginate_logs
+from .renderers import InvalidPayload, msgpack, parse_body
+from .serializers import serialize_log, serialize_logs
+
+# Each test gets its own catalog version instead of the shared file cache
+TEST_CACHES = {'default': {'BACKEND': 'django.core.cache.backends.locmem.LocMemCache'}}
+
+
+def make_exercise(exercise_id, primary_muscles, secondary_muscles=()):
+    return Exercise.objects.create(
+        id=exercise_id,
+        name=exercise_id.replace('_', ' '),
+        force='push',
+        level='beginner',
+        mechanic='compound',
+        equipment='barbell',
+        primary_muscles=list(primary_muscles),
+        secondary_muscles=list(secondary_muscles),
+        instructions=[],
+        category='strength',
+        images=[],
+    )
+
+
+def make_user(user_uid='test-user'):
+    return User.objects.create(
+        user_uid=user_uid, name='Test User', email=f'{user_uid}@example.com',
+        age=30, height=175, weight=75, fitness_level=3,
+    )
+
+
+def make_log(user, exercise_id, workout_date, set_reps=(), set_weights=()):
+    return ExerciseLog(
+        user_uid=user,
+        exercise_id_id=exercise_id,
+        workout_date=workout_date,
+        workout_time=time(18, 0),
+        set_numbers=list(range(1, len(set_reps) + 1)),
+        set_reps=list(set_reps),
+        set_weights=list(set_weights),
+    )
+
+
+@override_settings(CACHES=TEST_CACHES)
+class MuscleLoadBackendTests(TestCase):
+    def setUp(self):
+        self.user = make_user()
+        make_exercise('Bench_Press', ['chest'], ['triceps', 'shoulders'])
+        make_exercise('Squat', ['quadriceps'], ['glutes', 'hamstrings'])
+        make_exercise('Odd_Exercise', ['not a muscle'])  # Muscles the engine doesn't know
+        get_catalog()
+        # Created without signals after the catalog was loaded, so the catalog doesn't know it
+        Exercise.objects.bulk_create([Exercise(
+            id='Late_Exercise', id_key='late_exercise', name='Late Exercise', force='pull',
+            level='beginner', mechanic='isolation', equipment='cable', primary_muscles=['biceps'],
+            secondary_muscles=[], instructions=[], category='strength', images=[],
+        )])
+
+        ExerciseLog.objects.bulk_create([
+            make_log(self.user, 'Bench_Press', date(2024, 1, 1), [8, 6, 5], [42.5, 47.25, 50.125]),
+            make_log(self.user, 'Bench_Press', date(2024, 1, 3), [10], [0.1]),
+            make_log(self.user, 'Squat', date(2024, 1, 1), [5, 5, 5, 3], [82.5, 85, 87.75, 91.3]),
+            make_log(self.user, 'Squat', date(2024, 1, 2)),  # No sets
+            make_log(self.user, 'Odd_Exercise', date(2024, 1, 2), [12], [17.5]),
+            make_log(self.user, 'Late_Exercise', date(2024, 1, 3), [15, 12], [12.5, 15]),
+        ])
+
+    def assertBackendsAgree(self, exercise_logs):
+        expected = muscle_percentages_for_logs(exercise_logs, 'python')
+        actual = muscle_percentages_for_logs(exercise_logs, 'sql')
+        if expected is None:
+            self.assertIsNone(actual)
+            return
+        self.assertEqual(set(actual), set(expected))
+        for muscle, percentage in expected.items():
+            self.assertAlmostEqual(actual[muscle], percentage, places=2, msg=muscle)
+
+    def test_sql_matches_python(self):
+        self.assertBackendsAgree(ExerciseLog.objects.filter(user_uid=self.user))
+
+    def test_sql_matches_python_per_day(self):
+        for day in (1, 2, 3):
+            with self.subTest(day=day):
+                self.assertBackendsAgree(ExerciseLog.objects.filter(user_uid=self.user, workout_date=date(2024, 1, day)))
+
+    def test_sql_matches_python_without_sets(self):
+        exercise_logs = ExerciseLog.objects.filter(user_uid=self.user, exercise_id='Squat', workout_date=date(2024, 1, 2))
+        self.assertBackendsAgree(exercise_logs)
+        self.assertTrue(all(value == 0 for value in muscle_percentages_for_logs(exercise_logs, 'sql').values()))
+
+    def test_no_logs(self):
+        self.assertBackendsAgree(ExerciseLog.objects.none())
+        self.assertBackendsAgree(ExerciseLog.objects.filter(user_uid=self.user, workout_date=date(2023, 1, 1)))
+
+    def test_rollup_matches_backends_after_create_then_delete(self):
+        day = date(2024, 3, 1)
+        exercise_log = ExerciseLog.objects.create(
+            user_uid=self.user, exercise_id_id='Bench_Press', workout_date=day,
+            workout_time=time(18, 0), set_numbers=[1, 2], set_reps=[8, 6], set_weights=[42.5, 47.25],
+        )
+        apply_log_change(self.user.user_uid, new=log_snapshot(exercise_log))
+        day_logs = ExerciseLog.objects.filter(user_uid=self.user, workout_date=day)
+        self.assertBackendsAgree(day_logs)
+        rollup = rollup_muscle_percentages(self.user.user_uid, day, day)
+        for muscle, percentage in muscle_percentages_for_logs(day_logs, 'python').items():
+            self.assertAlmostEqual(rollup[muscle], percentage, places=2, msg=muscle)
+
+        old = log_snapshot(exercise_log)
+        exercise_log.delete()
+        apply_log_change(self.user.user_uid, old=old)
+        self.assertIsNone(muscle_percentages_for_logs(day_logs, 'python'))
+        self.assertIsNone(muscle_percentages_for_logs(day_logs, 'sql'))
+        self.assertIsNone(rollup_muscle_percentages(self.user.user_uid, day, day))
+        self.assertFalse(DailyMuscleLoad.objects.filter(user_uid=self.user, date=day).exists())
+
+    def test_rebuilt_rollup_matches_logs(self):
+        other = make_user('other-user')
+        ExerciseLog.objects.bulk_create([make_log(other, 'Squat', date(2024, 1, 1), [5], [100])])
+        created, deleted, user_days = rebuild_daily_muscle_loads([self.user.user_uid])
+        self.assertEqual(user_days, 3)
+        self.assertFalse(DailyMuscleLoad.objects.filter(user_uid=other).exists())
+
+        expected = muscle_percentages_for_logs(ExerciseLog.objects.filter(user_uid=self.user))
+        actual = rollup_muscle_percentages(self.user.user_uid, date(2024, 1, 1), date(2024, 1, 3))
+        for muscle, percentage in expected.items():
+            self.assertAlmostEqual(actual[muscle], percentage, places=2, msg=muscle)
+
+    def test_rollup_of_exercise_added_after_catalog_load(self):
+        self.assertNotIn('Late_Exercise', get_catalog())
+        exercise_log = ExerciseLog.objects.create(
+            user_uid=self.user, exercise_id_id='Late_Exercise', workout_date=date(2024, 2, 1),
+            workout_time=time(18, 0), set_numbers=[1], set_reps=[10], set_weights=[20],
+        )
+        apply_log_change(self.user.user_uid, new=log_snapshot(exercise_log))
+        rollup = DailyMuscleLoad.objects.filter(user_uid=self.user, date=date(2024, 2, 1))
+        self.assertEqual(dict(rollup.values_list('muscle', 'volume')), {'biceps': 400.0})
+
+        bump_catalog_version()
+        self.assertIn('Late_Exercise', get_catalog())
+        old = log_snapshot(exercise_log)
+        exercise_log.delete()
+        apply_log_change(self.user.user_uid, old=old)
+        for muscle, volume in rollup.values_list('muscle', 'volume'):
+            self.assertAlmostEqual(volume, 0, msg=muscle)
+
+
+class LogListQueryCountMixin:
+    """Every log list is one query however many logs it holds; subclasses set ``log_count``."""
+    log_count = None
+
+    def setUp(self):
+        self.user = make_user()
+        make_exercise('Bench_Press', ['chest'], ['triceps'])
+        make_exercise('Squat', ['quadriceps'], ['glutes'])
+        exercise_ids = ['Bench_Press', 'Squat']
+        ExerciseLog.objects.bulk_create([
+            make_log(self.user, exercise_ids[n % 2], date(2024, 1, 1), [10, 8], [40, 42.5])
+            for n in range(self.log_count)
+        ] + [
+            make_log(self.user, exercise_ids[n % 2], date(2024, 1, 2 + n % 28), [5], [100])
+            for n in range(self.log_count)
+        ])
+        get_catalog()  # Loading the catalog is a once-per-process cost, not part of any list
+
+    def assertLogList(self, payloads, count):
+        self.assertEqual(len(payloads), count)
+        self.assertEqual(payloads[0]['exercise_name'], payloads[0]['exercise_id'].replace('_', ' '))
+
+    def test_by_date(self):
+        with self.assertNumQueries(1):
+            payloads = serialize_logs(ExerciseLog.objects.filter(
+                user_uid__user_uid=self.user.user_uid, workout_date=date(2024, 1, 1)
+            ))
+        self.assertLogList(payloads, self.log_count)
+
+    def test_by_date_range(self):
+        with self.assertNumQueries(1):
+            payloads = serialize_logs(ExerciseLog.objects.filter(
+                user_uid__user_uid=self.user.user_uid, workout_date__range=(date(2024, 1, 1), date(2024, 1, 31))
+            ))
+        self.assertLogList(payloads, 2 * self.log_count)
+
+    def test_full_history(self):
+        with self.assertNumQueries(1):
+            logs, next_cursor = paginate_logs(
+                ExerciseLog.objects.filter(user_uid__user_uid=self.user.user_uid), page_size=self.log_count
+            )
+            payloads = serialize_logs(logs)
+        self.assertLogList(payloads, self.log_count)
+        self.assertIsNotNone(next_cursor)
+
+        with self.assertNumQueries(1):
+            logs, next_cursor = paginate_logs(
+                ExerciseLog.objects.filter(user_uid__user_uid=self.user.user_uid), next_cursor, page_size=self.log_count
+            )
+            payloads = serialize_logs(logs)
+        self.assertLogList(payloads, self.log_count)
+        self.assertIsNone(next_cursor)
+
+    def test_edit(self):
+        log_ids = ExerciseLog.objects.filter(user_uid=self.user).values_list('log_id', flat=True)
+        for log_id in log_ids[:5]:
+            with self.assertNumQueries(1):
+                exercise_log = ExerciseLog.objects.get(user_uid__user_uid=self.user.user_uid, log_id=log_id)
+                payload = serialize_log(exercise_log)
+            self.assertEqual(payload['log_id'], log_id)
+
+            exercise_log.sets = [{'set_number': 1, 'reps': 12, 'weight': 35}]
+            exercise_log.save()
+            with self.assertNumQueries(0):
+                self.assertLogList(serialize_logs([exercise_log]), 1)
+
+
+@override_settings(CACHES=TEST_CACHES)
+class FewLogsQueryCountTests(LogListQueryCountMixin, TestCase):
+    log_count = 3
+
+
+@override_settings(CACHES=TEST_CACHES)
+class ManyLogsQueryCountTests(LogListQueryCountMixin, TestCase):
+    log_count = 300
+
+
+@override_settings(CACHES=TEST_CACHES, EXERCISE_CATALOG_RECHECK_SECONDS=3600)
+class CatalogEtagTests(TestCase):
+    def setUp(self):
+        make_exercise('Squat', ['quadriceps'])
+        self.catalog = get_catalog()
+
+    def test_etag_matches_served_snapshot(self):
+        # Another process bumps the version; this one keeps serving its snapshot until it rechecks
+        cache.set(VERSION_CACHE_KEY, self.catalog.version + 1, timeout=None)
+        self.assertIs(get_catalog(), self.catalog)
+        self.assertEqual(catalog_etag(None), f'catalog-{self.catalog.version}')
+        self.assertAlmostEqual(catalog_last_modified(None).timestamp(), self.catalog.version / 1e9, places=5)
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+class FakeWake:
+    """Stands in for ``SigningKeySet._wake``: time passes on the fake clock instead of the real one."""
+
+    def __init__(self, clock, woken_every=None):
+        self.clock = clock
+        self.woken_every = woken_every
+        self.waits = 0
+
+    def wait(self, timeout):
+        self.waits += 1
+        if self.woken_every is None or self.woken_every >= timeout:
+            self.clock.now += timeout
+            return False
+        self.clock.now += self.woken_every
+        return True
+
+    def clear(self):
+        pass
+
+
+class SigningKeySetTests(SimpleTestCase):
+    def make_key_set(self, woken_every=None):
+        clock = FakeClock()
+        key_set = SigningKeySet(source=None, min_interval=30, clock=clock)
+        key_set._wake = FakeWake(clock, woken_every)
+        return key_set, clock
+
+    def test_refreshes_when_due(self):
+        key_set, clock = self.make_key_set()
+        key_set._wait_for_refresh(fetched_at=0, due=3240)
+        self.assertEqual(clock.now, 3240)
+        self.assertEqual(key_set._wake.waits, 1)
+
+    def test_unknown_kids_refresh_at_most_once_per_min_interval(self):
+        # An unknown kid every tenth of a second still waits out min_interval
+        key_set, clock = self.make_key_set(woken_every=0.1)
+        key_set._wait_for_refresh(fetched_at=0, due=3240)
+        self.assertAlmostEqual(clock.now, 30)
+
+    def test_unknown_kid_after_min_interval_refreshes_at_once(self):
+        key_set, clock = self.make_key_set(woken_every=45)
+        key_set._wait_for_refresh(fetched_at=0, due=3240)
+        self.assertEqual(clock.now, 45)
+        self.assertEqual(key_set._wake.waits, 1)
+
+
+class SetsToColumnsTests(SimpleTestCase):
+    def test_columns(self):
+        self.assertEqual(
+            sets_to_columns([{'set_number': 0, 'reps': 8, 'weight': 42.5}, {'reps': 6.0, 'weight': 45}]),
+            ([0, 2], [8, 6], [42.5, 45.0]),
+        )
+        self.assertEqual(sets_to_columns(None), ([], [], []))
+
+    def test_whole_weights_read_back_as_ints(self):
+        sets = [
+            {'set_number': 1, 'reps': 8, 'weight': 60},
+            {'set_number': 2, 'reps': 8, 'weight': 60.0},
+            {'set_number': 3, 'reps': 6, 'weight': 62.5},
+        ]
+        read_back = sets_from_columns(*sets_to_columns(sets))
+        self.assertEqual([exercise_set['weight'] for exercise_set in read_back], [60, 60, 62.5])
+        self.assertEqual([type(exercise_set['weight']) for exercise_set in read_back], [int, int, float])
+
+    def test_invalid_sets(self):
+        for sets in (
+            [{'reps': 8.5, 'weight': 40}],
+            [{'reps': 8, 'weight': 40, 'rpe': 9}],
+            [{'set_number': 1.5, 'reps': 8, 'weight': 40}],
+            [{'reps': 8, 'weight': float('nan')}],
+            [{'reps': True, 'weight': 40}],
+            {'reps': 8, 'weight': 40},
+        ):
+            with self.subTest(sets=sets), self.assertRaises(ValueError):
+                sets_to_columns(sets)
+
+
+
+
+class PercentagesMatchTests(SimpleTestCase):
+    def test_rounding_differences_match(self):
+        self.assertTrue(percentages_match({'chest': 12.35, 'back': 100}, {'chest': 12.34, 'back': 99.99}))
+
+    def test_real_differences_do_not_match(self):
+        self.assertFalse(percentages_match({'chest': 12.36}, {'chest': 12.34}))
+        self.assertFalse(percentages_match({'chest': 12.34}, {'chest': 12.34, 'back': 0}))
+
+
+@skipIf(msgpack is None, 'msgpack is not installed')
+class ParseBodyTests(SimpleTestCase):
+    def parse(self, body, content_type):
+        return parse_body(Request(RequestFactory().generic('POST', '/', body, content_type)))
+
+    def test_msgpack_media_types(self):
+        body = msgpack.packb({'reps': 8}, use_bin_type=True)
+        for content_type in (
+            'application/msgpack',
+            'application/msgpack; charset=binary',
+            'Application/MsgPack',
+            'application/x-msgpack',
+        ):
+            with self.subTest(content_type=content_type):
+                self.assertEqual(self.parse(body, content_type), {'reps': 8})
+
+    def test_json(self):
+        self.assertEqual(self.parse(b'{"reps": 8}', 'application/json; charset=utf-8'), {'reps': 8})
+
+    def test_malformed_bodies(self):
+        for body, content_type in (
+            # A map whose key is the array [1], which can't be a dict key
+            (b'\x81\x91\x01\x01', 'application/msgpack'),
+            (b'\xc1', 'application/msgpack'),
+            (b'{"reps": ', 'application/json'),
+            (b'\xff', 'application/json'),
+        ):
+            with self.subTest(body=body), self.assertRaises(InvalidPayload):
+                self.parse(body, content_type)
+
+
+@override_settings(CACHES=TEST_CACHES)
+class LoadExercisesRollupTests(TestCase):
+    def setUp(self):
+        self.user = make_user()
+        self.load([('Squat', ['quadriceps']), ('Bench_Press', ['chest'])])
+        ExerciseLog.objects.bulk_create([
+            make_log(self.user, 'Squat', date(2024, 1, 1), [5], [100]),
+            make_log(self.user, 'Bench_Press', date(2024, 1, 1), [5], [60]),
+        ])
+        rebuild_daily_muscle_loads([self.user.user_uid])
+
+    def load(self, exercises, **options):
+        items = [
+            {'id': exercise_id, 'name': exercise_id, 'level': 'beginner', 'primaryMuscles': muscles,
+             'secondaryMuscles': [], 'instructions': [], 'category': 'strength', 'images': []}
+            for exercise_id, muscles in exercises
+        ]
+        with tempfile.NamedTemporaryFile('w', suffix='.json', delete=False) as file:
+            json.dump(items, file)
+        self.addCleanup(os.remove, file.name)
+        call_command('load_exercises', path=file.name, stdout=io.StringIO(), **options)
+
+    def loaded_muscles(self):
+        return set(DailyMuscleLoad.objects.filter(user_uid=self.user).values_list('muscle', flat=True))
+
+    def test_changed_muscles_rebuild_rollup(self):
+        self.assertEqual(self.loaded_muscles(), {'quadriceps', 'chest'})
+        self.load([('Squat', ['glutes']), ('Bench_Press', ['chest'])])
+        self.assertEqual(self.loaded_muscles(), {'glutes', 'chest'})
+
+    def test_deleted_exercises_rebuild_rollup(self):
+        self.load([('Bench_Press', ['chest'])], delete_missing=True)
+        self.assertFalse(ExerciseLog.objects.filter(exercise_id='Squat').exists())
+        self.assertEqual(self.loaded_muscles(), {'chest'})
+
+
+@override_settings(CACHES=TEST_CACHES)
+class ExerciseChangeRollupTests(TestCase):
+    def setUp(self):
+        self.user = make_user()
+        self.squat = make_exercise('Squat', ['quadriceps'])
+        make_exercise('Bench_Press', ['chest'])
+        ExerciseLog.objects.bulk_create([
+            make_log(self.user, 'Squat', date(2024, 1, 1), [5], [100]),
+            make_log(self.user, 'Bench_Press', date(2024, 1, 1), [5], [60]),
+        ])
+        rebuild_daily_muscle_loads([self.user.user_uid])
+
+    def loaded_muscles(self):
+        return set(DailyMuscleLoad.objects.filter(user_uid=self.user).values_list('muscle', flat=True))
+
+    def test_saving_changed_muscles_rebuilds_rollup(self):
+        self.squat.primary_muscles = ['glutes']
+        with self.captureOnCommitCallbacks(execute=True):
+            self.squat.save()
+        self.assertEqual(self.loaded_muscles(), {'glutes', 'chest'})
+
+    def test_saving_same_muscles_does_not_rebuild(self):
+        self.squat.name = 'Back Squat'
+        with self.captureOnCommitCallbacks() as callbacks:
+            self.squat.save()
+        self.assertEqual(callbacks, [])
+
+    def test_deleting_exercise_rebuilds_rollup(self):
+        with self.captureOnCommitCallbacks(execute=True):
+            self.squat.delete()
+        self.assertEqual(self.loaded_muscles(), {'chest'})
+
+
+@override_settings(CACHES=TEST_CACHES, EXERCISE_LOG_EXPORT_CHUNK_SIZE=2)
+class ExportExerciseLogsTests(TestCase):
+    url = '/api/exercises/logs/export/'
+
+    def setUp(self):
+        self.user = make_user()
+        make_exercise('Bench_Press', ['chest'])
+        make_exercise('Squat', ['quadriceps'])
+        ExerciseLog.objects.bulk_create([
+            make_log(self.user, ['Bench_Press', 'Squat'][n % 2], date(2024, 1, 1 + n), [5, 5], [60, 62.5])
+            for n in range(5)
+        ])
+        ExerciseLog.objects.bulk_create([make_log(make_user('other-user'), 'Squat', date(2024, 1, 1), [5], [100])])
+        self.expected = json.loads(json.dumps(serialize_logs(
+            ExerciseLog.objects.filter(user_uid=self.user).order_by(*HISTORY_ORDERING)
+        ), cls=DjangoJSONEncoder))
+
+        # Skip verification: the decorator trusts cached claims
+        id_token = 'export-test-token'
+        token_cache.set(id_token, {'uid': self.user.user_uid, 'exp': 2 ** 40})
+        self.addCleanup(token_cache.clear)
+        self.headers = {'Authorization': f'Bearer {id_token}'}
+
+    def test_ndjson(self):
+        response = self.client.get(self.url, headers=self.headers)
+        self.assertEqual(response['Content-Type'], 'application/x-ndjson')
+        self.assertFalse(response.is_async)
+        # One line per log, across cursor chunks of two rows
+        lines = [line.decode() for line in response.streaming_content]
+        self.assertEqual(len(lines), 5)
+        self.assertTrue(all(line.endswith('\n') for line in lines))
+        self.assertEqual([json.loads(line) for line in lines], self.expected)
+
+    def test_csv(self):
+        response = self.client.get(self.url, {'type': 'csv'}, headers=self.headers)
+        rows = list(csv.DictReader(io.StringIO(b''.join(response.streaming_content).decode())))
+        self.assertEqual([int(row['log_id']) for row in rows], [log['log_id'] for log in self.expected])
+        self.assertEqual(json.loads(rows[0]['sets']), self.expected[0]['sets'])
+
+    async def test_ndjson_streams_asynchronously_under_asgi(self):
+        response = await self.async_client.get(self.url, headers=self.headers)
+        self.assertTrue(response.is_async)
+        lines = [line.decode() async for line in response.streaming_content]
+        self.assertEqual([json.loads(line) for line in lines], self.expected)
@@ -0,0 +1,203 @@
+"""
+Native async versions of the read-heavy endpoints, routed instead of their
+``APIView`` counterparts when ``SERVE_ASYNC_VIEWS`` is on (i.e. when the
+app runs under an ASGI server such as uvicorn).
+
+They take the same parameters and return the same bodies. Queries go
+through Django's async ORM, the catalog is read without leaving the event
+loop, and token verification runs in a bounded thread pool.
+"""
+from datetime import datetime
+
+from django.http import HttpResponseNotAllowed
+
+from ..catalog import aget_catalog
+from ..decorators.firebase_decorator import async_firebase_token_required
+from ..models import ExerciseLog, User
+from ..muscle_load import amuscle_percentages_for_range
+from ..renderers import JsonResponse, async_negotiated_response
+from ..serializers import aserialize_logs
+from .user_views import dashboard_payload, dashboard_queryset
+
+
+def async_require_GET(view_func):
+    """``require_GET`` for ``async def`` views (Django 4.2's only wraps sync views)."""
+    async def wrapped_view(request, *args, **kwargs):
+        if request.method not in ('GET', 'HEAD'):
+            return HttpResponseNotAllowed(['GET', 'HEAD'])
+        return await view_func(request, *args, **kwargs)
+
+    return wrapped_view
+
+
+@async_require_GET
+@async_negotiated_response
+@async_firebase_token_required
+async def dashboard_data_view(request):
+    """Async ``GetDashboardDataView``."""
+    try:
+        user_uid = request.user_uid
+        start_date_str = request.GET.get('start_date')
+        end_date_str = request.GET.get('end_date')
+
+        if not start_date_str or not end_date_str:
+            return JsonResponse({'error': 'start_date and end_date are required.'}, status=400)
+
+        start_date = datetime.strptime(start_date_str, "%Y-%m-%d").date()
+        end_date = datetime.strptime(end_date_str, "%Y-%m-%d").date()
+
+        dashboard = await dashboard_queryset(user_uid, start_date, end_date).aget()
+        response_data = dashboard_payload(dashboard, await aget_catalog(), start_date_str, end_date_str)
+
+        return JsonResponse(response_data, status=200)
+
+    except ValueError:
+        return JsonResponse({'error': 'Invalid date format. Use YYYY-MM-DD.'}, status=400)
+    except User.DoesNotExist:
+        return JsonResponse({'error': 'User not found.'}, status=404)
+    except Exception as e:
+        return JsonResponse({'error': f'An error occurred: {str(e)}'}, status=500)
+
+
+@async_require_GET
+@async_negotiated_response
+@async_firebase_token_required
+async def exercises_by_date_view(request):
+    """Async ``GetExercisesByDateView``."""
+    try:
+        user_uid = request.user_uid
+        workout_date = request.GET.get('workout_date')
+
+        if not workout_date:
+            return JsonResponse({'error': 'workout_date is required.'}, status=400)
+
+        try:
+            datetime.strptime(workout_date, "%Y-%m-%d").date()
+        except ValueError:
+            return JsonResponse({'error': 'Invalid date format. Use YYYY-MM-DD.'}, status=400)
+
+        logs_data = await aserialize_logs(ExerciseLog.objects.filter(
+            user_uid__user_uid=user_uid,
+            workout_date=workout_date
+        ))
+
+        return JsonResponse({
+            'message': 'Exercise logs retrieved successfully.',
+            'user_uid': user_uid,
+            'workout_date': workout_date,
+            'logs': logs_data
+        }, status=200)
+
+    except Exception as e:
+        return JsonResponse({'error': f'An error occurred: {str(e)}'}, status=500)
+
+
+@async_require_GET
+@async_negotiated_response
+@async_firebase_token_required
+async def exercises_by_date_range_view(request):
+    """Async ``GetExercisesByDateRangeView``."""
+    try:
+        user_uid = request.user_uid
+        start_date = request.GET.get('start_date')
+        end_date = request.GET.get('end_date')
+
+        if not start_date or not end_date:
+            return JsonResponse({'error': 'start_date and end_date are required.'}, status=400)
+
+        try:
+            datetime.strptime(start_date, "%Y-%m-%d")
+            datetime.strptime(end_date, "%Y-%m-%d")
+        except ValueError:
+            return JsonResponse({'error': 'Invalid date format. Use YYYY-MM-DD.'}, status=400)
+
+        logs_data = await aserialize_logs(ExerciseLog.objects.filter(
+            user_uid__user_uid=user_uid,
+            workout_date__range=[start_date, end_date]
+        ))
+
+        return JsonResponse({
+            'message': 'Exercise logs retrieved successfully.',
+            'user_uid': user_uid,
+            'start_date': start_date,
+            'end_date': end_date,
+            'logs': logs_data
+        }, status=200)
+
+    except Exception as e:
+        return JsonResponse({'error': f'An error occurred: {str(e)}'}, status=500)
+
+
+@async_require_GET
+@async_negotiated_response
+@async_firebase_token_required
+async def muscle_percentage_view(request):
+    """Async ``GetMusclePercentageView``."""
+    try:
+        user_uid = request.user_uid
+        workout_date = request.GET.get('workout_date')
+
+        if not workout_date:
+            return JsonResponse({'error': 'workout_date is required.'}, status=400)
+
+        muscle_percentages = await amuscle_percentages_for_range(user_uid, workout_date, workout_date)
+
+        if muscle_percentages is None:
+            return JsonResponse({
+                'message': 'No exercise logs found for the given date.',
+                'user_uid': user_uid,
+                'workout_date': workout_date,
+                'muscle_percentages': {}
+            }, status=200)
+
+        return JsonResponse({
+            'message': 'Muscle percentages calculated successfully.',
+            'user_uid': user_uid,
+            'workout_date': workout_date,
+            'muscle_percentages': muscle_percentages
+        }, status=200)
+
+    except Exception as e:
+        return JsonResponse({'error': f'An error occurred: {str(e)}'}, status=500)
+
+
+@async_require_GET
+@async_negotiated_response
+@async_firebase_token_required
+async def muscle_percentages_by_date_range_view(request):
+    """Async ``GetMusclePercentagesByDateRangeView``."""
+    try:
+        user_uid = request.user_uid
+        start_date = request.GET.get('start_date')
+        end_date = request.GET.get('end_date')
+
+        if not start_date or not end_date:
+            return JsonResponse({'error': 'start_date and end_date are required.'}, status=400)
+
+        try:
+            datetime.strptime(start_date, "%Y-%m-%d")
+            datetime.strptime(end_date, "%Y-%m-%d")
+        except ValueError:
+            return JsonResponse({'error': 'Invalid date format. Use YYYY-MM-DD.'}, status=400)
+
+        muscle_percentages = await amuscle_percentages_for_range(user_uid, start_date, end_date)
+
+        if muscle_percentages is None:
+            return JsonResponse({
+                'message': 'No exercise logs found for the given date range.',
+                'user_uid': user_uid,
+                'start_date': start_date,
+                'end_date': end_date,
+                'muscle_percentages': {}
+            }, status=200)
+
+        return JsonResponse({
+            'message': 'Muscle percentages calculated successfully.',
+            'user_uid': user_uid,
+            'start_date': start_date,
+            'end_date': end_date,
+            'muscle_percentages': muscle_percentages
+        }, status=200)
+
+    except Exception as e:
+        return JsonResponse({'error': f'An error occurred: {str(e)}'}, status=500)
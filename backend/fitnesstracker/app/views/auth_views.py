@@ -1,7 +1,7 @@
 from rest_framework.views import APIView
 from django.views.decorators.csrf import csrf_exempt
 from django.utils.decorators import method_decorator
-from django.http import JsonResponse
+from ..renderers import JsonResponse
 import json
 import requests
 
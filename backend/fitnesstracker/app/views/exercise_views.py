@@ -1,18 +1,47 @@
+import csv
 from datetime import timedelta, datetime
 from rest_framework.views import APIView
+from django.conf import settings
+from django.core.exceptions import ValidationError
+from django.db import transaction
+from django.utils import timezone
 from django.utils.decorators import method_decorator
-from django.http import JsonResponse
+from django.utils.http import http_date, quote_etag
+from django.views.decorators.cache import cache_control
+from django.views.decorators.http import condition
+from django.views.decorators.vary import vary_on_headers
+from django.core.handlers.asgi import ASGIRequest
+from django.core.serializers.json import DjangoJSONEncoder
+from django.http import HttpResponse, StreamingHttpResponse
+from ..renderers import InvalidPayload, JsonResponse, negotiated_response, parse_body
 from rest_framework.response import Response
 from rest_framework.pagination import PageNumberPagination
-from ..models import Exercise, ExerciseLog, User
-from ..serializers import ExerciseSerializer
+from ..models import ExerciseLog, User, normalize_exercise_id, sets_to_columns
+from ..serializers import ExerciseSerializer, log_values, row_payload, serialize_log, serialize_logs
+from ..catalog import aget_catalog, catalog_etag, catalog_last_modified, get_catalog, resolve_exercise, resolve_exercises
+from ..muscle_load import apply_log_change, apply_log_changes, log_snapshot, muscle_percentages_for_range
+from ..catalog_snapshot import get_catalog_snapshot, snapshot_etag, snapshot_last_modified
+from ..search import FACETS, get_facet_index, get_name_index
+from ..recommendations import get_recommendation_engine, max_level_for
+from ..pagination import HISTORY_ORDERING, InvalidCursor, paginate_logs
 from ..decorators.firebase_decorator import firebase_token_required
 import json
 
 
+# Catalog responses only change when the catalog version does: clients
+# revalidate with If-None-Match / If-Modified-Since and get a 304 without
+# the database being touched.
+catalog_conditional_get = [
+    cache_control(public=True, max_age=settings.EXERCISE_CATALOG_MAX_AGE),
+    vary_on_headers('Accept'),
+    condition(etag_func=catalog_etag, last_modified_func=catalog_last_modified),
+]
+
+
 class GetExercisesView(APIView):
+    @method_decorator(catalog_conditional_get)
     def get(self, request):
-        exercises = Exercise.objects.all()
+        exercises = list(get_catalog())
         paginator = PageNumberPagination()
         paginator.page_size = 50
         paginated_exercises = paginator.paginate_queryset(exercises, request)
@@ -21,12 +50,87 @@ class GetExercisesView(APIView):
         return paginator.get_paginated_response(serializer.data)
 
 
+class SearchExercisesView(APIView):
+    @method_decorator(catalog_conditional_get)
+    def get(self, request):
+        """
+        Filter the catalog by facets and return matches with facet counts.
+
+        Each facet in ``FACETS`` is a query parameter taking one or more
+        values, repeated or comma-separated (``?equipment=barbell,dumbbell``).
+        Values within a facet are alternatives; different facets must all
+        match. Answered entirely from the in-memory facet index.
+        """
+        filters = {}
+        for facet in FACETS:
+            values = [
+                value.strip()
+                for param in request.GET.getlist(facet)
+                for value in param.split(',')
+                if value.strip()
+            ]
+            if values:
+                filters[facet] = values
+
+        try:
+            offset = int(request.GET.get('offset', 0))
+            limit = int(request.GET.get('limit', settings.EXERCISE_SEARCH_PAGE_SIZE))
+        except ValueError:
+            return JsonResponse({'error': 'offset and limit must be integers.'}, status=400)
+        if offset < 0 or not 1 <= limit <= settings.EXERCISE_SEARCH_MAX_PAGE_SIZE:
+            return JsonResponse({'error': f'offset must be >= 0 and limit between 1 and {settings.EXERCISE_SEARCH_MAX_PAGE_SIZE}.'}, status=400)
+
+        index = get_facet_index()
+        mask, facet_counts = index.search(filters)
+
+        return JsonResponse({
+            'count': mask.bit_count(),
+            'offset': offset,
+            'limit': limit,
+            'results': [
+                {'id': exercise.id, 'name': exercise.name}
+                for exercise in index.exercises_in(mask, offset, limit)
+            ],
+            'facets': facet_counts
+        }, status=200)
+
+
+class SearchExerciseNamesView(APIView):
+    @method_decorator(catalog_conditional_get)
+    def get(self, request):
+        """
+        Typo-tolerant, ranked search of exercise names (``?q=bench pres``),
+        answered from the in-memory trigram index.
+        """
+        query = request.GET.get('q', '').strip()
+        if not query:
+            return JsonResponse({'error': 'q is required.'}, status=400)
+
+        try:
+            limit = int(request.GET.get('limit', 10))
+        except ValueError:
+            return JsonResponse({'error': 'limit must be an integer.'}, status=400)
+        if not 1 <= limit <= settings.EXERCISE_SEARCH_MAX_PAGE_SIZE:
+            return JsonResponse({'error': f'limit must be between 1 and {settings.EXERCISE_SEARCH_MAX_PAGE_SIZE}.'}, status=400)
+
+        matches = get_name_index().search(query, limit)
+
+        return JsonResponse({
+            'query': query,
+            'results': [
+                {'id': exercise.id, 'name': exercise.name, 'score': score}
+                for exercise, score in matches
+            ]
+        }, status=200)
+
+
 class CreateExerciseLogView(APIView):
+    @method_decorator(negotiated_response)
     @method_decorator(firebase_token_required)
     def post(self, request):
         try:
             # Parse the request body
-            data = json.loads(request.body)
+            data = parse_body(request)
 
             # Get the current user UID from the authenticated request
             user_uid = request.user_uid
@@ -37,47 +141,80 @@ class CreateExerciseLogView(APIView):
             workout_time = data.get('workout_time')
             sets = data.get('sets', [])
 
+            # Validate the sets before touching the database
+            try:
+                sets_to_columns(sets)
+            except ValueError as e:
+                return JsonResponse({'error': str(e)}, status=400)
+
             # Validate required fields
             if not exercise_id or not workout_date or not workout_time:
                 return JsonResponse({'error': 'exercise_id, workout_date, and workout_time are required.'}, status=400)
 
             # Validate that the exercise exists
-            try:
-                exercise = Exercise.objects.get(id__iexact=exercise_id)
-            except Exercise.DoesNotExist:
+            exercise = resolve_exercise(exercise_id)
+            if exercise is None:
                 return JsonResponse({'error': 'Invalid exercise_id. Exercise not found.'}, status=404)
 
-            # Create the exercise log
-            exercise_log = ExerciseLog.objects.create(
-                user_uid=User.objects.get(user_uid=user_uid),  # Fetch the user object
-                exercise_id=exercise,
-                workout_date=workout_date,
-                workout_time=workout_time,
-                sets=sets
-            )
+            # Create the exercise log and add it to the daily muscle loads
+            with transaction.atomic():
+                exercise_log = ExerciseLog.objects.create(
+                    user_uid=User.objects.get(user_uid=user_uid),  # Fetch the user object
+                    exercise_id_id=exercise.id,
+                    workout_date=workout_date,
+                    workout_time=workout_time,
+                    sets=sets
+                )
+                apply_log_change(user_uid, new=log_snapshot(exercise_log))
 
             # Return the created log data
             return JsonResponse({
                 'message': 'Exercise log created successfully.',
                 'log_id': exercise_log.log_id,
                 'user_uid': exercise_log.user_uid.user_uid,
-                'exercise_id': exercise_log.exercise_id.id,
+                'exercise_id': exercise_log.exercise_id_id,
                 'workout_date': exercise_log.workout_date,
                 'workout_time': exercise_log.workout_time,
                 'sets': exercise_log.sets
             }, status=201)
 
-        except json.JSONDecodeError:
-            return JsonResponse({'error': 'Invalid JSON payload.'}, status=400)
+        except InvalidPayload as e:
+            return JsonResponse({'error': str(e)}, status=400)
         except Exception as e:
             return JsonResponse({'error': f'An error occurred: {str(e)}'}, status=500)
 
 
+class CatalogSnapshotView(APIView):
+    @method_decorator([
+        cache_control(public=True, max_age=settings.EXERCISE_CATALOG_MAX_AGE),
+        vary_on_headers('Accept-Encoding'),
+        condition(etag_func=snapshot_etag, last_modified_func=snapshot_last_modified),
+    ])
+    def get(self, request):
+        """
+        The whole catalog, instructions and images included, as one
+        pre-serialized, pre-compressed body. Revalidate with the ETag to
+        download it again only when the catalog version changes.
+        """
+        snapshot = get_catalog_snapshot()
+        encoding, body = snapshot.body_for(request.headers.get('Accept-Encoding', ''))
+
+        response = HttpResponse(body, content_type='application/json')
+        if encoding != 'identity':
+            response['Content-Encoding'] = encoding
+        # Validators of the snapshot actually sent, in case a newer one was swapped in
+        # since the conditional check
+        response['ETag'] = quote_etag(snapshot.etag(encoding))
+        response['Last-Modified'] = http_date(snapshot.last_modified.timestamp())
+        response['X-Catalog-Version'] = str(snapshot.version)
+        return response
+
+
 class GetExerciseByIdView(APIView):
+    @method_decorator(catalog_conditional_get)
     def get(self, request, id):
-        try:
-            exercise = Exercise.objects.get(id__iexact=id)
-        except Exercise.DoesNotExist:
+        exercise = resolve_exercise(id)
+        if exercise is None:
             return Response({'error': 'Exercise not found'}, status=404)
 
         data = {
@@ -86,13 +223,14 @@ class GetExerciseByIdView(APIView):
             'force': exercise.force,
             'level': exercise.level,
             'mechanic': exercise.mechanic,
-            'primary_muscles': exercise.primary_muscles,
-            'secondary_muscles': exercise.secondary_muscles,
+            'primary_muscles': list(exercise.primary_muscles),
+            'secondary_muscles': list(exercise.secondary_muscles),
         }
 
         return Response(data)
     
 class GetExercisesByDateView(APIView):
+    @method_decorator(negotiated_response)
     @method_decorator(firebase_token_required)
     def get(self, request):
         try:
@@ -113,17 +251,7 @@ class GetExercisesByDateView(APIView):
                 workout_date=workout_date
             )
 
-            logs_data = [
-                {
-                    'log_id': log.log_id,
-                    'exercise_id': log.exercise_id.id,
-                    'exercise_name': log.exercise_id.name,
-                    'workout_date': log.workout_date,
-                    'workout_time': log.workout_time,
-                    'sets': log.sets
-                }
-                for log in exercise_logs
-            ]
+            logs_data = serialize_logs(exercise_logs)
 
             return JsonResponse({
                 'message': 'Exercise logs retrieved successfully.',
@@ -136,6 +264,7 @@ class GetExercisesByDateView(APIView):
             return JsonResponse({'error': f'An error occurred: {str(e)}'}, status=500)
         
 class GetMusclePercentageView(APIView):
+    @method_decorator(negotiated_response)
     @method_decorator(firebase_token_required)
     def get(self, request):
         try:
@@ -145,12 +274,9 @@ class GetMusclePercentageView(APIView):
             if not workout_date:
                 return JsonResponse({'error': 'workout_date is required.'}, status=400)
 
-            exercise_logs = ExerciseLog.objects.filter(
-                user_uid__user_uid=user_uid,
-                workout_date=workout_date
-            )
+            muscle_percentages = muscle_percentages_for_range(user_uid, workout_date, workout_date)
 
-            if not exercise_logs.exists():
+            if muscle_percentages is None:
                 return JsonResponse({
                     'message': 'No exercise logs found for the given date.',
                     'user_uid': user_uid,
@@ -158,36 +284,6 @@ class GetMusclePercentageView(APIView):
                     'muscle_percentages': {}
                 }, status=200)
 
-            all_muscle_groups = [
-                "abdominals", "abductors", "adductors", "biceps", "calves", "chest", "forearms",
-                "glutes", "hamstrings", "lats", "lower back", "middle back", "neck", "quadriceps",
-                "shoulders", "traps", "triceps"
-            ]
-
-            muscle_counts = {muscle: 0 for muscle in all_muscle_groups}
-
-            for log in exercise_logs:
-                try:
-                    exercise = Exercise.objects.get(id__iexact=log.exercise_id.id)
-                except Exercise.DoesNotExist:
-                    continue
-
-                for exercise_set in log.sets:
-                    reps = exercise_set['reps']
-                    weight = exercise_set['weight']
-                    set_weight_factor = reps * weight
-
-                    for muscle in exercise.primary_muscles:
-                        muscle_counts[muscle] += (2 * set_weight_factor)
-
-                    for muscle in exercise.secondary_muscles:
-                        muscle_counts[muscle] += (1 * set_weight_factor)
-
-            muscle_percentages = {
-                muscle: min(round((count / 10000) * 100, 2), 100)
-                for muscle, count in muscle_counts.items()
-            }
-
             return JsonResponse({
                 'message': 'Muscle percentages calculated successfully.',
                 'user_uid': user_uid,
@@ -201,6 +297,7 @@ class GetMusclePercentageView(APIView):
             return JsonResponse({'error': f'An error occurred: {str(e)}'}, status=500)
         
 class GetExercisesLogView(APIView):
+    @method_decorator(negotiated_response)
     @method_decorator(firebase_token_required)
     def get(self, request):
         try:
@@ -221,14 +318,7 @@ class GetExercisesLogView(APIView):
                 log_id=log_id
             )
 
-            log_data = {
-                'log_id': exercise_log.log_id,
-                'exercise_id': exercise_log.exercise_id.id,
-                'exercise_name': exercise_log.exercise_id.name,
-                'workout_date': exercise_log.workout_date,
-                'workout_time': exercise_log.workout_time,
-                'sets': exercise_log.sets
-            }
+            log_data = serialize_log(exercise_log)
 
             return JsonResponse({
                 'message': 'Exercise log retrieved successfully.',
@@ -242,10 +332,11 @@ class GetExercisesLogView(APIView):
             return JsonResponse({'error': f'An error occurred: {str(e)}'}, status=500)
         
 class EditExerciseLogView(APIView):
+    @method_decorator(negotiated_response)
     @method_decorator(firebase_token_required)
     def put(self, request):
         try:
-            data = json.loads(request.body)
+            data = parse_body(request)
             user_uid = request.user_uid
             log_id = data.get('log_id')
             exercise_id = data.get('exercise_id')
@@ -253,50 +344,54 @@ class EditExerciseLogView(APIView):
             workout_time = data.get('workout_time')
             sets = data.get('sets', [])
 
+            # Validate the sets before touching the database
+            try:
+                sets_to_columns(sets)
+            except ValueError as e:
+                return JsonResponse({'error': str(e)}, status=400)
+
             if not log_id:
                 return JsonResponse({'error': 'log_id is required.'}, status=400)
 
-            try:
-                exercise_log = ExerciseLog.objects.get(log_id=log_id, user_uid__user_uid=user_uid)
-            except ExerciseLog.DoesNotExist:
-                return JsonResponse({'error': 'Exercise log not found.'}, status=404)
-
-            if exercise_id:
+            # Lock the existing log so its old contribution to the daily muscle loads is exact
+            with transaction.atomic():
                 try:
-                    exercise = Exercise.objects.get(id__iexact=exercise_id)
-                    exercise_log.exercise_id = exercise
-                except Exercise.DoesNotExist:
-                    return JsonResponse({'error': 'Invalid exercise_id. Exercise not found.'}, status=404)
+                    exercise_log = ExerciseLog.objects.select_for_update().get(log_id=log_id, user_uid__user_uid=user_uid)
+                except ExerciseLog.DoesNotExist:
+                    return JsonResponse({'error': 'Exercise log not found.'}, status=404)
+
+                old_snapshot = log_snapshot(exercise_log)
 
-            if workout_date:
-                exercise_log.workout_date = workout_date
+                if exercise_id:
+                    exercise = resolve_exercise(exercise_id)
+                    if exercise is None:
+                        return JsonResponse({'error': 'Invalid exercise_id. Exercise not found.'}, status=404)
+                    exercise_log.exercise_id_id = exercise.id
 
-            if workout_time:
-                exercise_log.workout_time = workout_time
+                if workout_date:
+                    exercise_log.workout_date = workout_date
 
-            if sets:
-                exercise_log.sets = sets
+                if workout_time:
+                    exercise_log.workout_time = workout_time
 
-            exercise_log.save()
+                if sets:
+                    exercise_log.sets = sets
+
+                exercise_log.save()
+                apply_log_change(user_uid, old=old_snapshot, new=log_snapshot(exercise_log))
 
             return JsonResponse({
                 'message': 'Exercise log updated successfully.',
-                'log': {
-                    'log_id': exercise_log.log_id,
-                    'exercise_id': exercise_log.exercise_id.id,
-                    'exercise_name': exercise_log.exercise_id.name,
-                    'workout_date': exercise_log.workout_date,
-                    'workout_time': exercise_log.workout_time,
-                    'sets': exercise_log.sets
-                }
+                'log': serialize_log(exercise_log)
             }, status=200)
 
-        except json.JSONDecodeError:
-            return JsonResponse({'error': 'Invalid JSON payload.'}, status=400)
+        except InvalidPayload as e:
+            return JsonResponse({'error': str(e)}, status=400)
         except Exception as e:
             return JsonResponse({'error': f'An error occurred: {str(e)}'}, status=500)
         
 class GetExercisesByDateRangeView(APIView):
+    @method_decorator(negotiated_response)
     @method_decorator(firebase_token_required)
     def get(self, request):
         try:
@@ -323,17 +418,7 @@ class GetExercisesByDateRangeView(APIView):
             )
 
             # Prepare the logs data
-            logs_data = [
-                {
-                    'log_id': log.log_id,
-                    'exercise_id': log.exercise_id.id,
-                    'exercise_name': log.exercise_id.name,
-                    'workout_date': log.workout_date,
-                    'workout_time': log.workout_time,
-                    'sets': log.sets
-                }
-                for log in exercise_logs
-            ]
+            logs_data = serialize_logs(exercise_logs)
 
             return JsonResponse({
                 'message': 'Exercise logs retrieved successfully.',
@@ -348,6 +433,7 @@ class GetExercisesByDateRangeView(APIView):
 
 
 class GetMusclePercentagesByDateRangeView(APIView):
+    @method_decorator(negotiated_response)
     @method_decorator(firebase_token_required)
     def get(self, request):
         try:
@@ -367,13 +453,9 @@ class GetMusclePercentagesByDateRangeView(APIView):
             except ValueError:
                 return JsonResponse({'error': 'Invalid date format. Use YYYY-MM-DD.'}, status=400)
 
-            # Fetch exercise logs for the given date range
-            exercise_logs = ExerciseLog.objects.filter(
-                user_uid__user_uid=user_uid,
-                workout_date__range=[start_date, end_date]
-            )
+            muscle_percentages = muscle_percentages_for_range(user_uid, start_date, end_date)
 
-            if not exercise_logs.exists():
+            if muscle_percentages is None:
                 return JsonResponse({
                     'message': 'No exercise logs found for the given date range.',
                     'user_uid': user_uid,
@@ -382,54 +464,94 @@ class GetMusclePercentagesByDateRangeView(APIView):
                     'muscle_percentages': {}
                 }, status=200)
 
-            all_muscle_groups = [
-                "abdominals", "abductors", "adductors", "biceps", "calves", "chest", "forearms",
-                "glutes", "hamstrings", "lats", "lower back", "middle back", "neck", "quadriceps",
-                "shoulders", "traps", "triceps"
-            ]
+            return JsonResponse({
+                'message': 'Muscle percentages calculated successfully.',
+                'user_uid': user_uid,
+                'start_date': start_date,
+                'end_date': end_date,
+                'muscle_percentages': muscle_percentages
+            }, status=200)
 
-            muscle_counts = {muscle: 0 for muscle in all_muscle_groups}
+        except Exception as e:
+            return JsonResponse({'error': f'An error occurred: {str(e)}'}, status=500)
 
-            for log in exercise_logs:
-                try:
-                    exercise = Exercise.objects.get(id__iexact=log.exercise_id.id)
-                except Exercise.DoesNotExist:
-                    continue
+class RecommendExercisesView(APIView):
+    @method_decorator(negotiated_response)
+    @method_decorator(firebase_token_required)
+    def get(self, request):
+        """
+        Recommend exercises for the muscles the user has trained least over
+        the last ``days`` days (default 7) up to ``end_date`` (default today).
+
+        Exercises are limited to the user's fitness level and, when
+        ``equipment`` is given (comma-separated), to that equipment plus
+        bodyweight exercises.
+        """
+        try:
+            user_uid = request.user_uid
 
-                for exercise_set in log.sets:
-                    reps = exercise_set['reps']
-                    weight = exercise_set['weight']
-                    set_weight_factor = reps * weight
+            try:
+                days = int(request.GET.get('days', 7))
+                limit = int(request.GET.get('limit', 10))
+            except ValueError:
+                return JsonResponse({'error': 'days and limit must be integers.'}, status=400)
+            if not 1 <= days <= 365 or not 1 <= limit <= 100:
+                return JsonResponse({'error': 'days must be between 1 and 365 and limit between 1 and 100.'}, status=400)
 
-                    for muscle in exercise.primary_muscles:
-                        muscle_counts[muscle] += (2 * set_weight_factor)
+            end_date = request.GET.get('end_date')
+            try:
+                end_date = datetime.strptime(end_date, "%Y-%m-%d").date() if end_date else timezone.localdate()
+            except ValueError:
+                return JsonResponse({'error': 'Invalid date format. Use YYYY-MM-DD.'}, status=400)
+            start_date = end_date - timedelta(days=days - 1)
+
+            equipment = request.GET.get('equipment')
+            if equipment is not None:
+                equipment = [value.strip() for value in equipment.split(',') if value.strip()]
 
-                    for muscle in exercise.secondary_muscles:
-                        muscle_counts[muscle] += (1 * set_weight_factor)
+            fitness_level = User.objects.filter(user_uid=user_uid).values_list('fitness_level', flat=True).first()
+            if fitness_level is None:
+                return JsonResponse({'error': 'User not found.'}, status=404)
 
-            muscle_percentages = {
-                muscle: min(round((count / 10000) * 100, 2), 100)
-                for muscle, count in muscle_counts.items()
-            }
+            muscle_percentages = muscle_percentages_for_range(user_uid, start_date, end_date) or {}
+            max_level = max_level_for(fitness_level)
+            recommendations = get_recommendation_engine().recommend(
+                muscle_percentages, max_level=max_level, equipment=equipment, limit=limit
+            )
 
             return JsonResponse({
-                'message': 'Muscle percentages calculated successfully.',
+                'message': 'Exercise recommendations generated successfully.',
                 'user_uid': user_uid,
                 'start_date': start_date,
                 'end_date': end_date,
-                'muscle_percentages': muscle_percentages
+                'max_level': max_level,
+                'muscle_percentages': muscle_percentages,
+                'recommendations': [
+                    {
+                        'id': exercise.id,
+                        'name': exercise.name,
+                        'level': exercise.level,
+                        'equipment': exercise.equipment,
+                        'primary_muscles': list(exercise.primary_muscles),
+                        'secondary_muscles': list(exercise.secondary_muscles),
+                        'score': score
+                    }
+                    for exercise, score in recommendations
+                ]
             }, status=200)
 
         except Exception as e:
             return JsonResponse({'error': f'An error occurred: {str(e)}'}, status=500)
 
+
 class ExerciseLogView(APIView):
+    @method_decorator(negotiated_response)
     @method_decorator(firebase_token_required)
     def post(self, request):
         """Create a new exercise log."""
         try:
             # Parse the request body
-            data = json.loads(request.body)
+            data = parse_body(request)
             user_uid = request.user_uid
 
             # Extract required data
@@ -438,47 +560,55 @@ class ExerciseLogView(APIView):
             workout_time = data.get('workout_time')
             sets = data.get('sets', [])
 
+            # Validate the sets before touching the database
+            try:
+                sets_to_columns(sets)
+            except ValueError as e:
+                return JsonResponse({'error': str(e)}, status=400)
+
             # Validate required fields
             if not exercise_id or not workout_date or not workout_time:
                 return JsonResponse({'error': 'exercise_id, workout_date, and workout_time are required.'}, status=400)
 
             # Validate that the exercise exists
-            try:
-                exercise = Exercise.objects.get(id__iexact=exercise_id)
-            except Exercise.DoesNotExist:
+            exercise = resolve_exercise(exercise_id)
+            if exercise is None:
                 return JsonResponse({'error': 'Invalid exercise_id. Exercise not found.'}, status=404)
 
-            # Create the exercise log
-            exercise_log = ExerciseLog.objects.create(
-                user_uid=User.objects.get(user_uid=user_uid),
-                exercise_id=exercise,
-                workout_date=workout_date,
-                workout_time=workout_time,
-                sets=sets
-            )
+            # Create the exercise log and add it to the daily muscle loads
+            with transaction.atomic():
+                exercise_log = ExerciseLog.objects.create(
+                    user_uid=User.objects.get(user_uid=user_uid),
+                    exercise_id_id=exercise.id,
+                    workout_date=workout_date,
+                    workout_time=workout_time,
+                    sets=sets
+                )
+                apply_log_change(user_uid, new=log_snapshot(exercise_log))
 
             # Return the created log data
             return JsonResponse({
                 'message': 'Exercise log created successfully.',
                 'log_id': exercise_log.log_id,
                 'user_uid': exercise_log.user_uid.user_uid,
-                'exercise_id': exercise_log.exercise_id.id,
+                'exercise_id': exercise_log.exercise_id_id,
                 'workout_date': exercise_log.workout_date,
                 'workout_time': exercise_log.workout_time,
                 'sets': exercise_log.sets
             }, status=201)
 
-        except json.JSONDecodeError:
-            return JsonResponse({'error': 'Invalid JSON payload.'}, status=400)
+        except InvalidPayload as e:
+            return JsonResponse({'error': str(e)}, status=400)
         except Exception as e:
             return JsonResponse({'error': f'An error occurred: {str(e)}'}, status=500)
 
+    @method_decorator(negotiated_response)
     @method_decorator(firebase_token_required)
     def put(self, request):
 
         """Update an existing exercise log."""
         try:
-            data = json.loads(request.body)
+            data = parse_body(request)
             user_uid = request.user_uid
 
             # Extract required data
@@ -488,53 +618,92 @@ class ExerciseLogView(APIView):
             workout_time = data.get('workout_time')
             sets = data.get('sets', [])
 
+            # Validate the sets before touching the database
+            try:
+                sets_to_columns(sets)
+            except ValueError as e:
+                return JsonResponse({'error': str(e)}, status=400)
+
             if not log_id:
                 return JsonResponse({'error': 'log_id is required.'}, status=400)
 
-            # Validate and fetch the existing log
-            try:
-                exercise_log = ExerciseLog.objects.get(log_id=log_id, user_uid__user_uid=user_uid)
-            except ExerciseLog.DoesNotExist:
-                return JsonResponse({'error': 'Exercise log not found.'}, status=404)
-
-            # Update fields if provided
-            if exercise_id:
+            # Lock the existing log so its old contribution to the daily muscle loads is exact
+            with transaction.atomic():
                 try:
-                    exercise = Exercise.objects.get(id__iexact=exercise_id)
-                    exercise_log.exercise_id = exercise
-                except Exercise.DoesNotExist:
-                    return JsonResponse({'error': 'Invalid exercise_id. Exercise not found.'}, status=404)
+                    exercise_log = ExerciseLog.objects.select_for_update().get(log_id=log_id, user_uid__user_uid=user_uid)
+                except ExerciseLog.DoesNotExist:
+                    return JsonResponse({'error': 'Exercise log not found.'}, status=404)
+
+                old_snapshot = log_snapshot(exercise_log)
 
-            if workout_date:
-                exercise_log.workout_date = workout_date
+                # Update fields if provided
+                if exercise_id:
+                    exercise = resolve_exercise(exercise_id)
+                    if exercise is None:
+                        return JsonResponse({'error': 'Invalid exercise_id. Exercise not found.'}, status=404)
+                    exercise_log.exercise_id_id = exercise.id
 
-            if workout_time:
-                exercise_log.workout_time = workout_time
+                if workout_date:
+                    exercise_log.workout_date = workout_date
 
-            if sets:
-                exercise_log.sets = sets
+                if workout_time:
+                    exercise_log.workout_time = workout_time
 
-            # Save changes
-            exercise_log.save()
+                if sets:
+                    exercise_log.sets = sets
+
+                # Save changes and move the log's contribution in the daily muscle loads
+                exercise_log.save()
+                apply_log_change(user_uid, old=old_snapshot, new=log_snapshot(exercise_log))
 
             # Return the updated log data
             return JsonResponse({
                 'message': 'Exercise log updated successfully.',
-                'log': {
-                    'log_id': exercise_log.log_id,
-                    'exercise_id': exercise_log.exercise_id.id,
-                    'exercise_name': exercise_log.exercise_id.name,
-                    'workout_date': exercise_log.workout_date,
-                    'workout_time': exercise_log.workout_time,
-                    'sets': exercise_log.sets
-                }
+                'log': serialize_log(exercise_log)
             }, status=200)
 
-        except json.JSONDecodeError:
-            return JsonResponse({'error': 'Invalid JSON payload.'}, status=400)
+        except InvalidPayload as e:
+            return JsonResponse({'error': str(e)}, status=400)
         except Exception as e:
             return JsonResponse({'error': f'An error occurred: {str(e)}'}, status=500)
         
+    @method_decorator(negotiated_response)
+    @method_decorator(firebase_token_required)
+    def delete(self, request):
+        """Delete an exercise log."""
+        try:
+            user_uid = request.user_uid
+            log_id = request.GET.get('log_id')
+
+            if not log_id:
+                return JsonResponse({'error': 'log_id is required.'}, status=400)
+
+            try:
+                # Ensure log_id is an integer
+                log_id = int(log_id)
+            except ValueError:
+                return JsonResponse({'error': 'log_id must be an integer.'}, status=400)
+
+            # Remove the log and its contribution to the daily muscle loads together
+            with transaction.atomic():
+                try:
+                    exercise_log = ExerciseLog.objects.select_for_update().get(log_id=log_id, user_uid__user_uid=user_uid)
+                except ExerciseLog.DoesNotExist:
+                    return JsonResponse({'error': 'Exercise log not found.'}, status=404)
+
+                apply_log_change(user_uid, old=log_snapshot(exercise_log))
+                exercise_log.delete()
+
+            return JsonResponse({
+                'message': 'Exercise log deleted successfully.',
+                'user_uid': user_uid,
+                'log_id': log_id
+            }, status=200)
+
+        except Exception as e:
+            return JsonResponse({'error': f'An error occurred: {str(e)}'}, status=500)
+
+    @method_decorator(negotiated_response)
     @method_decorator(firebase_token_required)
     def get(self, request):
         try:
@@ -557,14 +726,7 @@ class ExerciseLogView(APIView):
                 except ExerciseLog.DoesNotExist:
                     return JsonResponse({'error': 'Exercise log not found.'}, status=404)
 
-                log_data = {
-                    'log_id': exercise_log.log_id,
-                    'exercise_id': exercise_log.exercise_id.id,
-                    'exercise_name': exercise_log.exercise_id.name,
-                    'workout_date': exercise_log.workout_date,
-                    'workout_time': exercise_log.workout_time,
-                    'sets': exercise_log.sets
-                }
+                log_data = serialize_log(exercise_log)
 
                 return JsonResponse({
                     'message': 'Exercise log retrieved successfully.',
@@ -573,28 +735,220 @@ class ExerciseLogView(APIView):
                 }, status=200)
 
             else:
-                # Retrieve all logs for the authenticated user
-                exercise_logs = ExerciseLog.objects.filter(
-                    user_uid__user_uid=user_uid
-                ).order_by('-workout_date', '-workout_time')
+                # Retrieve one page of the authenticated user's logs, newest first
+                try:
+                    page_size = int(request.GET.get('page_size', settings.EXERCISE_LOG_PAGE_SIZE))
+                except ValueError:
+                    return JsonResponse({'error': 'page_size must be an integer.'}, status=400)
+                if not 1 <= page_size <= settings.EXERCISE_LOG_MAX_PAGE_SIZE:
+                    return JsonResponse({'error': f'page_size must be between 1 and {settings.EXERCISE_LOG_MAX_PAGE_SIZE}.'}, status=400)
 
-                logs_data = [
-                    {
-                        'log_id': log.log_id,
-                        'exercise_id': log.exercise_id.id,
-                        'exercise_name': log.exercise_id.name,
-                        'workout_date': log.workout_date,
-                        'workout_time': log.workout_time,
-                        'sets': log.sets
-                    }
-                    for log in exercise_logs
-                ]
+                try:
+                    exercise_logs, next_cursor = paginate_logs(
+                        ExerciseLog.objects.filter(user_uid__user_uid=user_uid),
+                        cursor=request.GET.get('cursor'),
+                        page_size=page_size
+                    )
+                except InvalidCursor:
+                    return JsonResponse({'error': 'Invalid cursor.'}, status=400)
+
+                logs_data = serialize_logs(exercise_logs)
 
                 return JsonResponse({
                     'message': 'Exercise logs retrieved successfully.',
                     'user_uid': user_uid,
-                    'logs': logs_data
+                    'logs': logs_data,
+                    'next_cursor': next_cursor
                 }, status=200)
 
         except Exception as e:
-            return JsonResponse({'error': f'An error occurred: {str(e)}'}, status=500)
\ No newline at end of file
+            return JsonResponse({'error': f'An error occurred: {str(e)}'}, status=500)
+
+
+def validate_log_item(item):
+    """
+    Check one log of a bulk upload; return ``(status, error)`` when it is
+    invalid or None when it can be created.
+    """
+    if not isinstance(item, dict):
+        return 400, 'Each log must be a JSON object.'
+
+    if not item.get('exercise_id') or not item.get('workout_date') or not item.get('workout_time'):
+        return 400, 'exercise_id, workout_date, and workout_time are required.'
+
+    try:
+        ExerciseLog._meta.get_field('workout_date').to_python(item['workout_date'])
+        ExerciseLog._meta.get_field('workout_time').to_python(item['workout_time'])
+    except ValidationError:
+        return 400, 'Invalid workout_date or workout_time. Use YYYY-MM-DD and HH:MM[:SS].'
+
+    try:
+        sets_to_columns(item.get('sets', []))
+    except ValueError as e:
+        return 400, str(e)
+
+    return None
+
+
+class BulkExerciseLogView(APIView):
+    @method_decorator(negotiated_response)
+    @method_decorator(firebase_token_required)
+    def post(self, request):
+        """
+        Create many exercise logs at once, e.g. when the app syncs logs made
+        offline. Invalid items are reported individually and do not stop
+        the rest of the batch from being created.
+        """
+        try:
+            data = parse_body(request)
+            user_uid = request.user_uid
+
+            items = data.get('logs') if isinstance(data, dict) else None
+            if not isinstance(items, list) or not items:
+                return JsonResponse({'error': 'logs must be a non-empty list.'}, status=400)
+
+            max_logs = getattr(settings, 'EXERCISE_LOG_BULK_MAX', 500)
+            if len(items) > max_logs:
+                return JsonResponse({'error': f'At most {max_logs} logs can be sent per request.'}, status=400)
+
+            if not User.objects.filter(user_uid=user_uid).exists():
+                return JsonResponse({'error': 'User not found.'}, status=404)
+
+            # Validate every item, resolving all exercise ids in one pass
+            results = [None] * len(items)
+            for index, item in enumerate(items):
+                invalid = validate_log_item(item)
+                if invalid:
+                    results[index] = {'status': invalid[0], 'error': invalid[1]}
+
+            exercises = resolve_exercises(
+                item['exercise_id'] for index, item in enumerate(items) if results[index] is None
+            )
+
+            pending = []
+            for index, item in enumerate(items):
+                if results[index] is not None:
+                    continue
+                exercise = exercises.get(normalize_exercise_id(item['exercise_id']))
+                if exercise is None:
+                    results[index] = {'status': 404, 'error': 'Invalid exercise_id. Exercise not found.'}
+                    continue
+                pending.append((index, ExerciseLog(
+                    user_uid_id=user_uid,
+                    exercise_id_id=exercise.id,
+                    workout_date=item['workout_date'],
+                    workout_time=item['workout_time'],
+                    sets=item.get('sets', [])
+                )))
+
+            # Insert the valid logs and their daily muscle loads together
+            with transaction.atomic():
+                created = ExerciseLog.objects.bulk_create([log for _, log in pending])
+                apply_log_changes(user_uid, added=[log_snapshot(log) for log in created])
+
+            for (index, _), exercise_log in zip(pending, created):
+                results[index] = {
+                    'status': 201,
+                    'log_id': exercise_log.log_id,
+                    'exercise_id': exercise_log.exercise_id_id,
+                    'workout_date': exercise_log.workout_date,
+                    'workout_time': exercise_log.workout_time,
+                    'sets': exercise_log.sets
+                }
+
+            for index, (item, result) in enumerate(zip(items, results)):
+                result['index'] = index
+                if isinstance(item, dict) and 'client_id' in item:
+                    result['client_id'] = item['client_id']
+
+            return JsonResponse({
+                'message': 'Exercise logs processed.',
+                'user_uid': user_uid,
+                'created': len(created),
+                'failed': len(items) - len(created),
+                'results': results
+            }, status=200)
+
+        except InvalidPayload as e:
+            return JsonResponse({'error': str(e)}, status=400)
+        except Exception as e:
+            return JsonResponse({'error': f'An error occurred: {str(e)}'}, status=500)
+
+
+class Echo:
+    """File-like object whose write() returns the value, for streaming csv.writer output."""
+    def write(self, value):
+        return value
+
+
+EXPORT_COLUMNS = ['log_id', 'exercise_id', 'exercise_name', 'workout_date', 'workout_time', 'sets']
+
+
+def export_encoder(export_type):
+    """
+    ``(header, encode)`` of an export type: its first line (or None) and a
+    function encoding one log payload as a line.
+    """
+    if export_type == 'csv':
+        writer = csv.writer(Echo())
+
+        def encode(record):
+            record['sets'] = json.dumps(record['sets'])  # sets as a JSON cell
+            return writer.writerow(record[column] for column in EXPORT_COLUMNS)
+        return writer.writerow(EXPORT_COLUMNS), encode
+
+    encoder = DjangoJSONEncoder()
+    return None, lambda record: encoder.encode(record) + '\n'
+
+
+def export_lines(rows, export_type):
+    """Lines of an export of ``log_values`` rows, read lazily."""
+    header, encode = export_encoder(export_type)
+    if header is not None:
+        yield header
+    catalog = get_catalog()
+    for row in rows:
+        yield encode(row_payload(row, catalog))
+
+
+async def aexport_lines(rows, export_type):
+    """``export_lines`` over an async iterator of rows."""
+    header, encode = export_encoder(export_type)
+    if header is not None:
+        yield header
+    catalog = await aget_catalog()
+    async for row in rows:
+        yield encode(row_payload(row, catalog))
+
+
+class ExportExerciseLogsView(APIView):
+    @method_decorator(firebase_token_required)
+    def get(self, request):
+        """
+        Stream the user's whole log history as NDJSON (default) or CSV.
+
+        Rows are read with a server-side cursor, ``EXERCISE_LOG_EXPORT_CHUNK_SIZE``
+        at a time, and written as they arrive, so memory use does not grow
+        with the number of logs. Under ASGI the rows are read with the async
+        ORM: Django 4.2 would collect a plain iterator into a list before
+        sending the first byte.
+        """
+        user_uid = request.user_uid
+        export_type = request.GET.get('type', 'ndjson')
+        if export_type not in ('ndjson', 'csv'):
+            return JsonResponse({'error': 'type must be ndjson or csv.'}, status=400)
+
+        rows = log_values(
+            ExerciseLog.objects.filter(user_uid__user_uid=user_uid).order_by(*HISTORY_ORDERING)
+        )
+        chunk_size = settings.EXERCISE_LOG_EXPORT_CHUNK_SIZE
+        if isinstance(request._request, ASGIRequest):
+            content = aexport_lines(rows.aiterator(chunk_size=chunk_size), export_type)
+        else:
+            content = export_lines(rows.iterator(chunk_size=chunk_size), export_type)
+        content_type = 'text/csv' if export_type == 'csv' else 'application/x-ndjson'
+
+        response = StreamingHttpResponse(content, content_type=content_type)
+        response['Content-Disposition'] = f'attachment; filename="exercise_logs.{export_type}"'
+        return response
+
@@ -1,13 +1,21 @@
-from django.http import JsonResponse
+from ..renderers import JsonResponse, negotiated_response
 from firebase_admin import auth as firebase_auth
 from rest_framework.views import APIView
 from django.utils.decorators import method_decorator
 from ..decorators.firebase_decorator import firebase_token_required
 from django.views.decorators.csrf import csrf_exempt
 import json
-from ..models import ExerciseLog, Exercise, User
+from ..models import User
+from ..catalog import get_catalog
 from datetime import timedelta, datetime
-from django.db.models import Count
+from django.contrib.postgres.aggregates import ArrayAgg
+from django.db.models import Count, FilteredRelation, Func, IntegerField, Q, Sum
+
+
+class Cardinality(Func):
+    """Postgres ``cardinality(array)``: number of elements, 0 for an empty array."""
+    function = 'CARDINALITY'
+    output_field = IntegerField()
 
 
 class GetUidView(APIView):
@@ -115,7 +123,67 @@ class DeleteUserView(APIView):
         })
     
 
+def dashboard_queryset(user_uid, start_date, end_date):
+    """
+    One-row ``values()`` queryset with the user's name and stats for the
+    week ``start_date``..``end_date`` and the week before it.
+
+    Both weeks are aggregated in a single query. The log join is restricted
+    to the two windows, so older history is never read and a user without
+    logs still comes back as one row.
+    """
+    prev_start_date = start_date - timedelta(days=7)
+    prev_end_date = end_date - timedelta(days=7)
+    current_week = Q(week_logs__workout_date__range=[start_date, end_date])
+    previous_week = Q(week_logs__workout_date__range=[prev_start_date, prev_end_date])
+
+    return User.objects.filter(user_uid=user_uid).annotate(
+        week_logs=FilteredRelation('exerciselog', condition=(
+            Q(exerciselog__workout_date__range=[start_date, end_date]) |
+            Q(exerciselog__workout_date__range=[prev_start_date, prev_end_date])
+        )),
+    ).annotate(
+        current_week_num_logs=Count('week_logs', filter=current_week),
+        previous_week_num_logs=Count('week_logs', filter=previous_week),
+        current_week_sets=Sum(Cardinality('week_logs__set_reps'), filter=current_week),
+        previous_week_sets=Sum(Cardinality('week_logs__set_reps'), filter=previous_week),
+        current_week_exercises=ArrayAgg('week_logs__exercise_id', filter=current_week, distinct=True),
+        previous_week_exercises=ArrayAgg('week_logs__exercise_id', filter=previous_week, distinct=True),
+    ).values(
+        'name', 'current_week_num_logs', 'previous_week_num_logs', 'current_week_sets',
+        'previous_week_sets', 'current_week_exercises', 'previous_week_exercises',
+    )
+
+
+def dashboard_payload(dashboard, catalog, start_date_str, end_date_str):
+    """Dashboard response body from a ``dashboard_queryset`` row."""
+    # Get unique muscles for current and previous weeks from the catalog
+    current_week_num_muscles = len(catalog.muscles_for(dashboard['current_week_exercises'] or ()))
+    previous_week_num_muscles = len(catalog.muscles_for(dashboard['previous_week_exercises'] or ()))
+
+    # Hardcoded progress percentage
+    progress_percentage = 79  # Placeholder value
+
+    return {
+        "firstName": dashboard['name'].split(' ')[0],
+        "start_date": start_date_str,
+        "end_date": end_date_str,
+        "currentWeek": {
+            "numOfLogs": dashboard['current_week_num_logs'],
+            "numOfMuscles": current_week_num_muscles,
+            "numOfSets": dashboard['current_week_sets'] or 0
+        },
+        "previousWeek": {
+            "numOfLogs": dashboard['previous_week_num_logs'],
+            "numOfMuscles": previous_week_num_muscles,
+            "numOfSets": dashboard['previous_week_sets'] or 0
+        },
+        "progressPercentage": progress_percentage
+    }
+
+
 class GetDashboardDataView(APIView):
+    @method_decorator(negotiated_response)
     @method_decorator(firebase_token_required)
     def get(self, request):
         try:
@@ -132,74 +200,8 @@ class GetDashboardDataView(APIView):
             start_date = datetime.strptime(start_date_str, "%Y-%m-%d").date()
             end_date = datetime.strptime(end_date_str, "%Y-%m-%d").date()
 
-            # Define the previous week date range
-            prev_start_date = start_date - timedelta(days=7)
-            prev_end_date = end_date - timedelta(days=7)
-
-            # Fetch exercise logs for the current week and previous week
-            current_week_logs = ExerciseLog.objects.filter(
-                user_uid__user_uid=user_uid,
-                workout_date__range=[start_date, end_date]
-            )
-
-            previous_week_logs = ExerciseLog.objects.filter(
-                user_uid__user_uid=user_uid,
-                workout_date__range=[prev_start_date, prev_end_date]
-            )
-
-            # Calculate the number of logs for current and previous weeks
-            current_week_num_logs = current_week_logs.count()
-            previous_week_num_logs = previous_week_logs.count()
-
-            # Calculate the total number of sets for current and previous weeks
-            current_week_sets = sum(
-                [len(log.sets) for log in current_week_logs if log.sets]
-            )
-
-            previous_week_sets = sum(
-                [len(log.sets) for log in previous_week_logs if log.sets]
-            )
-
-            # Get unique muscles for current week
-            current_week_exercises = Exercise.objects.filter(
-                id__in=current_week_logs.values_list('exercise_id', flat=True)
-            )
-            current_week_muscles = set()
-            for exercise in current_week_exercises:
-                current_week_muscles.update(exercise.primary_muscles)
-                current_week_muscles.update(exercise.secondary_muscles)
-            current_week_num_muscles = len(current_week_muscles)
-
-            # Get unique muscles for previous week
-            previous_week_exercises = Exercise.objects.filter(
-                id__in=previous_week_logs.values_list('exercise_id', flat=True)
-            )
-            previous_week_muscles = set()
-            for exercise in previous_week_exercises:
-                previous_week_muscles.update(exercise.primary_muscles)
-                previous_week_muscles.update(exercise.secondary_muscles)
-            previous_week_num_muscles = len(previous_week_muscles)
-
-            # Hardcoded progress percentage
-            progress_percentage = 79  # Placeholder value
-
-            # Prepare response data
-            response_data = {
-                "firstName": User.objects.get(user_uid=user_uid).name.split(' ')[0],
-                "start_date": start_date_str,
-                "end_date": end_date_str,
-                "currentWeek": {
-                    "numOfLogs": current_week_num_logs,
-                    "numOfMuscles": current_week_num_muscles,
-                    "numOfSets": current_week_sets
-                },
-                "previousWeek": {
-                    "numOfLogs": previous_week_num_logs,
-                    "numOfMuscles": previous_week_num_muscles,
-                    "numOfSets": previous_week_sets
-                },
-                "progressPercentage": progress_percentage
-            }
+            dashboard = dashboard_queryset(user_uid, start_date, end_date).get()
+            response_data = dashboard_payload(dashboard, get_catalog(), start_date_str, end_date_str)
 
             return JsonResponse(response_data, status=200)
 
@@ -14,3 +14,18 @@ from django.core.asgi import get_asgi_application
 os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'fitnesstracker.settings')
 
 application = get_asgi_application()
+
+# Load the exercise catalog, its snapshot and token signing keys before the first request needs them.
+from django.db import connections  # noqa: E402
+
+from app.catalog import warm_catalog  # noqa: E402
+from app.catalog_snapshot import warm_catalog_snapshot  # noqa: E402
+from app.firebase_tokens import warm_token_verifier  # noqa: E402
+
+warm_catalog()
+warm_catalog_snapshot()
+warm_token_verifier()
+
+# With gunicorn's preload_app this runs once in the master; don't let the
+# forked workers inherit (and share) the connection used for warming.
+connections.close_all()
@@ -10,6 +10,7 @@ For the full list of settings and their values, see
 https://docs.djangoproject.com/en/4.2/ref/settings/
 """
 
+import os
 from pathlib import Path
 
 import firebase_admin
@@ -30,13 +31,27 @@ BASE_DIR = Path(__file__).resolve().parent.parent
 # SECURITY WARNING: keep the secret key used in production secret!
 SECRET_KEY = 'django-insecure-e5_#3#yd6$qv$p6@7=98rg%%o(b19+lx7996h9%6-15hj^7*7!'
 
+# 'development' (manage.py runserver) or 'production' (gunicorn with
+# gunicorn.conf.py and persistent database connections); see backend/entrypoint.sh
+SERVING_PROFILE = os.environ.get('SERVING_PROFILE', 'development')
+
+# Route the read-heavy endpoints to native async views (app/views/async_views.py).
+# Turn on when serving fitnesstracker.asgi:application with an ASGI server.
+SERVE_ASYNC_VIEWS = os.environ.get('SERVE_ASYNC_VIEWS', '0') == '1'
+
+# Keep database connections between requests only under WSGI workers, where each
+# thread reuses its own connection. Under ASGI, Django 4.2 runs each request's
+# ORM calls on a per-request thread, so persistent connections are never reused
+# and would pile up until Postgres refuses new ones.
+PERSISTENT_DB_CONNECTIONS = SERVING_PROFILE == 'production' and not SERVE_ASYNC_VIEWS
+
 # SECURITY WARNING: don't run with debug turned on in production!
-DEBUG = True
+DEBUG = SERVING_PROFILE != 'production'
 
 ALLOWED_HOSTS = [
     "10.0.2.2",
     "localhost"
-]
+] + [host for host in os.environ.get('ALLOWED_HOSTS', '').split(',') if host]  # e.g. the production server's address
 
 
 CSRF_TRUSTED_ORIGINS = [
@@ -67,6 +82,11 @@ MIDDLEWARE = [
     'django.middleware.clickjacking.XFrameOptionsMiddleware',
 ]
 
+# Benchmark runs (see app/benchmarks) start the server with this set to get
+# each response's database query count in an X-Query-Count header
+if os.environ.get('BENCHMARK_QUERY_COUNTS') == '1':
+    MIDDLEWARE.insert(0, 'app.benchmarks.middleware.QueryCountMiddleware')
+
 ROOT_URLCONF = 'fitnesstracker.urls'
 
 TEMPLATES = [
@@ -94,8 +114,16 @@ WSGI_APPLICATION = 'fitnesstracker.wsgi.application'
 REST_FRAMEWORK = {
     'DEFAULT_PAGINATION_CLASS': 'rest_framework.pagination.PageNumberPagination',
     'PAGE_SIZE': 50,  # Number of records per page
+    'DEFAULT_RENDERER_CLASSES': [
+        'app.renderers.FastJSONRenderer',
+        'app.renderers.MessagePackRenderer',
+        'rest_framework.renderers.BrowsableAPIRenderer',
+    ],
 }
 
+# JSON encoder for API responses: 'orjson' (falls back to 'stdlib' if not installed)
+JSON_BACKEND = os.environ.get('JSON_BACKEND', 'orjson')
+
 DATABASES = {
     'default': {
         'ENGINE': 'django.db.backends.postgresql',
@@ -104,10 +132,66 @@ DATABASES = {
         'PASSWORD': '11223344',
         'HOST': 'postgres',  # Use 'localhost' for local setup or your database server's address
         'PORT': '5432',       # Default PostgreSQL port
+        # With persistent connections each worker thread keeps its connection between
+        # requests (bounded per worker by gunicorn's threads) and pings it before reuse.
+        'CONN_MAX_AGE': int(os.environ.get('DB_CONN_MAX_AGE', '600')) if PERSISTENT_DB_CONNECTIONS else 0,
+        'CONN_HEALTH_CHECKS': PERSISTENT_DB_CONNECTIONS,
     }
 }
 
 
+# Cache
+# https://docs.djangoproject.com/en/4.2/topics/cache/
+# File based so that management commands (e.g. load_exercises) and the web
+# server share the exercise catalog version.
+
+CACHES = {
+    'default': {
+        'BACKEND': 'django.core.cache.backends.filebased.FileBasedCache',
+        'LOCATION': '/tmp/fitnesstracker_cache',
+    }
+}
+
+# Exercise catalog (see app/catalog.py)
+
+EXERCISE_CATALOG_CACHE = 'default'
+EXERCISE_CATALOG_RECHECK_SECONDS = 5  # How often each process re-reads the catalog version
+EXERCISE_CATALOG_MAX_AGE = 300  # Cache-Control max-age of catalog responses; they carry an ETag to revalidate
+EXERCISE_DATA_PATH = os.environ.get('EXERCISE_DATA_PATH', str(BASE_DIR / 'data' / 'exercises.json'))  # load_exercises source
+
+# Page size of GET /api/exercises/search/ (see app/search.py)
+EXERCISE_SEARCH_PAGE_SIZE = 50
+EXERCISE_SEARCH_MAX_PAGE_SIZE = 1000
+
+# Where muscle-percentage views get their loads: 'rollup' (DailyMuscleLoad),
+# or summed from raw logs in 'python' or 'sql' (Postgres)
+MUSCLE_LOAD_BACKEND = os.environ.get('MUSCLE_LOAD_BACKEND', 'rollup')
+
+# Largest number of logs accepted by POST /api/exercises/logs/bulk/
+EXERCISE_LOG_BULK_MAX = 500
+
+# Keyset pagination of GET /api/exercises/logs/ (see app/pagination.py)
+EXERCISE_LOG_PAGE_SIZE = 50
+EXERCISE_LOG_MAX_PAGE_SIZE = 500
+EXERCISE_LOG_EXPORT_CHUNK_SIZE = 2000  # Rows fetched per server-side cursor round trip
+
+# Verified Firebase ID tokens (see app/decorators/firebase_decorator.py)
+
+FIREBASE_TOKEN_CACHE_SIZE = 10000  # Max number of cached tokens
+FIREBASE_TOKEN_CACHE_MAX_TTL = 3600  # Seconds; entries also expire at the token's exp
+
+# 'firebase' verifies ID tokens with the Admin SDK; 'local' verifies them
+# in-process against signing keys prefetched from FIREBASE_SIGNING_KEYS_URL
+# (an https:// URL or a file:// path to a {kid: PEM} JSON file).
+FIREBASE_TOKEN_VERIFIER = os.environ.get('FIREBASE_TOKEN_VERIFIER', 'firebase')
+FIREBASE_SIGNING_KEYS_URL = os.environ.get(
+    'FIREBASE_SIGNING_KEYS_URL',
+    'https://www.googleapis.com/robot/v1/metadata/x509/securetoken@system.gserviceaccount.com'
+)
+FIREBASE_PROJECT_ID = os.environ.get('FIREBASE_PROJECT_ID')  # Defaults to the service account's project
+FIREBASE_VERIFY_THREADS = 4  # Worker threads verifying tokens for async views
+
+
 # Password validation
 # https://docs.djangoproject.com/en/4.2/ref/settings/#auth-password-validators
 
@@ -1,9 +1,26 @@
+from django.conf import settings
 from django.urls import path
 from app.views.auth_views import GetBearerTokenView
 from app.views.user_views import GetUidView, GetUserNameView, CreateUserView, DeleteUserView, GetDashboardDataView, GetUserInfoView
 from app.views.exercise_views import GetExercisesView, GetExerciseByIdView, GetExercisesLogView, GetExercisesByDateView, GetMusclePercentageView
 from app.views.exercise_views import CreateExerciseLogView, EditExerciseLogView, GetExercisesByDateRangeView, GetMusclePercentagesByDateRangeView
-from app.views.exercise_views import ExerciseLogView
+from app.views.exercise_views import ExerciseLogView, BulkExerciseLogView, ExportExerciseLogsView, SearchExercisesView, SearchExerciseNamesView, RecommendExercisesView
+from app.views.exercise_views import CatalogSnapshotView
+from app.views import async_views
+
+if settings.SERVE_ASYNC_VIEWS:
+    # Native async views for the read-heavy endpoints (see app/views/async_views.py)
+    dashboard_data_view = async_views.dashboard_data_view
+    exercises_by_date_view = async_views.exercises_by_date_view
+    exercises_by_date_range_view = async_views.exercises_by_date_range_view
+    muscle_percentage_view = async_views.muscle_percentage_view
+    muscle_percentages_by_date_range_view = async_views.muscle_percentages_by_date_range_view
+else:
+    dashboard_data_view = GetDashboardDataView.as_view()
+    exercises_by_date_view = GetExercisesByDateView.as_view()
+    exercises_by_date_range_view = GetExercisesByDateRangeView.as_view()
+    muscle_percentage_view = GetMusclePercentageView.as_view()
+    muscle_percentages_by_date_range_view = GetMusclePercentagesByDateRangeView.as_view()
 
 urlpatterns = [
     path('api/auth/uid/', GetUidView.as_view(), name='get_uid_view'),
@@ -11,16 +28,22 @@ urlpatterns = [
     path('api/users/me/', DeleteUserView.as_view(), name='delete_user_view'),
     path('api/auth/login/', GetBearerTokenView.as_view(), name='get_bearer_token_view'),
     path('api/exercises/', GetExercisesView.as_view(), name='get_exercises_view' ),
+    path('api/exercises/snapshot/', CatalogSnapshotView.as_view(), name='catalog_snapshot_view'),
+    path('api/exercises/search/', SearchExercisesView.as_view(), name='search_exercises_view'),
+    path('api/exercises/search/names/', SearchExerciseNamesView.as_view(), name='search_exercise_names_view'),
+    path('api/exercises/recommendations/', RecommendExercisesView.as_view(), name='recommend_exercises_view'),
     # path('api/exercises/logs/', CreateExerciseLogView.as_view(), name='create_exercise_log'),
-    path('api/exercises/logs/by-date/', GetExercisesByDateView.as_view(), name='get_exercises_by_date'),
-    path('api/exercises/muscle-percentage/by-date/', GetMusclePercentageView.as_view(), name='get_muscle_percentage_by_date'),
+    path('api/exercises/logs/by-date/', exercises_by_date_view, name='get_exercises_by_date'),
+    path('api/exercises/muscle-percentage/by-date/', muscle_percentage_view, name='get_muscle_percentage_by_date'),
     # path('api/get_exercise_log/', GetExercisesLogView.as_view(), name='get_exercise_log'),
     # path('api/exercises/logs/', EditExerciseLogView.as_view(), name='edit_exercise_log'),
     path('api/exercises/logs/', ExerciseLogView.as_view(), name='exercise_log_view'),
+    path('api/exercises/logs/bulk/', BulkExerciseLogView.as_view(), name='bulk_exercise_log_view'),
+    path('api/exercises/logs/export/', ExportExerciseLogsView.as_view(), name='export_exercise_logs_view'),
     path('api/get_username/', GetUserNameView.as_view(), name='get_username'),
-    path('api/exercises/logs/by-date-range/', GetExercisesByDateRangeView.as_view(), name='get_exercises_by_date_range'),
-    path('api/exercises/muscle-percentage/by-date-range/', GetMusclePercentagesByDateRangeView.as_view(), name='get_muscle_percentages_by_date_range'),
-    path('api/users/me/dashboard/', GetDashboardDataView.as_view(), name='get_dashboard_data'),
+    path('api/exercises/logs/by-date-range/', exercises_by_date_range_view, name='get_exercises_by_date_range'),
+    path('api/exercises/muscle-percentage/by-date-range/', muscle_percentages_by_date_range_view, name='get_muscle_percentages_by_date_range'),
+    path('api/users/me/dashboard/', dashboard_data_view, name='get_dashboard_data'),
     path('api/users/me/info/', GetUserInfoView.as_view(), name='get_user_info'),
     path('api/exercises/<str:id>/', GetExerciseByIdView.as_view(), name='get_exercise_by_id')
 ]
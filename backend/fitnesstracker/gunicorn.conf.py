@@ -0,0 +1,52 @@
+"""
+Gunicorn settings for SERVING_PROFILE=production (see backend/entrypoint.sh).
+
+The application is imported once in the master (``preload_app``), which also
+loads the exercise catalog, its snapshot and the token signing keys (see
+fitnesstracker/wsgi.py), so workers are forked warm and the first requests
+they accept don't pay for it.
+
+Each gthread worker serves up to WEB_THREADS requests at once, and each of
+its threads keeps one persistent database connection (CONN_MAX_AGE), so a
+worker holds at most WEB_THREADS connections and the server at most
+WEB_CONCURRENCY * WEB_THREADS. With SERVE_ASYNC_VIEWS=1 the workers run the
+ASGI application under uvicorn instead. Django then runs each request's ORM
+calls on a thread of its own, so connections can't be reused across requests
+and settings.py turns persistent connections off: every request in flight
+holds a connection until it finishes, with no per-worker bound. Put a pooler
+such as PgBouncer in front of Postgres if that can exceed its limit.
+"""
+import multiprocessing
+import os
+
+bind = os.environ.get('BIND', '0.0.0.0:8000')
+workers = int(os.environ.get('WEB_CONCURRENCY', multiprocessing.cpu_count() * 2 + 1))
+threads = int(os.environ.get('WEB_THREADS', '4'))
+worker_class = 'uvicorn.workers.UvicornWorker' if os.environ.get('SERVE_ASYNC_VIEWS') == '1' else 'gthread'
+preload_app = True
+
+timeout = 30
+graceful_timeout = 30
+keepalive = 5  # Seconds an idle client connection is kept open
+
+# Recycle workers now and then so slow leaks can't accumulate
+max_requests = 10000
+max_requests_jitter = 1000
+
+# Postgres' default max_connections is 100, some of which are reserved
+DB_MAX_CONNECTIONS = int(os.environ.get('DB_MAX_CONNECTIONS', '90'))
+
+
+def on_starting(server):
+    if worker_class != 'gthread':
+        server.log.warning(
+            "ASGI workers open a database connection per request in flight; more than "
+            "DB_MAX_CONNECTIONS=%d concurrent requests across %d workers will exceed it "
+            "unless a connection pooler sits in front of the database",
+            DB_MAX_CONNECTIONS, workers,
+        )
+    elif workers * threads > DB_MAX_CONNECTIONS:
+        server.log.warning(
+            "%d workers x %d threads may open more than DB_MAX_CONNECTIONS=%d database connections",
+            workers, threads, DB_MAX_CONNECTIONS,
+        )